@@ -0,0 +1,335 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from edge import PsychometricEdge
+from psychometric_graph import PsychometricGraph
+from serialization import EDGE_COLUMNS, encode_json, graph_from_bytes, graph_to_bytes, with_columns
+
+CHECKPOINT_VERSION = 1
+
+
+def _raw(value):
+    return np.nan if value is None else float(value)
+
+
+def _same(a, b):
+    """Igualdad de floats que trata NaN como igual a NaN"""
+    return a == b or (np.isnan(a) and np.isnan(b))
+
+
+def _edge_record(edge):
+    """
+    Registro de una arista: (valores float de EDGE_COLUMNS o NaN, su posición
+    entre las propiedades o -1, texto JSON con el resto de propiedades y los
+    metadatos, que se omiten si la arista no los ha usado)
+    """
+    properties = dict(edge.stored_properties())
+    keys = list(properties)
+    values, positions = [], []
+    for name in EDGE_COLUMNS:
+        value = properties.get(name)
+        if type(value) is float and value == value:
+            values.append(value)
+            positions.append(keys.index(name))
+            del properties[name]
+        else:
+            values.append(np.nan)
+            positions.append(-1)
+    record = {"properties": properties}
+    metadata = edge.stored_metadata()
+    if metadata is not None:
+        record["metadata"] = metadata
+    return tuple(values), tuple(positions), encode_json(record)
+
+
+def _is_base_edge(edge, base_edge, base_records):
+    """
+    Si la arista es la del grafo base o una copia (p. ej. de mutable_edge) con
+    el mismo contenido; base_records guarda los registros ya calculados del grafo base
+    """
+    if base_edge is None or edge.type != base_edge.type:
+        return False
+    if edge is base_edge:
+        return True
+    key = (base_edge.source, base_edge.target)
+    if key not in base_records:
+        base_records[key] = _edge_record(base_edge)
+    values, positions, text = _edge_record(edge)
+    base_values, base_positions, base_text = base_records[key]
+    return positions == base_positions and text == base_text and \
+        all(_same(a, b) for a, b in zip(values, base_values))
+
+
+def _restore_edge(source, target, relationship_type, values, positions, record):
+    edge = PsychometricEdge(source, target, relationship_type)
+    edge.properties = with_columns(record["properties"], [
+        (int(position), name, float(value)) for name, value, position in zip(EDGE_COLUMNS, values, positions)
+        if position >= 0
+    ])
+    if "metadata" in record:
+        edge.metadata = record["metadata"]
+    return edge
+
+
+def graph_array(graph):
+    """Grafo en el formato binario de serialization, como array uint8 para np.savez"""
+    return np.frombuffer(graph_to_bytes(graph), dtype=np.uint8)
+
+
+def graph_from_array(array):
+    return graph_from_bytes(array.tobytes(), PsychometricGraph())
+
+
+def encode_graphs(base_graph, graphs):
+    """
+    Codificación columnar de grafos derivados de base_graph (mismos nodos):
+    parámetros IRT (P, n_items, 3) con NaN si faltan y todas las aristas de
+    la población concatenadas, en orden de inserción, con offsets por grafo.
+    Las aristas iguales a las del grafo base solo guardan su índice en él; el
+    resto guarda strength y correlation en columnas float (record_<nombre>,
+    con su posición entre las propiedades en record_<nombre>_position) y las
+    demás propiedades y los metadatos en una tabla de textos JSON.
+    Returns:
+        Dict de arrays listo para np.savez
+    """
+    node_ids = list(base_graph.nodes.keys())
+    node_index = {node_id: i for i, node_id in enumerate(node_ids)}
+    item_ids = base_graph.nodes_of_type("item")
+    base_edges = {key: e for e, key in enumerate(base_graph.edges)}
+    base_records = {}
+    relationship_types = []
+    type_codes = {}
+
+    parameters = np.empty((len(graphs), len(item_ids), 3))
+    offsets = [0]
+    columns = {name: [] for name in ("source", "target", "type", "base", "record")}
+    records, record_values, record_positions = [], [], []
+    for p, graph in enumerate(graphs):
+        for j, item_id in enumerate(item_ids):
+            params = graph.nodes[item_id].get_property("irt_parameters") or {}
+            parameters[p, j] = (_raw(params.get("difficulty")), _raw(params.get("discrimination")),
+                                _raw(params.get("guessing")))
+        for key, edge in graph.edges.items():
+            if edge.type not in type_codes:
+                type_codes[edge.type] = len(relationship_types)
+                relationship_types.append(edge.type)
+            columns["source"].append(node_index[key[0]])
+            columns["target"].append(node_index[key[1]])
+            columns["type"].append(type_codes[edge.type])
+            if _is_base_edge(edge, base_graph.edges.get(key), base_records):
+                columns["base"].append(base_edges[key])
+                columns["record"].append(-1)
+            else:
+                columns["base"].append(-1)
+                columns["record"].append(len(records))
+                values, positions, text = _edge_record(edge)
+                record_values.append(values)
+                record_positions.append(positions)
+                records.append(text)
+        offsets.append(len(columns["source"]))
+
+    return {
+        "node_ids": np.array(node_ids, dtype=str),
+        "relationship_types": np.array(relationship_types, dtype=str),
+        "parameters": parameters,
+        "edge_offsets": np.array(offsets, dtype=np.int64),
+        "edge_source": np.array(columns["source"], dtype=np.int32),
+        "edge_target": np.array(columns["target"], dtype=np.int32),
+        "edge_type": np.array(columns["type"], dtype=np.int16),
+        "edge_base": np.array(columns["base"], dtype=np.int32),
+        "edge_record": np.array(columns["record"], dtype=np.int32),
+        **{f"record_{name}": np.array([values[c] for values in record_values], dtype=np.float64)
+           for c, name in enumerate(EDGE_COLUMNS)},
+        **{f"record_{name}_position": np.array([positions[c] for positions in record_positions], dtype=np.int32)
+           for c, name in enumerate(EDGE_COLUMNS)},
+        **_string_table("edge_records", records)
+    }
+
+
+def _string_table(name, strings):
+    """Textos como datos UTF-8 concatenados (uint8) y offsets en bytes"""
+    encoded = [string.encode() for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(data) for data in encoded], out=offsets[1:])
+    return {f"{name}_offsets": offsets, f"{name}_data": np.frombuffer(b"".join(encoded), dtype=np.uint8)}
+
+
+def _strings(arrays, name):
+    offsets = arrays[f"{name}_offsets"].tolist()
+    data = arrays[f"{name}_data"].tobytes()
+    return [data[a:b].decode() for a, b in zip(offsets, offsets[1:])]
+
+
+def decode_graphs(base_graph, arrays):
+    """
+    Reconstruye los grafos de encode_graphs a partir de clones de base_graph:
+    los nodos y aristas sin cambios se comparten con el grafo base
+    """
+    records = [json.loads(text) for text in _strings(arrays, "edge_records")]
+    record_values = np.column_stack([arrays[f"record_{name}"] for name in EDGE_COLUMNS])
+    record_positions = np.column_stack([arrays[f"record_{name}_position"] for name in EDGE_COLUMNS])
+    node_ids = [str(n) for n in arrays["node_ids"]]
+    relationship_types = [str(t) for t in arrays["relationship_types"]]
+    item_ids = base_graph.nodes_of_type("item")
+    base_keys = list(base_graph.edges)
+    base_node_ids = [str(n) for n in base_graph.nodes]
+    if base_node_ids != node_ids:
+        raise ValueError("El grafo base no coincide con el del punto de control")
+    node_ids = list(base_graph.nodes)
+
+    graphs = []
+    offsets = arrays["edge_offsets"]
+    for p, parameters in enumerate(arrays["parameters"]):
+        graph = base_graph.clone()
+        for j, item_id in enumerate(item_ids):
+            params = graph.nodes[item_id].get_property("irt_parameters") or {}
+            current = (_raw(params.get("difficulty")), _raw(params.get("discrimination")),
+                       _raw(params.get("guessing")))
+            if all(_same(a, b) for a, b in zip(parameters[j], current)):
+                continue
+            params = graph.mutable_node(item_id).properties["irt_parameters"]
+            for name, value, old in zip(("difficulty", "discrimination", "guessing"), parameters[j], current):
+                if not _same(value, old):
+                    params[name] = None if np.isnan(value) else float(value)
+
+        # Aristas en el orden guardado (el orden influye en las mutaciones posteriores)
+        graph.clear_edges()
+        for e in range(offsets[p], offsets[p + 1]):
+            base_index = arrays["edge_base"][e]
+            if base_index >= 0:
+                graph.insert_edge(base_graph.edges[base_keys[base_index]])
+            else:
+                r = arrays["edge_record"][e]
+                edge = _restore_edge(node_ids[arrays["edge_source"][e]], node_ids[arrays["edge_target"][e]],
+                                     relationship_types[arrays["edge_type"][e]], record_values[r],
+                                     record_positions[r], records[r])
+                graph.insert_edges([edge], owned=True)
+        graphs.append(graph)
+    return graphs
+
+
+def seed_sequence_state(seed_sequence):
+    """Estado serializable en JSON de un SeedSequence (incluido el contador de hijos)"""
+    return {
+        "entropy": seed_sequence.entropy,
+        "spawn_key": list(seed_sequence.spawn_key),
+        "pool_size": seed_sequence.pool_size,
+        "n_children_spawned": seed_sequence.n_children_spawned
+    }
+
+
+def restore_seed_sequence(state):
+    return np.random.SeedSequence(
+        state["entropy"], spawn_key=tuple(state["spawn_key"]), pool_size=state["pool_size"],
+        n_children_spawned=state["n_children_spawned"]
+    )
+
+
+def encode_cache(data):
+    """
+    Entradas de FitnessCache.to_dict() en columnas: claves (tabla de textos,
+    en orden LRU) y una matriz float de métricas con NaN si faltan
+    """
+    entries = data["entries"]
+    names = list(dict.fromkeys(name for _, metrics in entries for name in metrics))
+    values = np.full((len(entries), len(names)), np.nan)
+    integer = np.ones(len(names), dtype=bool)
+    for i, (_, metrics) in enumerate(entries):
+        for j, name in enumerate(names):
+            value = metrics.get(name)
+            if value is None:
+                continue
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"Métrica no numérica en la caché: {name}={value!r}")
+            integer[j] &= isinstance(value, int)
+            values[i, j] = value
+    return {
+        "cache_metrics": np.array(names, dtype=str),
+        "cache_integer": integer,
+        "cache_values": values,
+        **_string_table("cache_keys", [key for key, _ in entries])
+    }
+
+
+def decode_cache(arrays, state):
+    """Estado de FitnessCache.to_dict a partir de encode_cache y de los contadores guardados"""
+    names = [str(name) for name in arrays["cache_metrics"]]
+    integer = arrays["cache_integer"].tolist()
+    entries = []
+    for key, row in zip(_strings(arrays, "cache_keys"), arrays["cache_values"].tolist()):
+        entries.append([key, {name: int(value) if is_integer else value
+                              for name, value, is_integer in zip(names, row, integer) if value == value}])
+    return dict(state, entries=entries)
+
+
+def history_path(path):
+    """Fichero del historial de un punto de control (una línea JSON por generación)"""
+    return f"{path}.history.jsonl"
+
+
+def history_lines(records):
+    """Líneas JSON de registros del historial, para save_checkpoint"""
+    return [encode_json(record) + "\n" for record in records]
+
+
+def save_checkpoint(path, arrays, state, lines=(), offset=0):
+    """
+    Escribe el punto de control de forma atómica (fichero temporal + rename):
+    arrays columnares y un estado JSON pequeño (RNG, contadores, ajustes).
+    El historial va aparte, en history_path(path), y solo se escriben sus
+    registros nuevos: las líneas lines se escriben a partir del byte offset
+    (lo que hubiera después, p. ej. de una ejecución abandonada, se descarta).
+    Se escribe antes que el .npz, cuyo state['history'] indica cuántos
+    registros y bytes del fichero le corresponden.
+    """
+    with open(history_path(path), "r+b" if offset else "wb") as f:
+        f.seek(offset)
+        f.truncate()
+        f.write("".join(lines).encode("utf-8"))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, version=np.array(CHECKPOINT_VERSION),
+                 state=np.array(json.dumps(state)), **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path):
+    """Devuelve (arrays, estado, historial) de un punto de control"""
+    with np.load(path, allow_pickle=False) as data:
+        version = int(data["version"])
+        if version != CHECKPOINT_VERSION:
+            raise ValueError(f"Versión de punto de control no soportada: {version}")
+        arrays = {name: data[name] for name in data.files if name not in ("version", "state")}
+        state = json.loads(str(data["state"]))
+    with open(history_path(path), "rb") as f:
+        text = f.read(state["history"]["bytes"]).decode("utf-8")
+    history = [json.loads(line) for line in text.splitlines()]
+    if len(history) != state["history"]["records"]:
+        raise ValueError(f"Historial incompleto en {history_path(path)}")
+    return arrays, state, history
+
+
+class CheckpointWriter:
+    """
+    Escritura de puntos de control en un hilo de fondo (una escritura a la
+    vez, en orden): cada tarea codifica y escribe un punto de control
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = []
+
+    def submit(self, function, *args):
+        self._pending = [f for f in self._pending if not f.done()]
+        self._pending.append(self._executor.submit(function, *args))
+
+    def flush(self):
+        """Espera a que terminen las escrituras pendientes (y propaga sus errores)"""
+        pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+
+    def close(self):
+        self.flush()
+        self._executor.shutdown()
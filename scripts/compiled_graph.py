@@ -0,0 +1,215 @@
+import numpy as np
+
+
+def _as_float(value, name="parámetro"):
+    """Convierte un parámetro opcional a float (NaN si falta)"""
+    if value is None:
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Valor no numérico en {name}: {value!r}") from None
+
+
+def _readonly(array):
+    array.flags.writeable = False
+    return array
+
+
+class CompiledGraph:
+    """
+    Instantánea numérica de solo lectura de un PsychometricGraph.
+
+    Los parámetros IRT se guardan en vectores contiguos (NaN si faltan) y las
+    relaciones 'measures' en formato CSR: los ítems del constructo c son
+    construct_items[construct_offsets[c]:construct_offsets[c + 1]].
+
+    Los ítems politómicos se describen con n_categories y una matriz de umbrales
+    (n_items, max_categories - 1) rellena con NaN; response_model indica el
+    modelo de cada ítem (MODEL_GRM, que incluye el 3PL dicotómico, o MODEL_PCM).
+    """
+
+    # Valores por defecto usados en la simulación cuando falta un parámetro
+    DEFAULT_DIFFICULTY = 0.5
+    DEFAULT_DISCRIMINATION = 1.0
+    DEFAULT_GUESSING = 0.0
+
+    # Modelos de respuesta (-1 si el nodo indica uno desconocido)
+    MODEL_GRM = 0  # Respuesta graduada de Samejima (y 3PL si hay 2 categorías)
+    MODEL_PCM = 1  # Crédito parcial
+    RESPONSE_MODELS = {"grm": MODEL_GRM, "pcm": MODEL_PCM}
+
+    # Umbrales derivados de la dificultad para ítems Likert sin umbrales propios:
+    # difficulty + linspace(-spread, spread, n_categories - 1)
+    DEFAULT_THRESHOLD_SPREAD = 1.5
+
+    def __init__(self, graph):
+        # --- Nodos ---
+        self.node_ids = list(graph.nodes.keys())
+        self.node_index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        self.node_types = [node.type for node in graph.nodes.values()]
+
+        self.item_ids = [n for n, t in zip(self.node_ids, self.node_types) if t == "item"]
+        self.item_index = {item_id: j for j, item_id in enumerate(self.item_ids)}
+        self.construct_ids = [n for n, t in zip(self.node_ids, self.node_types) if t == "construct"]
+        self.construct_index = {c: k for k, c in enumerate(self.construct_ids)}
+        self.method_ids = [n for n, t in zip(self.node_ids, self.node_types) if t == "method"]
+
+        n_items = len(self.item_ids)
+        difficulty = np.empty(n_items)
+        discrimination = np.empty(n_items)
+        guessing = np.empty(n_items)
+        item_thresholds = [None] * n_items
+        response_model = np.zeros(n_items, dtype=np.int8)
+        for j, item_id in enumerate(self.item_ids):
+            params = graph.nodes[item_id].get_property("irt_parameters") or {}
+            difficulty[j] = _as_float(params.get("difficulty"), f"la dificultad del ítem {item_id}")
+            discrimination[j] = _as_float(params.get("discrimination"), f"la discriminación del ítem {item_id}")
+            guessing[j] = _as_float(params.get("guessing"), f"el azar del ítem {item_id}")
+            if params.get("thresholds"):
+                item_thresholds[j] = [_as_float(b, f"los umbrales del ítem {item_id}") for b in params["thresholds"]]
+            model = params.get("model")
+            if model is not None:
+                # -1 marca un modelo desconocido (lo señala el validador; se simula como GRM)
+                response_model[j] = self.RESPONSE_MODELS.get(model, -1)
+        self.difficulty = _readonly(difficulty)
+        self.discrimination = _readonly(discrimination)
+        self.guessing = _readonly(guessing)
+
+        # --- Aristas (orden de inserción) ---
+        self.relationship_types = []
+        type_codes = {}
+        n_edges = len(graph.edges)
+        edge_source = np.empty(n_edges, dtype=np.int64)
+        edge_target = np.empty(n_edges, dtype=np.int64)
+        edge_type = np.empty(n_edges, dtype=np.int16)
+        edge_strength = np.empty(n_edges)
+        edge_correlation = np.empty(n_edges)
+        edge_support = np.zeros(n_edges, dtype=bool)
+
+        for e, ((source, target), edge) in enumerate(graph.edges.items()):
+            if edge.type not in type_codes:
+                type_codes[edge.type] = len(self.relationship_types)
+                self.relationship_types.append(edge.type)
+            edge_source[e] = self.node_index[source]
+            edge_target[e] = self.node_index[target]
+            edge_type[e] = type_codes[edge.type]
+            edge_strength[e] = _as_float(edge.properties.get("strength"), f"strength de {source}-{target}")
+            edge_correlation[e] = _as_float(edge.properties.get("correlation"), f"correlation de {source}-{target}")
+            edge_support[e] = "empirical_support" in edge.properties
+
+        self.edge_source = _readonly(edge_source)
+        self.edge_target = _readonly(edge_target)
+        self.edge_type = _readonly(edge_type)
+        self.edge_strength = _readonly(edge_strength)
+        self.edge_correlation = _readonly(edge_correlation)
+        self.edge_has_support = _readonly(edge_support)
+        self.edge_masks = {
+            rel_type: _readonly(edge_type == code) for rel_type, code in type_codes.items()
+        }
+
+        # Índices nodo -> ítem y nodo -> constructo (-1 si no aplica)
+        node_types = np.array(self.node_types, dtype=object)
+        node_to_item = np.full(len(self.node_ids), -1, dtype=np.int64)
+        node_to_item[node_types == "item"] = np.arange(n_items)
+        node_to_construct = np.full(len(self.node_ids), -1, dtype=np.int64)
+        node_to_construct[node_types == "construct"] = np.arange(len(self.construct_ids))
+        self.edge_source_item = _readonly(node_to_item[edge_source])
+
+        # --- Relaciones 'measures' en formato CSR ---
+        measures = self.edge_mask("measures")
+        self.measures_per_node = _readonly(
+            np.bincount(edge_target[measures], minlength=len(self.node_ids))
+        )
+        item_measures = measures & (self.edge_source_item >= 0) & (node_to_construct[edge_target] >= 0)
+        m_construct = node_to_construct[edge_target[item_measures]]
+        m_item = self.edge_source_item[item_measures]
+        order = np.argsort(m_construct, kind="stable")
+        self.construct_items = _readonly(m_item[order])
+        self.construct_offsets = _readonly(np.concatenate((
+            [0], np.cumsum(np.bincount(m_construct, minlength=len(self.construct_ids)))
+        )).astype(np.int64))
+
+        # Primer constructo medido por cada ítem (-1 si no mide ninguno)
+        item_construct = np.full(n_items, -1, dtype=np.int64)
+        first_items, first_pos = np.unique(m_item, return_index=True)
+        item_construct[first_items] = m_construct[first_pos]
+        self.item_construct = _readonly(item_construct)
+
+        # Ítems con método de respuesta asignado
+        uses_method = self.edge_mask("uses_method") & (self.edge_source_item >= 0)
+        has_method = np.zeros(n_items, dtype=bool)
+        has_method[self.edge_source_item[uses_method]] = True
+        self.item_has_method = _readonly(has_method)
+
+        # --- Categorías de respuesta ---
+        # Número de opciones del primer método de cada ítem (0 si no tiene)
+        method_items, method_pos = np.unique(self.edge_source_item[uses_method], return_index=True)
+        method_options = np.zeros(n_items, dtype=np.int64)
+        for j, target in zip(method_items, edge_target[uses_method][method_pos]):
+            options = graph.nodes[self.node_ids[target]].get_property("response_options") or []
+            method_options[j] = len(options)
+
+        n_categories = np.full(n_items, 2, dtype=np.int64)
+        for j in range(n_items):
+            if item_thresholds[j] is not None:
+                n_categories[j] = len(item_thresholds[j]) + 1
+            elif method_options[j] > 2:
+                n_categories[j] = method_options[j]
+
+        thresholds = np.full((n_items, max(int(n_categories.max(initial=2)) - 1, 1)), np.nan)
+        filled_difficulty = np.where(np.isnan(difficulty), self.DEFAULT_DIFFICULTY, difficulty)
+        for j in range(n_items):
+            if item_thresholds[j] is not None:
+                thresholds[j, :n_categories[j] - 1] = item_thresholds[j]
+            elif n_categories[j] > 2:
+                spread = self.DEFAULT_THRESHOLD_SPREAD
+                offsets = np.linspace(-spread, spread, n_categories[j] - 1)
+                thresholds[j, :n_categories[j] - 1] = filled_difficulty[j] + offsets
+            else:
+                thresholds[j, 0] = filled_difficulty[j]
+        self.n_categories = _readonly(n_categories)
+        self.thresholds = _readonly(thresholds)
+        self.response_model = _readonly(response_model)
+
+    @property
+    def n_items(self):
+        return len(self.item_ids)
+
+    @property
+    def n_constructs(self):
+        return len(self.construct_ids)
+
+    @property
+    def is_polytomous(self):
+        """True si algún ítem tiene más de dos categorías de respuesta"""
+        return bool((self.n_categories > 2).any())
+
+    def edge_mask(self, relationship_type):
+        """Máscara booleana de las aristas de un tipo de relación"""
+        mask = self.edge_masks.get(relationship_type)
+        if mask is None:
+            return np.zeros(len(self.edge_type), dtype=bool)
+        return mask
+
+    def construct_item_indices(self, construct):
+        """Índices (en item_ids) de los ítems que miden un constructo"""
+        k = construct if isinstance(construct, (int, np.integer)) else self.construct_index[construct]
+        return self.construct_items[self.construct_offsets[k]:self.construct_offsets[k + 1]]
+
+    def iter_constructs(self):
+        """Itera sobre (construct_id, índices de ítems) en formato CSR"""
+        for k, construct in enumerate(self.construct_ids):
+            yield construct, self.construct_items[self.construct_offsets[k]:self.construct_offsets[k + 1]]
+
+    def item_parameters(self):
+        """Parámetros (difficulty, discrimination, guessing) con valores por defecto"""
+        return (
+            np.where(np.isnan(self.difficulty), self.DEFAULT_DIFFICULTY, self.difficulty),
+            np.where(np.isnan(self.discrimination), self.DEFAULT_DISCRIMINATION, self.discrimination),
+            np.where(np.isnan(self.guessing), self.DEFAULT_GUESSING, self.guessing)
+        )
+
+    def __repr__(self):
+        return (f"<CompiledGraph items={self.n_items} constructs={self.n_constructs} "
+                f"edges={len(self.edge_type)}>")
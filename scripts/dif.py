@@ -0,0 +1,148 @@
+import contextlib
+import numpy as np
+
+
+def dif_accumulator(n_candidates, n_strata, n_groups, n_items, max_sum=None):
+    """
+    Tabla de DIF vacía para acumular bloques con dif_table(out=...). Las sumas
+    usan el entero sin signo más pequeño que admite max_sum (uint32 salvo que
+    se indique una suma mayor).
+    Returns:
+        counts (K, n_strata, n_groups) y sums (K, n_strata, n_groups, n_items)
+    """
+    dtype = np.uint64 if max_sum is not None and max_sum >= 2 ** 32 else np.uint32
+    return (np.zeros((n_candidates, n_strata, n_groups), dtype=np.int64),
+            np.zeros((n_candidates, n_strata, n_groups, n_items), dtype=dtype))
+
+
+def dif_table(responses, groups, n_groups, scores=None, n_strata=None, out=None, lock=None):
+    """
+    Tabla de contingencia estrato × grupo × ítem construida con bincount: las
+    celdas (candidato, estrato, grupo) se cuentan de una vez y las sumas por
+    ítem se acumulan directamente en una tabla entera, sin temporales densos
+    del tamaño de la tabla.
+    Args:
+        responses: Respuestas (n_respondents, n_items) o (K, n_respondents, n_items)
+        groups: Grupo de cada persona (0 = referencia, 1..n_groups-1 = focales)
+        scores: Puntuación de emparejamiento (por defecto, la puntuación total)
+        n_strata: Número de estratos (por defecto, máxima puntuación + 1)
+        out: Tabla (counts, sums) de dif_accumulator a la que se suma este
+            bloque; por defecto se crea una nueva
+        lock: Cerrojo que protege out cuando varios hilos acumulan a la vez
+    Returns:
+        counts (K, n_strata, n_groups) y sums (K, n_strata, n_groups, n_items), enteros
+    """
+    responses = np.asarray(responses)
+    if responses.ndim == 2:
+        responses = responses[np.newaxis]
+    n_candidates, n_respondents, n_items = responses.shape
+
+    if scores is None:
+        scores = responses.sum(axis=2, dtype=np.int64)
+    scores = np.broadcast_to(scores, (n_candidates, n_respondents))
+    if n_strata is None:
+        n_strata = int(scores.max(initial=0)) + 1
+    if out is None:
+        out = dif_accumulator(n_candidates, n_strata, n_groups, n_items,
+                              n_respondents * int(responses.max(initial=0)))
+    lock = lock or contextlib.nullcontext()
+
+    # Celda (candidato, estrato, grupo) de cada persona
+    n_cells = n_candidates * n_strata * n_groups
+    cells = (np.arange(n_candidates)[:, np.newaxis] * (n_strata * n_groups)
+             + scores * n_groups + np.asarray(groups)).ravel()
+    counts, sums = out
+    flat_sums = sums.reshape(n_cells, n_items)
+    block_counts = np.bincount(cells, minlength=n_cells).reshape(counts.shape)
+    with lock:
+        counts += block_counts
+    flat = responses.reshape(-1, n_items)
+    for j in range(n_items):
+        # Las sumas con pesos son enteros exactos en float64
+        item_sums = np.bincount(cells, weights=flat[:, j], minlength=n_cells).astype(sums.dtype)
+        with lock:
+            flat_sums[:, j] += item_sums
+    return counts, sums
+
+
+def dif_statistics(counts, sums):
+    """
+    Estadísticos de DIF de cada grupo focal frente al de referencia (grupo 0).
+    Args:
+        counts, sums: Tabla devuelta por dif_table (pueden acumularse por bloques)
+    Returns:
+        Dict de arrays (K, n_groups - 1, n_items):
+            - mh_odds_ratio: Odds ratio común de Mantel-Haenszel
+            - mh_d_dif: Escala delta de ETS (-2.35 ln alpha_MH)
+            - mh_chi2: Chi-cuadrado de Mantel-Haenszel con corrección de continuidad
+            - std_p_dif: Diferencia de proporciones estandarizada (pesos del grupo focal)
+    """
+    counts = counts.astype(np.float64)
+    sums = sums.astype(np.float64)
+    n_ref = counts[:, np.newaxis, :, 0, np.newaxis]
+    n_focal = np.moveaxis(counts[:, :, 1:], 2, 1)[..., np.newaxis]
+    ref_correct = sums[:, np.newaxis, :, 0, :]
+    focal_correct = np.moveaxis(sums[:, :, 1:, :], 2, 1)
+
+    # A, B: referencia (acierto/fallo); C, D: focal (acierto/fallo)
+    a, b = ref_correct, n_ref - ref_correct
+    c, d = focal_correct, n_focal - focal_correct
+    total = n_ref + n_focal
+    both = (n_ref > 0) & (n_focal > 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(both, total, np.inf)
+        odds_ratio = (a * d / t).sum(axis=2) / (b * c / t).sum(axis=2)
+        d_dif = -2.35 * np.log(odds_ratio)
+
+        correct = a + c
+        expected_a = n_ref * correct / t
+        var_a = np.where(total > 1, n_ref * n_focal * correct * (total - correct)
+                         / (t * t * (total - 1)), 0.0)
+        chi2 = np.square(np.maximum(np.abs((np.where(both, a, 0) - expected_a).sum(axis=2)) - 0.5, 0)) \
+            / var_a.sum(axis=2)
+
+        weights = np.where(both, n_focal, 0.0)
+        p_diff = np.where(both, c / n_focal - a / n_ref, 0.0)
+        std_p_dif = (weights * p_diff).sum(axis=2) / weights.sum(axis=2)
+
+    return {
+        'mh_odds_ratio': odds_ratio,
+        'mh_d_dif': d_dif,
+        'mh_chi2': chi2,
+        'std_p_dif': std_p_dif
+    }
+
+
+def ets_category(d_dif):
+    """Clasificación ETS simplificada por magnitud: 'A' (<1), 'B' (1-1.5), 'C' (>=1.5)"""
+    magnitude = np.abs(np.nan_to_num(d_dif, nan=0.0))
+    return np.where(magnitude < 1.0, "A", np.where(magnitude < 1.5, "B", "C"))
+
+
+def mantel_haenszel(responses, groups, n_groups=None, scores=None):
+    """
+    DIF de todos los ítems de una matriz de respuestas (n_respondents, n_items).
+    Returns:
+        Dict de arrays (n_groups - 1, n_items); ver dif_statistics
+    """
+    groups = np.asarray(groups)
+    n_groups = n_groups or int(groups.max(initial=0)) + 1
+    counts, sums = dif_table(responses, groups, n_groups, scores=scores)
+    return {key: value[0] for key, value in dif_statistics(counts, sums).items()}
+
+
+def dif_audit(responses, group_variables, scores=None):
+    """
+    Auditoría de DIF para varias variables demográficas.
+    Args:
+        group_variables: Dict {nombre: grupos codificados 0..G-1}
+    Returns:
+        Dict {nombre: estadísticos de mantel_haenszel}
+    """
+    if scores is None:
+        scores = np.asarray(responses).sum(axis=1, dtype=np.int64)
+    return {
+        name: mantel_haenszel(responses, groups, scores=scores)
+        for name, groups in group_variables.items()
+    }
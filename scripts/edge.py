@@ -1,4 +1,28 @@
+import copy
+import sys
+from readonly import plain_copy, read_only, _MESSAGE
+
+# Metadatos estructurados por defecto (plantilla compartida: cada arista solo
+# crea su copia al acceder a metadata)
+DEFAULT_METADATA = {
+    'psychometric': {
+        'reliability': None,
+        'validity': {
+            'convergent': None,
+            'discriminant': None
+        }
+    },
+    'empirical': {
+        'studies': [],
+        'effect_size': None,
+        'confidence_interval': None
+    }
+}
+
+
 class PsychometricEdge:
+    __slots__ = ("source", "target", "type", "_properties", "_metadata", "_frozen")
+
     def __init__(self, source_id, target_id, relationship_type):
         """
         Representa una relación en el grafo psicométrico con:
@@ -6,29 +30,93 @@ class PsychometricEdge:
         - target: Nodo destino
         - type: Tipo de relación ('measures', 'correlates_with', etc.)
         - properties: Atributos operacionales (dict)
-        - metadata: Información auxiliar estructurada (dict)
+        - metadata: Información auxiliar estructurada (dict, creado al primer uso)
         """
+        self._frozen = False
         self.source = source_id
         self.target = target_id
-        self.type = relationship_type
-        self.properties = {}  # Propiedades directas (ej: strength, correlation)
-        self.metadata = {     # Metadatos estructurados
-            'psychometric': {
-                'reliability': None,
-                'validity': {
-                    'convergent': None,
-                    'discriminant': None
-                }
-            },
-            'empirical': {
-                'studies': [],
-                'effect_size': None,
-                'confidence_interval': None
-            }
-        }
+        self.type = sys.intern(str(relationship_type)) if isinstance(relationship_type, str) else relationship_type
+        self._properties = {}  # Propiedades directas (ej: strength, correlation)
+        self._metadata = None
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise TypeError(f"{_MESSAGE} (arista {self.source}→{self.target})")
+        object.__setattr__(self, name, value)
+
+    @property
+    def properties(self):
+        """Propiedades de la arista (vista de solo lectura si está compartida)"""
+        return read_only(self._properties) if self._frozen else self._properties
+
+    @properties.setter
+    def properties(self, value):
+        self._properties = value
+
+    def stored_properties(self):
+        """Propiedades tal como están guardadas (sin vista de solo lectura)"""
+        return self._properties
+
+    @property
+    def metadata(self):
+        """
+        Metadatos estructurados, un dict normal: DEFAULT_METADATA se copia en
+        el primer acceso (get_metadata lee sin copiarlo). Vista de solo
+        lectura si la arista está compartida.
+        """
+        if self._frozen:
+            return read_only(DEFAULT_METADATA if self._metadata is None else self._metadata)
+        if self._metadata is None:
+            self._metadata = plain_copy(DEFAULT_METADATA)
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, value):
+        self._metadata = value
+
+    def get_metadata(self, key, default=None):
+        """
+        Valor de un metadato de primer nivel (default si no existe) sin copiar
+        los metadatos por defecto; los valores de la plantilla y los de una
+        arista compartida se devuelven como vista de solo lectura
+        """
+        if self._metadata is None:
+            metadata = DEFAULT_METADATA
+        elif self._frozen:
+            metadata = self._metadata
+        else:
+            return self._metadata.get(key, default)
+        return read_only(metadata[key]) if key in metadata else default
+
+    def stored_metadata(self):
+        """Metadatos tal como están guardados: None si todavía no se han usado"""
+        return self._metadata
+
+    @property
+    def frozen(self):
+        """True si la arista está compartida entre grafos y no puede modificarse"""
+        return self._frozen
+
+    def freeze(self):
+        """Marca la arista como compartida: a partir de aquí es de solo lectura"""
+        object.__setattr__(self, "_frozen", True)
+
+    def __deepcopy__(self, memo):
+        # La copia no está compartida con nadie: se puede modificar
+        edge = PsychometricEdge.__new__(PsychometricEdge)
+        for name in ("source", "target", "type", "_properties", "_metadata"):
+            object.__setattr__(edge, name, copy.deepcopy(getattr(self, name), memo))
+        object.__setattr__(edge, "_frozen", False)
+        return edge
+
+    def __reduce__(self):
+        return _restore_edge, (self.source, self.target, self.type, self._properties,
+                               self._metadata, self._frozen)
 
     def update_metadata(self, metadata_dict):
         """Actualiza metadatos con soporte para anidación mediante puntos"""
+        if self._frozen:
+            raise TypeError(f"{_MESSAGE} (arista {self.source}→{self.target})")
         for key, value in metadata_dict.items():
             if '.' in key:
                 # Manejo de metadatos anidados (ej: 'psychometric.reliability')
@@ -43,5 +131,23 @@ class PsychometricEdge:
                 # Metadatos de primer nivel
                 self.metadata[key] = value
 
+    def to_dict(self):
+        """Representación como dicts y listas normales (p. ej. para JSON)"""
+        return {
+            "source": self.source,
+            "target": self.target,
+            "type": self.type,
+            "properties": plain_copy(self._properties),
+            "metadata": plain_copy(DEFAULT_METADATA if self._metadata is None else self._metadata)
+        }
+
     def __repr__(self):
-        return f"<Edge {self.source}→{self.target} ({self.type})>"
\ No newline at end of file
+        return f"<Edge {self.source}→{self.target} ({self.type})>"
+
+
+def _restore_edge(source, target, edge_type, properties, metadata, frozen):
+    edge = PsychometricEdge.__new__(PsychometricEdge)
+    for name, value in (("source", source), ("target", target), ("type", edge_type),
+                        ("_properties", properties), ("_metadata", metadata), ("_frozen", frozen)):
+        object.__setattr__(edge, name, value)
+    return edge
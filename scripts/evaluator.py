@@ -1,104 +1,651 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_EXCEPTION
+import os
 import numpy as np
 from scipy.stats import pearsonr
+from compiled_graph import CompiledGraph
+from population import (
+    CompiledPopulation, StatisticsAccumulator, reliability_from_statistics,
+    bias_from_statistics, expected_statistics, alpha_from_variances, expected_bias
+)
+from dif import mantel_haenszel
+from instrumentation import Instrumentation
+from fitness_cache import FitnessCache, graph_fingerprint, settings_fingerprint
+from rng import as_seed_sequence
+from simulation import simulate_dichotomous, simulate_polytomous
+
+def _evaluate_batch(evaluator, population, run_seeds):
+    """
+    Trabajo de un lote de candidatos. Está a nivel de módulo para poder enviarse
+    a otros procesos; devuelve también las réplicas simuladas y el informe de
+    instrumentación del trabajador, que se acumulan en el evaluador principal.
+    """
+    return (
+        evaluator._batch_run_metrics(population, run_seeds),
+        evaluator._simulation_count(population, run_seeds),
+        evaluator.instrumentation.report()
+    )
+
 
 class PsychometricEvaluator:
-    def __init__(self, n_respondents=3000, n_simulations=3, theta_mean=0, theta_std=1):
+    MODES = ("simulation", "expected")
+    BACKENDS = ("serial", "thread", "process")
+    
+    def __init__(self, n_respondents=3000, n_simulations=3, theta_mean=0, theta_std=1,
+                 mode="simulation", n_quadrature=41, chunk_size=50000, n_jobs=1, seed=None,
+                 n_groups=2, instrumentation=None, backend="serial", n_workers=None, batch_size=None,
+                 cache=None):
+        """
+        Args:
+            mode: 'simulation' (Monte Carlo) o 'expected' (valores esperados
+                por cuadratura de Gauss-Hermite, deterministas y sin simular)
+            n_quadrature: Nodos de cuadratura usados en el modo 'expected'
+            chunk_size: Personas simuladas por bloque; la memoria máxima depende
+                de este valor y no de n_respondents
+            n_jobs: Hilos que simulan bloques en paralelo
+            seed: Semilla (int, SeedSequence o numpy.random.Generator). Cada
+                evaluación usa un flujo hijo, y dentro de ella cada simulación
+                y cada bloque de personas tienen el suyo propio
+            n_groups: Grupos simulados para el análisis de DIF (el 0 es el de
+                referencia y el resto son grupos focales)
+            instrumentation: Registro de tiempos, llamadas y bytes por etapa
+                (simulation, reliability, validity, discrimination_power,
+                model_fit, bias_indicators...). True crea uno propio; también
+                puede pasarse un Instrumentation compartido. Desactivado por defecto
+            backend: Reparto de los candidatos de una población entre trabajadores:
+                'serial' (un solo lote), 'thread' (hilos; NumPy libera el GIL) o
+                'process' (procesos; cada lote viaja como arrays compactos de
+                parámetros, no como objetos PsychometricGraph)
+            n_workers: Trabajadores del backend paralelo (por defecto, os.cpu_count())
+            batch_size: Candidatos por lote (por defecto, repartidos entre n_workers)
+            cache: FitnessCache compartida (o True para crear una) que evita volver
+                a evaluar grafos con el mismo contenido; la clave incluye los
+                ajustes del evaluador y la semilla raíz
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Modo de evaluación desconocido: {mode} (opciones: {', '.join(self.MODES)})")
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Backend desconocido: {backend} (opciones: {', '.join(self.BACKENDS)})")
         self.n_respondents = n_respondents
         self.n_simulations = n_simulations
         self.theta_mean = theta_mean
         self.theta_std = theta_std
+        self.mode = mode
+        self.n_quadrature = n_quadrature
+        self.chunk_size = chunk_size
+        self.n_jobs = n_jobs
+        self.seed_sequence = as_seed_sequence(seed)
+        self.n_groups = n_groups
+        if not isinstance(instrumentation, Instrumentation):
+            instrumentation = Instrumentation(enabled=bool(instrumentation))
+        self.instrumentation = instrumentation
+        self.backend = backend
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self._executor = None
+        self._chunk_executor = None
+        if cache is True:
+            cache = FitnessCache()
+        self.cache = cache if isinstance(cache, FitnessCache) else None
+        self.simulations_run = 0  # Réplicas Monte Carlo simuladas (candidato × réplica)
         
+    # Ponderación de métricas (Asegúrate de que coincida con las métricas calculadas)
+    METRIC_WEIGHTS = {
+        "reliability": 0.35,
+        "validity": 0.25,
+        "discrimination_power": 0.15,
+        "model_fit": 0.15,
+        "bias_indicators": 0.10
+    }
+    
+    def __getstate__(self):
+        # Copia para los procesos trabajadores: sin pool y con una instrumentación propia
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        state["_chunk_executor"] = None
+        state["instrumentation"] = Instrumentation(enabled=self.instrumentation.enabled)
+        state["cache"] = None
+        return state
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+        return False
+    
+    def close(self):
+        """Cierra los pools de trabajadores (backend paralelo y bloques), si se crearon"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._chunk_executor is not None:
+            self._chunk_executor.shutdown()
+            self._chunk_executor = None
+    
+    def with_seed(self, seed):
+        """
+        Evaluador con los mismos ajustes, caché e instrumentación pero con su
+        propia semilla y sus propios pools (p. ej. uno por isla, para que
+        evaluadores que parten del mismo no reciban las mismas semillas)
+        """
+        evaluator = PsychometricEvaluator.__new__(PsychometricEvaluator)
+        evaluator.__dict__.update(self.__dict__)
+        evaluator.seed_sequence = as_seed_sequence(seed)
+        evaluator._executor = None
+        evaluator._chunk_executor = None
+        evaluator.simulations_run = 0
+        return evaluator
+    
+    def settings(self):
+        """Argumentos del constructor (sin semilla, instrumentación ni caché), serializables en JSON"""
+        return {
+            "n_respondents": self.n_respondents,
+            "n_simulations": self.n_simulations,
+            "theta_mean": self.theta_mean,
+            "theta_std": self.theta_std,
+            "mode": self.mode,
+            "n_quadrature": self.n_quadrature,
+            "chunk_size": self.chunk_size,
+            "n_jobs": self.n_jobs,
+            "n_groups": self.n_groups,
+            "backend": self.backend,
+            "n_workers": self.n_workers,
+            "batch_size": self.batch_size
+        }
+    
+    def instrumentation_report(self):
+        """Informe por etapa acumulado desde la creación del evaluador (ver Instrumentation.report)"""
+        return self.instrumentation.report()
+    
     def evaluate_graph(self, graph):
         """Evalúa el grafo psicométrico con múltiples simulaciones"""
-        all_metrics = []
-        for _ in range(self.n_simulations):
-            metrics = self._evaluate_single_run(graph)
-            all_metrics.append(metrics)
-        
-        # Calcular promedios
-        avg_metrics = {}
-        for key in all_metrics[0].keys():
-            avg_metrics[key] = np.mean([m[key] for m in all_metrics])
-        
-        # Ponderación de métricas (Asegúrate de que coincida con las métricas calculadas)
-        weights = {
-            "reliability": 0.35,
-            "validity": 0.25,
-            "discrimination_power": 0.15,
-            "model_fit": 0.15,
-            "bias_indicators": 0.10
+        return self.evaluate_population([graph])[0]
+    
+    def evaluate_population(self, graphs):
+        """
+        Evalúa K grafos en un único cálculo vectorizado sobre arrays (K, n_items).
+        Todos los candidatos comparten las mismas extracciones de theta, uniformes
+        y grupos en cada simulación (números aleatorios comunes), de modo que las
+        diferencias entre puntuaciones no se deben al ruido de muestreo.
+        Returns:
+            Lista de diccionarios de métricas en el mismo orden que graphs
+        """
+        with self.instrumentation.stage("compile"):
+            compiled = [self._compiled(graph) for graph in graphs]
+        if not compiled:
+            return []
+        return self._cached_results(compiled, self._evaluate_compiled, "evaluate")
+    
+    def _evaluate_compiled(self, compiled):
+        """Evaluación conjunta de una lista de grafos compilados (sin caché)"""
+        run_metrics = self._population_run_metrics(CompiledPopulation(compiled))
+        
+        results = []
+        for k, graph in enumerate(compiled):
+            # Promedio de las réplicas Monte Carlo y métricas estructurales
+            avg_metrics = self._combine_metrics(
+                self._structural_metrics(graph),
+                np.mean(run_metrics["reliability"][k]),
+                np.mean(run_metrics["bias_indicators"][k])
+            )
+            avg_metrics["overall_score"] = self._overall_score(avg_metrics)
+            results.append(avg_metrics)
+        return results
+    
+    def evaluate_genomes(self, encoding, genomes):
+        """
+        Evalúa una población de genomas (ver genome.GenomeEncoding) directamente
+        sobre arrays, sin decodificarlos a grafos: las métricas estructurales se
+        calculan en bloque y la simulación usa los parámetros de cada genoma con
+        la estructura de medida del grafo base.
+        Returns:
+            Dict {métrica: array (P,)} con las métricas de evaluate_population
+        """
+        if len(genomes) == 0:
+            return {key: np.zeros(0) for key in (*self.METRIC_WEIGHTS, "overall_score")}
+        
+        structural = self._genome_structural_metrics(encoding, genomes)
+        parameters = genomes.parameters
+        population = CompiledPopulation.from_parameters(
+            encoding.compiled, parameters, encoding.threshold_matrix(parameters[..., 0])
+        )
+        run_metrics = self._population_run_metrics(population)
+        metrics = self._combine_metrics(
+            structural,
+            run_metrics["reliability"].mean(axis=1),
+            run_metrics["bias_indicators"].mean(axis=1)
+        )
+        metrics["overall_score"] = self._overall_score(metrics)
+        return metrics
+    
+    def _genome_structural_metrics(self, encoding, genomes):
+        """Validez, poder discriminativo y ajuste de todos los genomas (arrays (P,))"""
+        compiled = encoding.compiled
+        n_genomes = len(genomes)
+        discrimination = genomes.parameters[..., 1]
+        stage = self.instrumentation.stage
+        
+        with stage("validity"):
+            measures = compiled.edge_mask("measures")
+            if measures.any():
+                # Sin 'strength' explícita se usa la discriminación del ítem origen (o 1.0)
+                strength = compiled.edge_strength[measures]
+                padded = np.concatenate((discrimination, np.full((n_genomes, 1), np.nan)), axis=1)
+                fallback = padded[:, compiled.edge_source_item[measures]]
+                fallback = np.where(np.isnan(fallback), 1.0, fallback)
+                strength = np.where(np.isnan(strength), fallback, strength)
+                validity = np.clip(np.abs(strength) * 0.7, 0.3, 1.0).mean(axis=1)
+            else:
+                validity = np.zeros(n_genomes)
+        
+        with stage("discrimination_power"):
+            if encoding.n_items == 0:
+                discrimination_power = np.zeros(n_genomes)
+            else:
+                discrimination_power = np.clip((discrimination - 0.3) / (3.0 - 0.3), 0, 1).mean(axis=1)
+        
+        with stage("model_fit"):
+            # Las correlaciones son aristas mutables; los 'measures' son fijos
+            correlates = genomes.edge_mask & encoding.edge_is_correlation
+            counts = compiled.measures_per_node[compiled.measures_per_node > 0]
+            model_fit = (0.7
+                         + 0.05 * np.count_nonzero(correlates & encoding.edge_has_support, axis=1)
+                         + 0.03 * np.count_nonzero(correlates & ~np.isnan(genomes.edge_weight), axis=1)
+                         - 0.1 * np.count_nonzero(counts < 3)
+                         + 0.05 * np.count_nonzero(counts > 5))
+            model_fit = np.clip(model_fit, 0.5, 0.95)
+        
+        return {
+            "validity": validity,
+            "discrimination_power": discrimination_power,
+            "model_fit": model_fit
         }
+    
+    def race_population(self, graphs, elite_size=3, cutoff=None, z=2.0, tolerance=0.001,
+                        min_simulations=3, max_simulations=None):
+        """
+        Evaluación secuencial ("racing"): simula por rondas de una réplica y deja
+        de simular un candidato cuando su puntuación es estadísticamente inferior
+        al corte de élite (media + z*EE < corte) o cuando ha convergido (EE < tolerance).
+        Args:
+            elite_size: Si no se da cutoff, el corte es la cota inferior
+                (media - z*EE) del elite_size-ésimo mejor candidato
+            cutoff: Puntuación de corte fija (p. ej. la de la élite actual)
+            max_simulations: Réplicas máximas por candidato (por defecto n_simulations)
+        Returns:
+            Lista de métricas como evaluate_population, con 'n_simulations'
+            (réplicas usadas) y 'score_se' (error estándar de overall_score).
+            Con caché, los candidatos ya evaluados no entran en la carrera
+        """
+        if self.mode == "expected":
+            return [dict(m, n_simulations=1, score_se=0.0) for m in self.evaluate_population(graphs)]
         
-        # Calcular puntuación global solo si las métricas existen
-        avg_metrics["overall_score"] = sum(avg_metrics[k] * weights[k] for k in weights if k in avg_metrics)
-        return avg_metrics
+        with self.instrumentation.stage("compile"):
+            compiled = [self._compiled(graph) for graph in graphs]
+        if not compiled:
+            return []
+        options = dict(elite_size=elite_size, cutoff=cutoff, z=z, tolerance=tolerance,
+                       min_simulations=min_simulations, max_simulations=max_simulations)
+        return self._cached_results(
+            compiled, lambda pending: self._race_compiled(pending, **options), "race", **options
+        )
     
-    def _evaluate_single_run(self, graph):
-        """Ejecuta una sola evaluación del grafo"""
-        response_data = self.simulate_responses(graph)
+    def _race_compiled(self, compiled, elite_size, cutoff, z, tolerance, min_simulations, max_simulations):
+        """Carrera sobre una lista de grafos compilados (sin caché); ver race_population"""
+        max_simulations = max_simulations or self.n_simulations
+        population = CompiledPopulation(compiled)
+        structural = [self._structural_metrics(graph) for graph in compiled]
+        
+        n_candidates = len(compiled)
+        runs = {"reliability": [[] for _ in range(n_candidates)],
+                "bias_indicators": [[] for _ in range(n_candidates)]}
+        scores = [[] for _ in range(n_candidates)]
+        active = np.ones(n_candidates, dtype=bool)
+        mean = np.zeros(n_candidates)
+        se = np.full(n_candidates, np.inf)
+        
+        for n_run in range(1, max_simulations + 1):
+            # Una réplica con números aleatorios comunes para los candidatos activos
+            indices = np.flatnonzero(active)
+            run_metrics = self._population_run_metrics(population.subset(indices), n_simulations=1)
+            for pos, k in enumerate(indices):
+                for key in runs:
+                    runs[key][k].append(run_metrics[key][pos, 0])
+                metrics = self._combine_metrics(
+                    structural[k], runs["reliability"][k][-1], runs["bias_indicators"][k][-1]
+                )
+                scores[k].append(self._overall_score(metrics))
+                mean[k] = np.mean(scores[k])
+                if len(scores[k]) > 1:
+                    se[k] = np.std(scores[k], ddof=1) / np.sqrt(len(scores[k]))
+            
+            if n_run < min_simulations:
+                continue
+            
+            # Descartar candidatos dominados y detener los que han convergido
+            race_cutoff = cutoff
+            if race_cutoff is None:
+                lower = np.sort(mean - z * se)[::-1]
+                race_cutoff = lower[min(elite_size, n_candidates) - 1]
+            active &= ~(mean + z * se < race_cutoff)
+            active &= ~(se < tolerance)
+            if not active.any():
+                break
+        
+        results = []
+        for k in range(n_candidates):
+            avg_metrics = self._combine_metrics(
+                structural[k], np.mean(runs["reliability"][k]), np.mean(runs["bias_indicators"][k])
+            )
+            avg_metrics["overall_score"] = mean[k]
+            avg_metrics["n_simulations"] = len(scores[k])
+            avg_metrics["score_se"] = se[k] if len(scores[k]) > 1 else 0.0
+            results.append(avg_metrics)
+        return results
+    
+    def _cached_results(self, compiled, evaluate, method, **options):
+        """
+        Devuelve las métricas de cada grafo consultando la caché: solo se evalúan
+        (con evaluate) los contenidos que faltan, una sola vez aunque se repitan
+        """
+        if self.cache is None:
+            return evaluate(compiled)
+        
+        with self.instrumentation.stage("cache"):
+            settings = self._cache_settings(method, **options)
+            keys = [FitnessCache.key(graph_fingerprint(graph), settings) for graph in compiled]
+            results = {}
+            pending = {}
+            for graph, key in zip(compiled, keys):
+                if key in results or key in pending:
+                    continue
+                metrics = self.cache.get(key)
+                if metrics is None:
+                    pending[key] = graph
+                else:
+                    results[key] = metrics
+        
+        if pending:
+            for key, metrics in zip(pending, evaluate(list(pending.values()))):
+                self.cache.put(key, metrics)
+                results[key] = metrics
+        return [dict(results[key]) for key in keys]
+    
+    def _cache_settings(self, method, **options):
+        """Huella de los ajustes que determinan el resultado de una evaluación"""
+        return settings_fingerprint({
+            "method": method,
+            "options": options,
+            "n_respondents": self.n_respondents,
+            "n_simulations": self.n_simulations,
+            "theta": [self.theta_mean, self.theta_std],
+            "mode": self.mode,
+            "n_quadrature": self.n_quadrature,
+            "chunk_size": self.chunk_size,
+            "n_groups": self.n_groups,
+            "weights": self.METRIC_WEIGHTS,
+            "seed": [str(self.seed_sequence.entropy), list(self.seed_sequence.spawn_key)]
+        })
+    
+    def _structural_metrics(self, graph):
+        """Métricas que dependen solo de la estructura y los parámetros (sin simulación)"""
+        stage = self.instrumentation.stage
+        with stage("validity"):
+            validity = self.calculate_validity(graph)
+        with stage("discrimination_power"):
+            discrimination = self.calculate_discrimination(graph)
+        with stage("model_fit"):
+            model_fit = self.calculate_model_fit(graph)
         return {
-            "reliability": self.calculate_reliability(graph, response_data),
-            "validity": self.calculate_validity(graph),
-            "discrimination_power": self.calculate_discrimination(graph),
-            "model_fit": self.calculate_model_fit(graph),
-            "bias_indicators": self.calculate_bias_indicators(graph, response_data)
+            "validity": validity,
+            "discrimination_power": discrimination,
+            "model_fit": model_fit
         }
     
+    @staticmethod
+    def _combine_metrics(structural, reliability, bias_indicators):
+        """Diccionario de métricas en el orden habitual de los informes"""
+        return {
+            "reliability": reliability,
+            "validity": structural["validity"],
+            "discrimination_power": structural["discrimination_power"],
+            "model_fit": structural["model_fit"],
+            "bias_indicators": bias_indicators
+        }
+    
+    def _overall_score(self, metrics):
+        """Calcular puntuación global solo si las métricas existen"""
+        return sum(metrics[key] * w for key, w in self.METRIC_WEIGHTS.items() if key in metrics)
+    
+    def _population_run_metrics(self, population, n_simulations=None):
+        """
+        Métricas Monte Carlo de cada candidato y réplica: {métrica: array (K, n_simulations)}.
+        Con un backend paralelo, los candidatos se reparten en lotes que usan las
+        mismas semillas por réplica y bloque, de modo que el resultado no depende
+        del backend ni del tamaño de los lotes.
+        """
+        n_simulations = n_simulations or self.n_simulations
+        run_seeds = None if self.mode == "expected" else self._next_seed().spawn(n_simulations)
+        batches = self._batches(len(population))
+        if len(batches) <= 1:
+            self.simulations_run += self._simulation_count(population, run_seeds)
+            return self._batch_run_metrics(population, run_seeds, n_simulations)
+        
+        executor = self._get_executor()
+        futures = [
+            executor.submit(_evaluate_batch, self, population.subset(batch).compact(), run_seeds)
+            for batch in batches
+        ]
+        results = [future.result() for future in futures]
+        # Los contadores se suman aquí: los trabajadores usan copias del evaluador
+        # (procesos) o comparten este desde varios hilos
+        self.simulations_run += sum(count for _, count, _ in results)
+        if self.backend == "process":
+            for _, _, report in results:
+                self.instrumentation.merge(report)
+        return {
+            key: np.concatenate([metrics[key] for metrics, _, _ in results])
+            for key in ("reliability", "bias_indicators")
+        }
+    
+    def _batches(self, n_candidates):
+        """Índices de candidatos de cada lote (en orden)"""
+        if self.backend == "serial" or n_candidates <= 1:
+            return [np.arange(n_candidates)]
+        batch_size = self.batch_size or -(-n_candidates // self.n_workers)
+        return [np.arange(start, min(start + batch_size, n_candidates))
+                for start in range(0, n_candidates, batch_size)]
+    
+    def _get_executor(self):
+        """Pool de trabajadores reutilizado entre generaciones"""
+        if self._executor is None:
+            executor_class = ProcessPoolExecutor if self.backend == "process" else ThreadPoolExecutor
+            self._executor = executor_class(max_workers=self.n_workers)
+        return self._executor
+    
+    def _get_chunk_executor(self):
+        """Hilos que simulan bloques de personas, reutilizados durante toda la vida del evaluador"""
+        if self._chunk_executor is None:
+            self._chunk_executor = ThreadPoolExecutor(max_workers=self.n_jobs)
+        return self._chunk_executor
+    
+    @staticmethod
+    def _simulation_count(population, run_seeds):
+        """Réplicas Monte Carlo (candidato × réplica) que simula un lote"""
+        if run_seeds is None or population.max_items == 0:
+            return 0
+        return len(population) * len(run_seeds)
+    
+    def _batch_run_metrics(self, population, run_seeds, n_simulations=None):
+        """Métricas de un lote de candidatos con las semillas de réplica indicadas"""
+        n_simulations = len(run_seeds) if run_seeds is not None else n_simulations or self.n_simulations
+        n_candidates = len(population)
+        reliability = np.zeros((n_candidates, n_simulations))
+        bias = np.ones((n_candidates, n_simulations))
+        if population.max_items == 0:
+            return {"reliability": reliability, "bias_indicators": bias}
+        
+        if self.mode == "expected":
+            # Sin ruido Monte Carlo: todas las réplicas coinciden con el valor esperado
+            stage = self.instrumentation.stage
+            with stage("quadrature") as timer:
+                expected = expected_statistics(population, self.theta_mean, self.theta_std, self.n_quadrature)
+                timer.record(*expected.values())
+            with stage("reliability"):
+                reliability[:] = alpha_from_variances(expected['item_var'], expected['total_var'], population)[:, np.newaxis]
+            with stage("bias_indicators"):
+                bias[:] = expected_bias(
+                    expected['stratified_var'], population, self.n_respondents, self.n_groups
+                )[:, np.newaxis]
+            return {"reliability": reliability, "bias_indicators": bias}
+        
+        # Bloques de personas; cada bloque tiene su propio flujo aleatorio para que
+        # el resultado no dependa del número de hilos
+        chunk_size = self.chunk_size or self.n_respondents
+        chunk_sizes = [min(chunk_size, self.n_respondents - start)
+                       for start in range(0, self.n_respondents, chunk_size)]
+        for run, run_seed in enumerate(run_seeds):
+            # spawn() avanza el contador del padre: se usa una copia para que
+            # todos los lotes obtengan los mismos bloques
+            chunk_seeds = np.random.SeedSequence(
+                run_seed.entropy, spawn_key=run_seed.spawn_key, pool_size=run_seed.pool_size
+            ).spawn(len(chunk_sizes))
+            # Cada bloque se suma al acumulador en cuanto termina; las sumas son
+            # enteras, así que el orden de llegada no cambia el resultado
+            accumulator = StatisticsAccumulator(population, self.n_groups, self.n_respondents)
+            if self.n_jobs > 1 and len(chunk_sizes) > 1:
+                executor = self._get_chunk_executor()
+                futures = [executor.submit(self._simulate_chunk, population, size, seed, accumulator)
+                           for size, seed in zip(chunk_sizes, chunk_seeds)]
+                done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+                for future in pending:
+                    future.cancel()
+                for future in done:
+                    future.result()
+            else:
+                for size, seed in zip(chunk_sizes, chunk_seeds):
+                    self._simulate_chunk(population, size, seed, accumulator)
+            stats = accumulator.statistics()
+            with self.instrumentation.stage("reliability"):
+                reliability[:, run] = reliability_from_statistics(stats, population)
+            with self.instrumentation.stage("bias_indicators"):
+                bias[:, run] = bias_from_statistics(stats, population)
+        
+        return {"reliability": reliability, "bias_indicators": bias}
+    
+    def _simulate_chunk(self, population, n_respondents, seed, accumulator):
+        """Simula un bloque de personas para toda la población y suma sus estadísticos suficientes al acumulador"""
+        stage = self.instrumentation.stage
+        with stage("simulation") as timer:
+            rng = np.random.default_rng(seed)
+            # Extracciones compartidas por toda la población
+            theta = rng.normal(self.theta_mean, self.theta_std, n_respondents)
+            uniform = rng.random((n_respondents, population.max_items), dtype=np.float32)
+            group = rng.integers(0, self.n_groups, size=n_respondents)
+            
+            if population.is_polytomous:
+                # Respuesta graduada / crédito parcial (categorías int8)
+                responses = simulate_polytomous(
+                    theta,
+                    population.discrimination[:, np.newaxis, :],
+                    population.guessing[:, np.newaxis, :],
+                    population.thresholds[:, np.newaxis, :, :],
+                    uniform,
+                    population.pcm_mask[:, np.newaxis, :]
+                )
+            else:
+                responses = simulate_dichotomous(
+                    theta,
+                    population.difficulty[:, np.newaxis, :],
+                    population.discrimination[:, np.newaxis, :],
+                    population.guessing[:, np.newaxis, :],
+                    uniform
+                )
+            timer.record(theta, uniform, group, responses)
+        
+        # Sumas para el alfa y tabla de DIF (número de estratos fijo para sumar bloques)
+        with stage("reliability") as timer:
+            timer.record(*accumulator.add_moments(responses, population.membership).values())
+        with stage("bias_indicators"):
+            accumulator.add_dif(responses, group)
+    
+    def _evaluate_single_run(self, graph, response_data=None):
+        """Ejecuta una sola evaluación del grafo"""
+        stage = self.instrumentation.stage
+        with stage("compile"):
+            graph = self._compiled(graph)
+        if response_data is None:
+            with stage("simulation") as timer:
+                response_data = self.simulate_responses(graph)
+                timer.record(response_data['theta'], response_data['responses'])
+        with stage("reliability"):
+            reliability = self.calculate_reliability(graph, response_data)
+        structural = self._structural_metrics(graph)
+        with stage("bias_indicators"):
+            bias_indicators = self.calculate_bias_indicators(graph, response_data)
+        return self._combine_metrics(structural, reliability, bias_indicators)
+    
+    def _next_seed(self):
+        """Flujo aleatorio independiente para la siguiente evaluación"""
+        return self.seed_sequence.spawn(1)[0]
+    
+    @staticmethod
+    def _compiled(graph):
+        """Acepta un PsychometricGraph o su instantánea compilada"""
+        return graph if isinstance(graph, CompiledGraph) else graph.compile()
+    
     # --- Métodos de simulación y cálculo (copiados desde test_graph.py) ---
-    def simulate_responses(self, graph):
-        """Simula respuestas para todos los ítems del grafo usando modelos IRT"""
-        items = [node_id for node_id, node in graph.nodes.items() if node.type == "item"]
-        n_items = len(items)
+    def simulate_responses(self, graph, n_simulations=None):
+        """
+        Simula respuestas para todos los ítems del grafo usando modelos IRT
+        (3PL dicotómico, respuesta graduada o crédito parcial según el ítem).
+        Args:
+            n_simulations: Si se indica, simula todas las réplicas en un solo
+                paso y devuelve tensores (n_simulations, n_respondents, n_items)
+        """
+        compiled = self._compiled(graph)
+        item_ids = compiled.item_ids
+        difficulty, discrimination, guessing = compiled.item_parameters()
+        shape = (self.n_respondents,) if n_simulations is None else (n_simulations, self.n_respondents)
         
-        if n_items == 0:
+        if len(item_ids) == 0:
             return {
                 'theta': np.array([]),
-                'responses': np.zeros((self.n_respondents, 0)),
+                'responses': np.zeros(shape + (0,), dtype=np.uint8),
                 'item_ids': []
             }
         
         # Generar habilidades latentes (theta)
-        theta = np.random.normal(self.theta_mean, self.theta_std, self.n_respondents)
-        responses = np.zeros((self.n_respondents, n_items))
-        
-        for j, item_id in enumerate(items):
-            item_node = graph.get_node(item_id)
-            params = item_node.properties.get("irt_parameters", {})
-            difficulty = params.get("difficulty", 0.5)
-            discrimination = params.get("discrimination", 1.0)
-            guessing = params.get("guessing", 0.0)
-            
-            logit = discrimination * (theta - difficulty)
-            prob = guessing + (1 - guessing) / (1 + np.exp(-logit))
-            responses[:, j] = (prob > np.random.uniform(0, 1, self.n_respondents)).astype(int)
+        rng = np.random.default_rng(self._next_seed())
+        theta = rng.normal(self.theta_mean, self.theta_std, shape)
+        uniform = rng.random(shape + (len(item_ids),), dtype=np.float32)
+        if compiled.is_polytomous:
+            population = CompiledPopulation([compiled])
+            responses = simulate_polytomous(
+                theta, population.discrimination[0], population.guessing[0],
+                population.thresholds[0], uniform, population.pcm_mask[0]
+            )
+        else:
+            responses = simulate_dichotomous(theta, difficulty, discrimination, guessing, uniform)
         
         return {
             'theta': theta,
             'responses': responses,
-            'item_ids': items
+            'item_ids': item_ids
         }
     
     def calculate_reliability(self, graph, response_data):
         """Calcula la fiabilidad promedio (Alfa de Cronbach) por constructo"""
+        compiled = self._compiled(graph)
         responses = response_data['responses']
-        item_ids = response_data['item_ids']
         
         if responses.size == 0:
             return 0.0
         
         reliabilities = []
-        construct_items = {}
-        
-        # Agrupar ítems por constructo
-        for (source, target), edge in graph.edges.items():
-            if edge.type == "measures":
-                if target not in construct_items:
-                    construct_items[target] = []
-                if source in item_ids:
-                    construct_items[target].append(item_ids.index(source))
-        
-        # Calcular fiabilidad para cada constructo
-        for construct, item_indices in construct_items.items():
+        
+        # Calcular fiabilidad para cada constructo (ítems agrupados en formato CSR)
+        for construct, item_indices in compiled.iter_constructs():
             if len(item_indices) < 2:
                 continue
                 
@@ -116,80 +663,60 @@ class PsychometricEvaluator:
     
     def calculate_validity(self, graph):
         """Calcula la validez convergente promedio"""
-        validities = []
-        
-        for (source, target), edge in graph.edges.items():
-            if edge.type == "measures":
-                strength = edge.properties.get("strength")
-                if strength is None:
-                    item_node = graph.get_node(source)
-                    if item_node and item_node.type == "item":
-                        strength = item_node.properties.get("irt_parameters", {}).get("discrimination", 1.0)
-                    else:
-                        strength = 1.0
-                
-                validity = min(1.0, max(0.3, abs(strength) * 0.7)) 
-                validities.append(validity)
+        compiled = self._compiled(graph)
+        measures = compiled.edge_mask("measures")
+        if not measures.any():
+            return 0.0
         
-        return np.mean(validities) if validities else 0.0
+        # Sin 'strength' explícita se usa la discriminación del ítem origen (o 1.0)
+        strength = compiled.edge_strength[measures]
+        source_item = compiled.edge_source_item[measures]
+        discrimination = np.append(compiled.discrimination, np.nan)[source_item]
+        fallback = np.where(np.isnan(discrimination), 1.0, discrimination)
+        strength = np.where(np.isnan(strength), fallback, strength)
+        
+        validities = np.clip(np.abs(strength) * 0.7, 0.3, 1.0)
+        return np.mean(validities)
     
     def calculate_discrimination(self, graph):
         """Calcula el poder discriminativo promedio"""
-        discriminations = []
-        
-        for node_id, node in graph.nodes.items():
-            if node.type == "item":
-                discrimination = node.properties.get("irt_parameters", {}).get("discrimination", 0)
-                normalized = (discrimination - 0.3) / (3.0 - 0.3)
-                discriminations.append(max(0, min(1, normalized)))
+        compiled = self._compiled(graph)
+        if compiled.n_items == 0:
+            return 0.0
         
-        return np.mean(discriminations) if discriminations else 0.0
+        discrimination = np.nan_to_num(compiled.discrimination, nan=0.0)
+        normalized = (discrimination - 0.3) / (3.0 - 0.3)
+        return np.mean(np.clip(normalized, 0, 1))
     
     def calculate_model_fit(self, graph):
         """Calcula el ajuste del modelo"""
+        compiled = self._compiled(graph)
         fit_score = 0.7  # Valor base
         
-        for (source, target), edge in graph.edges.items():
-            if edge.type == "correlates_with":
-                if "empirical_support" in edge.properties:
-                    fit_score += 0.05
-                if "correlation" in edge.properties:
-                    fit_score += 0.03
+        correlates = compiled.edge_mask("correlates_with")
+        fit_score += 0.05 * np.count_nonzero(compiled.edge_has_support[correlates])
+        fit_score += 0.03 * np.count_nonzero(~np.isnan(compiled.edge_correlation[correlates]))
         
         # Penalizar constructos con pocos ítems
-        construct_items = {}
-        for (source, target), edge in graph.edges.items():
-            if edge.type == "measures":
-                if target not in construct_items:
-                    construct_items[target] = 0
-                construct_items[target] += 1
-        
-        for count in construct_items.values():
-            if count < 3:
-                fit_score -= 0.1
-            elif count > 5:
-                fit_score += 0.05
+        counts = compiled.measures_per_node[compiled.measures_per_node > 0]
+        fit_score -= 0.1 * np.count_nonzero(counts < 3)
+        fit_score += 0.05 * np.count_nonzero(counts > 5)
         
         return max(0.5, min(0.95, fit_score))
     
-    def calculate_bias_indicators(self, graph, response_data):
-        """Calcula indicadores de sesgo potencial (DIF simplificado)"""
+    def calculate_bias_indicators(self, graph, response_data, rng=None):
+        """Calcula indicadores de sesgo potencial (DIF de Mantel-Haenszel, STD P-DIF)"""
         responses = response_data['responses']
-        item_ids = response_data['item_ids']
         
         if responses.size == 0:
             return 1.0
         
-        group = np.random.choice([0, 1], size=self.n_respondents)
-        bias_scores = []
-        
-        for item_id in item_ids:
-            item_idx = item_ids.index(item_id)
-            item_responses = responses[:, item_idx]
-            group0_mean = np.mean(item_responses[group == 0])
-            group1_mean = np.mean(item_responses[group == 1])
-            diff = abs(group0_mean - group1_mean)
-            bias_score = 1.0 - min(1.0, diff * 3)
-            bias_scores.append(bias_score)
+        # Asignación aleatoria de grupos con un flujo propio (o el indicado)
+        rng = rng or np.random.default_rng(self._next_seed())
+        group = rng.integers(0, self.n_groups, size=len(responses))
+        dif = mantel_haenszel(responses, group, n_groups=self.n_groups)
+        diff = np.abs(np.nan_to_num(dif['std_p_dif'], nan=0.0)).mean(axis=0)
+        diff = diff / (self._compiled(graph).n_categories - 1)  # Escala [0, 1] en ítems politómicos
+        bias_scores = 1.0 - np.minimum(1.0, diff * 3)
         
-        return np.mean(bias_scores) if bias_scores else 1.0
\ No newline at end of file
+        return np.mean(bias_scores)
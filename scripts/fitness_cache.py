@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+import numpy as np
+from compiled_graph import CompiledGraph
+
+
+# Campos de la instantánea compilada que determinan la evaluación
+_FINGERPRINT_ARRAYS = (
+    "difficulty", "discrimination", "guessing", "n_categories", "thresholds", "response_model",
+    "edge_source", "edge_target", "edge_type", "edge_strength", "edge_correlation", "edge_has_support"
+)
+
+
+def graph_fingerprint(graph):
+    """
+    Huella sha256 del contenido del grafo: nodos y tipos, parámetros IRT,
+    aristas y sus propiedades (strength, correlation, empirical_support).
+    Dos grafos con el mismo contenido en el mismo orden tienen la misma huella,
+    aunque sean objetos distintos. Acepta un PsychometricGraph o un CompiledGraph.
+    """
+    compiled = graph if isinstance(graph, CompiledGraph) else graph.compile()
+    digest = hashlib.sha256()
+    for labels in (compiled.node_ids, compiled.node_types, compiled.relationship_types):
+        digest.update("\x1f".join(map(str, labels)).encode("utf-8"))
+        digest.update(b"\x1e")
+    for name in _FINGERPRINT_ARRAYS:
+        array = np.ascontiguousarray(getattr(compiled, name))
+        digest.update(f"{name}:{array.dtype.str}:{array.shape}".encode("ascii"))
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def settings_fingerprint(settings):
+    """Huella sha256 de un diccionario de ajustes serializable en JSON"""
+    return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _plain(value):
+    """Convierte escalares de NumPy a tipos de Python (para JSON)"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class FitnessCache:
+    """
+    Caché LRU de métricas de evaluación, indexada por la huella del grafo y la
+    de los ajustes del evaluador (incluida la semilla). Opcionalmente se guarda
+    en disco (JSON) para reutilizarla entre ejecuciones.
+    """
+
+    def __init__(self, max_size=10000, path=None):
+        """
+        Args:
+            max_size: Entradas máximas; al superarlo se descarta la menos usada
+                (None = sin límite)
+            path: Fichero JSON; si existe se carga y save() escribe en él
+        """
+        self.max_size = max_size
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    @staticmethod
+    def key(graph_hash, settings_hash):
+        return f"{settings_hash}:{graph_hash}"
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """Métricas guardadas (copia) o None; actualiza los contadores y el orden LRU"""
+        metrics = self._entries.get(key)
+        if metrics is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return dict(metrics)
+
+    def put(self, key, metrics):
+        self._entries[key] = {name: _plain(value) for name, value in metrics.items()}
+        self._entries.move_to_end(key)
+        if self.max_size is not None:
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """Contadores de uso: {'hits', 'misses', 'hit_rate', 'size', 'max_size'}"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "max_size": self.max_size
+        }
+
+    def to_dict(self):
+        """Estado completo (entradas en orden LRU y contadores), serializable en JSON"""
+        return {
+            "max_size": self.max_size,
+            "path": self.path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": [[key, metrics] for key, metrics in self._entries.items()]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        cache = cls(max_size=data["max_size"])
+        cache.path = data["path"]
+        for key, metrics in data["entries"]:
+            cache.put(key, metrics)
+        cache.hits = data["hits"]
+        cache.misses = data["misses"]
+        return cache
+
+    def save(self, path=None):
+        """Guarda las entradas (en orden LRU) en JSON con escritura atómica"""
+        path = path or self.path
+        if path is None:
+            raise ValueError("No se ha indicado fichero para guardar la caché")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "entries": list(self._entries.items())}, f)
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        """Añade las entradas de un fichero guardado con save()"""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != 1:
+            raise ValueError(f"Versión de caché no soportada: {data.get('version')}")
+        for key, metrics in data["entries"]:
+            self.put(key, metrics)
@@ -1,60 +1,201 @@
 # genetic_optimizer.py
-import copy
-import random
+import asyncio
+import contextlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from graph_generator import GraphGenerator
+from rng import as_seed_sequence
 from validator import PsychometricValidator
 from evaluator import PsychometricEvaluator
+from genome import GenomeEncoding, GenomePopulation, mutate, crossover
+from fitness_cache import FitnessCache
+from surrogate import RidgeSurrogate, genome_features, prediction_accuracy
+from pareto import non_dominated_sort, crowding_distance, select_survivors, tournament
+from checkpoint import (
+    CheckpointWriter, encode_graphs, decode_graphs, encode_cache, decode_cache, history_lines,
+    save_checkpoint, load_checkpoint, seed_sequence_state, restore_seed_sequence, graph_array,
+    graph_from_array
+)
 
 class GeneticOptimizer:
-    def __init__(self, base_graph, population_size=12, mutation_rate=0.2):
-        self.base_graph = base_graph
+    REPRESENTATIONS = ("graph", "genome")
+    SURROGATE_EXPLORATION = 0.25  # Fracción de hijos cribados que se elige al azar
+    PHASES = ("select", "crossover", "mutate", "validate", "evaluate", "surrogate")
+    
+    def __init__(self, base_graph, population_size=12, mutation_rate=0.2, evaluator=None, seed=None,
+                 racing=False, race_options=None, instrumentation=None, backend="serial", n_workers=None,
+                 cache=None, representation="graph", surrogate=None, surrogate_factor=4, objectives=None):
+        """
+        Args:
+            evaluator: PsychometricEvaluator a usar (p. ej. con mode='expected' para
+                puntuaciones deterministas); por defecto, Monte Carlo con 3000 personas
+            seed: Semilla (int, SeedSequence o numpy.random.Generator). De ella se
+                derivan flujos independientes para la evaluación, la selección y
+                la mutación de cada candidato, de modo que evolve() es reproducible
+            racing: Si es True, la población se evalúa por rondas y se dejan de
+                simular los candidatos claramente peores que la élite
+                (ver PsychometricEvaluator.race_population)
+            race_options: Argumentos adicionales para race_population
+                (z, tolerance, min_simulations, max_simulations)
+            instrumentation: Activa el registro de tiempos por etapa del evaluador
+                por defecto (True o un Instrumentation compartido). Las fases del
+                algoritmo (validation, selection, variation) se registran en el
+                mismo objeto que las del evaluador
+            backend, n_workers: Evaluación paralela de la población con el evaluador
+                por defecto ('serial', 'thread' o 'process'; ver PsychometricEvaluator)
+            cache: FitnessCache (o True) del evaluador por defecto: las élites y los
+                grafos repetidos no se vuelven a simular. Si la caché tiene fichero,
+                se guarda al terminar evolve()
+            representation: 'graph' (un PsychometricGraph por candidato) o 'genome'
+                (población en arrays de parámetros y máscaras de aristas, ver
+                genome.py: mutación, cruce y evaluación se hacen en bloque y solo
+                se decodifica a grafo la mejor solución). En modo 'genome' no se
+                usan racing ni la caché
+            surrogate: Modelo sustituto para cribar la descendencia (True para un
+                RidgeSurrogate o una instancia con update/predict/is_trained). Se
+                reentrena cada generación con las puntuaciones reales y, una vez
+                entrenado, se generan surrogate_factor veces más hijos de los
+                necesarios y solo se evalúan los de mejor predicción (más una
+                fracción al azar, SURROGATE_EXPLORATION). La precisión de las
+                predicciones queda en history[...]["surrogate"]
+            objectives: Modo multiobjetivo NSGA-II (True para todas las métricas de
+                PsychometricEvaluator.METRIC_WEIGHTS o una lista de ellas): en lugar
+                de overall_score se conserva el vector de métricas de cada
+                candidato, la supervivencia usa frentes no dominados y distancia de
+                hacinamiento, y pareto_front() devuelve los grafos del frente.
+                best_solution sigue siendo el de mejor overall_score. No admite
+                racing ni surrogate
+        """
+        if representation not in self.REPRESENTATIONS:
+            raise ValueError(f"Representación desconocida: {representation} "
+                             f"(opciones: {', '.join(self.REPRESENTATIONS)})")
+        if objectives is True:
+            objectives = list(PsychometricEvaluator.METRIC_WEIGHTS)
+        if objectives is not None:
+            unknown = [name for name in objectives if name not in PsychometricEvaluator.METRIC_WEIGHTS]
+            if unknown:
+                raise ValueError(f"Objetivos desconocidos: {', '.join(unknown)}")
+            if racing or surrogate:
+                raise ValueError("El modo multiobjetivo no admite racing ni surrogate")
+        # Los clones de la población dejan de solo lectura los elementos que
+        # comparten: se trabaja sobre una copia para no bloquear el grafo recibido
+        self.base_graph = base_graph.copy()
         self.population_size = population_size
         self.mutation_rate = mutation_rate
-        self.evaluator = PsychometricEvaluator(n_respondents=3000, n_simulations=3)
+        self.seed_sequence = as_seed_sequence(seed)
+        evaluation_seed, selection_seed, self.variation_seed = self.seed_sequence.spawn(3)
+        self.rng = np.random.default_rng(selection_seed)
+        self.evaluator = evaluator or PsychometricEvaluator(
+            n_respondents=3000, n_simulations=3, seed=evaluation_seed,
+            instrumentation=instrumentation, backend=backend, n_workers=n_workers,
+            cache=cache
+        )
+        self.instrumentation = self.evaluator.instrumentation
+        self.racing = racing
+        self.race_options = race_options or {}
+        self.simulations_run = 0  # Réplicas Monte Carlo por candidato acumuladas
         self.validator = PsychometricValidator()
-        self.population = self._initialize_population()
-        self.best_solution = copy.deepcopy(base_graph)
+        self.representation = representation
+        self.surrogate = RidgeSurrogate() if surrogate is True else surrogate or None
+        self.surrogate_factor = surrogate_factor
+        self._predicted = None  # Predicción del sustituto para cada candidato de la población
+        self.objectives = list(objectives) if objectives is not None else None
+        self._pareto_metrics = None  # Métricas (N, METRIC_COLUMNS) de la población en modo NSGA-II
+        self._compiled_graphs = {}  # id(grafo) -> (grafo, CompiledGraph o None), ver _compile
+        if representation == "genome" or self.surrogate is not None:
+            self.encoding = GenomeEncoding(self.base_graph)
+        if representation == "genome":
+            self.population = self._initialize_genomes()
+        else:
+            self.population = self._initialize_population()
+        self.best_genome = None
+        self._ranking = None  # Última evaluación ordenada (para migraciones)
+        self.generation = 0  # Generaciones completadas (continúa tras resume)
+        self.history = []  # Historial acumulado de todas las llamadas a evolve
+        self.evaluations = 0  # Candidatos enviados al evaluador
+        self.stop_reason = None  # Motivo de parada de la última llamada a iter_evolve
+        self._phase_seconds = dict.fromkeys(self.PHASES, 0.0)
+        self._checkpoint_writer = None
+        self._history_file = None  # (ruta, registros, bytes) del historial ya escrito en disco
+        self.best_solution = base_graph.copy()
         self.best_score = self._evaluate_graph(base_graph)
     
+    def instrumentation_report(self):
+        """Informe por etapa acumulado de todas las generaciones (ver Instrumentation.report)"""
+        return self.instrumentation.report()
+    
     def _evaluate_graph(self, graph):
         """Evalúa un grafo y devuelve su puntuación"""
         if self.validator.validate(graph):
             return self.evaluator.evaluate_graph(graph)["overall_score"]
         return -1
     
+    def _candidate_generator(self, mutation_rate):
+        """Generador de mutaciones con un flujo aleatorio propio para cada candidato"""
+        return GraphGenerator(mutation_rate=mutation_rate, seed=self.variation_seed.spawn(1)[0])
+    
     def _initialize_population(self):
         """Crea población inicial con el grafo base y variantes conservadoras"""
-        population = [copy.deepcopy(self.base_graph)]  # Grafo original
+        population = [self.base_graph.clone()]  # Grafo original
         
-        generator = GraphGenerator(mutation_rate=self.mutation_rate/2)
         for i in range(self.population_size - 1):
-            variant = generator.generate_variant(self.base_graph)
+            variant = self._candidate_generator(self.mutation_rate/2).generate_variant(self.base_graph)
             population.append(variant)
         
         return population
     
+    def _initialize_genomes(self):
+        """Población inicial de genomas: el grafo base y variantes conservadoras"""
+        variants = mutate(self.encoding.base_population(self.population_size - 1), self.encoding,
+                          self._variation_rng(), self.mutation_rate / 2)
+        return GenomePopulation.concatenate([self.encoding.base_population(1), variants])
+    
+    def _variation_rng(self):
+        """Flujo aleatorio propio para las mutaciones en bloque de una generación"""
+        return np.random.default_rng(self.variation_seed.spawn(1)[0])
+    
     def evaluate_population(self):
         """Evalúa y ordena la población por puntuación"""
+        # Validar antes de evaluar (con la misma instantánea compilada que se evalúa)
+        valid_graphs = []
+        valid_compiled = []
+        with self.instrumentation.stage("validation"), self._phase("validate"):
+            for graph, compiled in zip(self.population, self._compile(self.population)):
+                validation_results = self.validator.validate(graph, compiled)
+                if all(result["valid"] for result in validation_results.values()):
+                    valid_graphs.append(graph)
+                    valid_compiled.append(compiled)
+        
+        # Evaluación conjunta de los candidatos válidos (números aleatorios comunes);
+        # solo se cuentan las réplicas realmente simuladas (no las de la caché)
+        simulations_before = self.evaluator.simulations_run
+        with self._phase("evaluate"):
+            if self.racing:
+                population_metrics = self.evaluator.race_population(valid_compiled, elite_size=3, **self.race_options)
+            else:
+                population_metrics = self.evaluator.evaluate_population(valid_compiled)
+        self.simulations_run += self.evaluator.simulations_run - simulations_before
+        self.evaluations += len(valid_graphs)
+        scores = {
+            id(graph): metrics["overall_score"]
+            for graph, metrics in zip(valid_graphs, population_metrics)
+        }
+        
         evaluated = []
         for graph in self.population:
-            # Validar antes de evaluar
-            validation_results = self.validator.validate(graph)
-            all_valid = all(result["valid"] for result in validation_results.values())
+            score = scores.get(id(graph), -1)
+            evaluated.append((score, graph))
             
-            if all_valid:
-                score = self._evaluate_graph(graph)
-                evaluated.append((score, graph))
-                
-                # Actualizar mejor solución global
-                if score > self.best_score:
-                    self.best_score = score
-                    self.best_solution = copy.deepcopy(graph)
-            else:
-                evaluated.append((-1, graph))
+            # Actualizar mejor solución global
+            if score > self.best_score:
+                self.best_score = score
+                self.best_solution = graph.copy()
         
         # Ordenar de mejor a peor
         evaluated.sort(key=lambda x: x[0], reverse=True)
+        self._ranking = evaluated
         return evaluated
     
     def select_parents(self, evaluated_population, elite_size=3):
@@ -68,13 +209,14 @@ class GeneticOptimizer:
         # Mantener diversidad: seleccionar individuos diversos
         valid_candidates = [item for item in evaluated_population if item[0] > 0]
         if len(valid_candidates) > elite_size:
-            diverse_sample = random.sample(valid_candidates[elite_size:], 
-                                          min(2, len(valid_candidates)-elite_size))
-            parents.extend([graph for _, graph in diverse_sample])
+            diverse_idx = self.rng.choice(len(valid_candidates) - elite_size,
+                                          min(2, len(valid_candidates)-elite_size), replace=False)
+            parents.extend([valid_candidates[elite_size + i][1] for i in diverse_idx])
         
         # Completar con selección por torneo
         while len(parents) < self.population_size and len(valid_candidates) > 1:
-            candidates = random.sample(valid_candidates, min(3, len(valid_candidates)))
+            candidates = [valid_candidates[i] for i in
+                          self.rng.choice(len(valid_candidates), min(3, len(valid_candidates)), replace=False)]
             best_candidate = max(candidates, key=lambda x: x[0])
             parents.append(best_candidate[1])
             # Remover para evitar duplicados
@@ -82,62 +224,733 @@ class GeneticOptimizer:
         
         # Completar con copias del base si es necesario
         while len(parents) < self.population_size:
-            parents.append(copy.deepcopy(self.base_graph))
+            parents.append(self.base_graph.clone())
         
         return parents
     
     def crossover(self, parent1, parent2):
         """Combina dos grafos heredando los mejores parámetros"""
-        child_graph = copy.deepcopy(parent1)
+        # Copia con estructura compartida: solo se duplican los ítems que heredan parámetros
+        child_graph = parent1.clone()
         
-        for node_id, parent2_node in parent2.nodes.items():
+        for node_id in parent2.nodes_of_type("item"):
             if node_id in child_graph.nodes and child_graph.nodes[node_id].type == "item":
                 child_params = child_graph.nodes[node_id].properties["irt_parameters"]
-                parent2_params = parent2_node.properties["irt_parameters"]
+                parent2_params = parent2.nodes[node_id].properties["irt_parameters"]
                 
-                # Heredar la mejor discriminación
-                if parent2_params["discrimination"] > child_params["discrimination"]:
-                    child_params["discrimination"] = parent2_params["discrimination"]
+                # Heredar la mejor discriminación y la dificultad más cercana al rango óptimo [-1,1]
+                inherit_discrimination = parent2_params["discrimination"] > child_params["discrimination"]
+                inherit_difficulty = abs(parent2_params["difficulty"]) < abs(child_params["difficulty"])
+                if not (inherit_discrimination or inherit_difficulty):
+                    continue
                 
-                # Heredar dificultad si está más cerca del rango óptimo [-1,1]
-                if abs(parent2_params["difficulty"]) < abs(child_params["difficulty"]):
+                child_params = child_graph.mutable_node(node_id).properties["irt_parameters"]
+                if inherit_discrimination:
+                    child_params["discrimination"] = parent2_params["discrimination"]
+                if inherit_difficulty:
                     child_params["difficulty"] = parent2_params["difficulty"]
         
         return child_graph
     
-    def evolve(self, generations=10):
-        """Ejecuta el proceso evolutivo mejorado"""
-        history = []
+    def evaluate_genomes(self):
+        """
+        Evalúa la población de genomas y actualiza la mejor solución.
+        Returns:
+            (puntuaciones (P,), índices de mejor a peor)
+        """
+        scores = self._genome_metrics(self.population)["overall_score"]
+        order = np.argsort(-scores, kind="stable")
+        if len(order) and scores[order[0]] > self.best_score:
+            self.best_score = scores[order[0]]
+            self.best_genome = self.population.take(order[:1])
+        self._ranking = (scores, order, self.population)
+        return scores, order
+    
+    def _genome_metrics(self, genomes):
+        """
+        Métricas de una GenomePopulation ({métrica: array (P,)}): como con los
+        grafos, solo se evalúan los genomas válidos y los demás tienen -1 en
+        todas las métricas
+        """
+        with self.instrumentation.stage("validation"), self._phase("validate"):
+            valid = np.flatnonzero(self.encoding.valid(genomes))
+        metrics = {name: np.full(len(genomes), -1.0) for name in self.metric_columns}
+        simulations_before = self.evaluator.simulations_run
+        if len(valid):
+            with self._phase("evaluate"):
+                evaluated = self.evaluator.evaluate_genomes(self.encoding, genomes.take(valid))
+            for name in metrics:
+                metrics[name][valid] = evaluated[name]
+        self.simulations_run += self.evaluator.simulations_run - simulations_before
+        self.evaluations += len(valid)
+        return metrics
+    
+    def migrants(self, n=2):
+        """
+        Mejores candidatos válidos de la última evaluación, de mejor a peor:
+        lista de (puntuación, candidato), donde el candidato es un grafo o un
+        GenomePopulation de una fila según la representación
+        """
+        if self._ranking is None:
+            return []
+        if self.representation == "genome":
+            scores, order, population = self._ranking
+            return [(float(scores[k]), population.take([k])) for k in order[:n] if scores[k] > 0]
+        return [(score, graph) for score, graph in self._ranking[:n] if score > 0]
+    
+    def receive_migrants(self, migrants):
+        """Sustituye los últimos candidatos de la población actual por los inmigrantes"""
+        migrants = list(migrants)[:self.population_size]
+        if not migrants:
+            return
+        n = len(migrants)
+        self._pareto_metrics = None  # Se vuelven a evaluar en la siguiente generación
+        if self._predicted is not None:
+            self._predicted = self._predicted.copy()
+            self._predicted[-n:] = np.nan
+        if self.representation == "genome":
+            incoming = GenomePopulation.concatenate([candidate for _, candidate in migrants])
+            population = self.population.copy()
+            population.parameters[-n:] = incoming.parameters
+            population.edge_mask[-n:] = incoming.edge_mask
+            population.edge_weight[-n:] = incoming.edge_weight
+            self.population = population
+        else:
+            self.population = self.population[:-n] + [graph for _, graph in migrants]
+    
+    def select_genome_parents(self, scores, order, elite_size=3):
+        """
+        Índices de padres: élite, dos individuos diversos y torneos de 3 entre los
+        válidos (en bloque); si no hay válidos, el genoma base (índice -1)
+        """
+        valid = order[scores[order] > 0]
+        elite = valid[:elite_size]
+        parents = [elite]
+        if len(valid) > elite_size:
+            rest = valid[elite_size:]
+            parents.append(rest[self.rng.choice(len(rest), min(2, len(rest)), replace=False)])
+        n_missing = self.population_size - sum(len(p) for p in parents)
+        if n_missing > 0 and len(valid) > 1:
+            contestants = valid[self.rng.integers(0, len(valid), (n_missing, min(3, len(valid))))]
+            parents.append(contestants[np.arange(n_missing), scores[contestants].argmax(axis=1)])
+        parents = np.concatenate(parents)
+        return np.concatenate((parents, np.full(self.population_size - len(parents), -1)))
+    
+    def _genome_generations(self):
+        """Generaciones sobre arrays (representation='genome'); produce un registro por generación"""
+        base = self.encoding.base_population(1)
+        while True:
+            scores, order = self.evaluate_genomes()
+            record = {
+                "generation": self.generation + 1,
+                "best_score": scores[order[0]],
+                "global_best": self.best_score
+            }
+            self._train_surrogate(self.population, scores, record)
+            
+            with self.instrumentation.stage("selection"), self._phase("select"):
+                indices = self.select_genome_parents(scores, order)
+                pool = GenomePopulation.concatenate([self.population, base])
+                parents = pool.take(indices)
+            
+            # Élite directa y descendencia por cruce y mutación en bloque
+            n_children = self.population_size - 3
+            children = self._offspring(parents, self._n_candidates(n_children))
+            chosen, predicted = self._screen(children, n_children)
+            self.population = GenomePopulation.concatenate([parents.take(np.arange(3)), children.take(chosen)])
+            self._predicted = np.concatenate((np.full(3, np.nan), predicted))
+            yield record
+    
+    def _n_candidates(self, n_children):
+        """Hijos a generar: surrogate_factor veces más si el sustituto ya puede cribar"""
+        if self.surrogate is not None and self.surrogate.is_trained:
+            return n_children * self.surrogate_factor
+        return n_children
+    
+    def _screen(self, candidates, n):
+        """
+        Criba de candidatos (GenomePopulation) con el sustituto: los mejores
+        según la predicción y una fracción al azar del resto.
+        Returns:
+            (índices elegidos en orden, predicción de cada uno; NaN sin sustituto entrenado)
+        """
+        if self.surrogate is None or not self.surrogate.is_trained:
+            return np.arange(min(n, len(candidates))), np.full(min(n, len(candidates)), np.nan)
+        with self.instrumentation.stage("surrogate"), self._phase("surrogate"):
+            predicted = self.surrogate.predict(genome_features(candidates, self.encoding))
+            ranked = np.argsort(-predicted, kind="stable")
+            n_explore = int(round(n * self.SURROGATE_EXPLORATION)) if len(candidates) > n else 0
+            chosen = ranked[:n - n_explore]
+            if n_explore:
+                rest = ranked[n - n_explore:]
+                chosen = np.concatenate((chosen, rest[self.rng.choice(len(rest), n_explore, replace=False)]))
+            chosen = np.sort(chosen)
+        return chosen, predicted[chosen]
+    
+    def _train_surrogate(self, genomes, scores, record):
+        """
+        Compara las predicciones hechas al cribar con las puntuaciones reales
+        (en record["surrogate"]) y reentrena el sustituto con los candidatos válidos
+        """
+        if self.surrogate is None:
+            return
+        with self.instrumentation.stage("surrogate"), self._phase("surrogate"):
+            valid = scores > 0
+            if self._predicted is not None and len(self._predicted) == len(scores):
+                screened = valid & ~np.isnan(self._predicted)
+                if screened.any():
+                    record["surrogate"] = dict(prediction_accuracy(self._predicted[screened], scores[screened]),
+                                               n_train=getattr(self.surrogate, "n", None))
+            self.surrogate.update(genome_features(genomes.take(valid), self.encoding), scores[valid])
+    
+    @property
+    def metric_columns(self):
+        """Columnas de las matrices de métricas del modo multiobjetivo"""
+        return (*self.evaluator.METRIC_WEIGHTS, "overall_score")
+    
+    def _candidate_metrics(self, candidates):
+        """
+        Matriz (N, len(metric_columns)) de métricas de una población (lista de
+        grafos o GenomePopulation); los grafos no válidos tienen -1 en todas
+        """
+        columns = self.metric_columns
+        if self.representation == "genome":
+            metrics = self._genome_metrics(candidates)
+            return np.column_stack([metrics[name] for name in columns])
         
-        for gen in range(generations):
-            evaluated = self.evaluate_population()
-            best_in_gen = evaluated[0][0]
+        with self.instrumentation.stage("validation"), self._phase("validate"):
+            compiled = self._compile(candidates)
+            valid = [all(result["valid"] for result in self.validator.validate(graph, snapshot).values())
+                     for graph, snapshot in zip(candidates, compiled)]
+        values = np.full((len(candidates), len(columns)), -1.0)
+        valid_graphs = [snapshot for snapshot, ok in zip(compiled, valid) if ok]
+        simulations_before = self.evaluator.simulations_run
+        if valid_graphs:
+            with self._phase("evaluate"):
+                metrics = self.evaluator.evaluate_population(valid_graphs)
+            values[np.flatnonzero(valid)] = [[m[name] for name in columns] for m in metrics]
+        self.evaluations += len(valid_graphs)
+        self.simulations_run += self.evaluator.simulations_run - simulations_before
+        return values
+    
+    def _offspring(self, parents, n):
+        """n hijos por cruce y mutación de pares de padres distintos (lista o GenomePopulation)"""
+        with self.instrumentation.stage("variation"):
+            if self.representation == "genome":
+                return self._genome_offspring(parents, n)
+            return self._graph_offspring(parents, n)
+    
+    def _genome_offspring(self, parents, n):
+        with self._phase("crossover"):
+            first = self.rng.integers(0, len(parents), n)
+            second = (first + self.rng.integers(1, len(parents), n)) % len(parents)
+            children = crossover(parents.take(first), parents.take(second))
+        with self._phase("mutate"):
+            return mutate(children, self.encoding, self._variation_rng(), self.mutation_rate)
+    
+    def _graph_offspring(self, parents, n):
+        children = []
+        for _ in range(n):
+            with self._phase("crossover"):
+                parent1, parent2 = (parents[i] for i in self.rng.choice(len(parents), 2, replace=False))
+                child = self.crossover(parent1, parent2)
+            with self._phase("mutate"):
+                children.append(self._candidate_generator(self.mutation_rate).generate_variant(child))
+        return children
+    
+    def _take(self, candidates, indices):
+        if self.representation == "genome":
+            return candidates.take(indices)
+        return [candidates[i] for i in indices]
+    
+    def _pareto_generations(self):
+        """
+        Generaciones NSGA-II: padres por torneo binario (rango, hacinamiento),
+        hijos por cruce y mutación y supervivencia (mu + lambda) por frentes no
+        dominados sobre las métricas de self.objectives
+        """
+        columns = self.metric_columns
+        objective_columns = [columns.index(name) for name in self.objectives]
+        score_column = columns.index("overall_score")
+        while True:
+            if self._pareto_metrics is None:
+                self._pareto_metrics = self._candidate_metrics(self.population)
+            with self.instrumentation.stage("selection"), self._phase("select"):
+                objective_values = self._pareto_metrics[:, objective_columns]
+                ranks = non_dominated_sort(objective_values)
+                crowding = crowding_distance(objective_values, ranks)
+                parents = self._take(self.population, tournament(ranks, crowding, self.population_size, self.rng))
+            children = self._offspring(parents, self.population_size)
+            children_metrics = self._candidate_metrics(children)
             
-            history.append({
-                "generation": gen+1,
-                "best_score": best_in_gen,
-                "global_best": self.best_score
-            })
+            with self.instrumentation.stage("selection"), self._phase("select"):
+                if self.representation == "genome":
+                    union = GenomePopulation.concatenate([self.population, children])
+                else:
+                    union = self.population + children
+                metrics = np.concatenate((self._pareto_metrics, children_metrics))
+                survivors, ranks, _ = select_survivors(metrics[:, objective_columns], self.population_size)
+                self.population = self._take(union, survivors)
+                self._pareto_metrics = metrics[survivors]
             
-            print(f"Generación {gen+1}: Mejor en Generación = {best_in_gen:.4f}, Mejor Global = {self.best_score:.4f}")
+            scores = self._pareto_metrics[:, score_column]
+            best = int(np.argmax(scores))
+            if scores[best] > self.best_score:
+                self.best_score = scores[best]
+                if self.representation == "genome":
+                    self.best_genome = self.population.take([best])
+                else:
+                    self.best_solution = self.population[best].copy()
+            # Orden por overall_score para las migraciones
+            order = np.argsort(-scores, kind="stable")
+            if self.representation == "genome":
+                self._ranking = (scores, order, self.population)
+            else:
+                self._ranking = [(scores[k], self.population[k]) for k in order]
             
-            # Seleccionar padres
-            parents = self.select_parents(evaluated)
+            front_size = int((ranks[survivors] == 0).sum())
+            record = {
+                "generation": self.generation + 1,
+                "best_score": scores[best],
+                "global_best": self.best_score,
+                "front_size": front_size
+            }
+            yield record
+    
+    def pareto_front(self):
+        """
+        Frente de Pareto de la población actual (modo multiobjetivo): lista de
+        (grafo, {métrica: valor}) sin duplicados, ordenada por overall_score.
+        Los grafos son copias independientes de los de la población
+        """
+        if self.objectives is None:
+            raise ValueError("pareto_front() requiere el modo multiobjetivo (objectives)")
+        if self._pareto_metrics is None:
+            self._pareto_metrics = self._candidate_metrics(self.population)
+        columns = self.metric_columns
+        objective_columns = [columns.index(name) for name in self.objectives]
+        front = np.flatnonzero(non_dominated_sort(self._pareto_metrics[:, objective_columns]) == 0)
+        _, unique = np.unique(self._pareto_metrics[front], axis=0, return_index=True)
+        front = front[np.sort(unique)]
+        front = front[np.argsort(-self._pareto_metrics[front, columns.index("overall_score")], kind="stable")]
+        result = []
+        for k in front:
+            if self.representation == "genome":
+                graph = self.encoding.decode(self.population, k)
+            else:
+                graph = self.population[k].copy()
+            result.append((graph, {name: float(value) for name, value in zip(columns, self._pareto_metrics[k])}))
+        return result
+    
+    def _graph_generations(self):
+        """Generaciones sobre grafos (representation='graph'); produce un registro por generación"""
+        while True:
+            evaluated = self.evaluate_population()
+            record = {
+                "generation": self.generation + 1,
+                "best_score": evaluated[0][0],
+                "global_best": self.best_score
+            }
+            if self.surrogate is not None:
+                population_scores = {id(graph): score for score, graph in evaluated}
+                self._train_surrogate(self.encoding.encode(self.population),
+                                      np.array([population_scores[id(graph)] for graph in self.population]),
+                                      record)
             
-            # Crear nueva generación
-            new_population = []
-            generator = GraphGenerator(mutation_rate=self.mutation_rate)
+            # Seleccionar padres
+            with self.instrumentation.stage("selection"), self._phase("select"):
+                parents = self.select_parents(evaluated)
             
             # Élite directa (los mejores padres)
-            new_population.extend(parents[:3])
+            new_population = parents[:3]
             
-            # Cruzar y mutar
-            while len(new_population) < self.population_size:
-                parent1, parent2 = random.sample(parents, 2)
-                child = self.crossover(parent1, parent2)
-                mutated_child = generator.generate_variant(child)
-                new_population.append(mutated_child)
+            # Cruzar y mutar (más hijos de los necesarios si hay sustituto entrenado)
+            n_children = self.population_size - len(new_population)
+            children = self._offspring(parents, self._n_candidates(n_children))
+            if self.surrogate is not None:
+                chosen, predicted = self._screen(self.encoding.encode(children), n_children)
+                children = [children[i] for i in chosen]
+                self._predicted = np.concatenate((np.full(len(new_population), np.nan), predicted))
+            self.population = new_population + children
+            yield record
+    
+    @contextlib.contextmanager
+    def _phase(self, name):
+        """Acumula el tiempo de una fase de la generación en curso"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._phase_seconds[name] += time.perf_counter() - start
+    
+    def _compile(self, graphs):
+        """
+        Instantáneas compiladas de los grafos (None si no compilan). Se reutilizan
+        entre la diversidad, la validación y la evaluación, ya que los grafos de
+        la población no cambian una vez creados; solo se conservan las de graphs
+        y las de la población actual
+        """
+        previous = self._compiled_graphs
+        current = {id(graph): previous[id(graph)] for graph in self.population if id(graph) in previous}
+        compiled = []
+        with self.instrumentation.stage("compile"):
+            for graph in graphs:
+                entry = current.get(id(graph)) or previous.get(id(graph))
+                if entry is None or entry[0] is not graph:
+                    try:
+                        entry = (graph, graph.compile())
+                    except Exception:
+                        # El validador vuelve a compilar el grafo e informa del error
+                        entry = (graph, None)
+                current[id(graph)] = entry
+                compiled.append(entry[1])
+        self._compiled_graphs = current
+        return compiled
+    
+    def diversity(self):
+        """
+        Diversidad de la población: desviación típica media, entre candidatos,
+        de la dificultad y la discriminación de cada ítem
+        """
+        if self.representation == "genome":
+            parameters = self.population.parameters[..., :2]
+        else:
+            # Columnas de las instantáneas compiladas; NaN si falta el ítem o el parámetro
+            item_ids = self.base_graph.nodes_of_type("item")
+            parameters = np.full((len(self.population), len(item_ids), 2), np.nan)
+            for p, compiled in enumerate(self._compile(self.population)):
+                if compiled is not None:
+                    values = np.vstack((np.column_stack((compiled.difficulty, compiled.discrimination)),
+                                        [np.nan, np.nan]))
+                    parameters[p] = values[[compiled.item_index.get(item_id, -1) for item_id in item_ids]]
+        if parameters.size == 0:
+            return 0.0
+        with np.errstate(invalid="ignore"):
+            deviation = np.nanstd(parameters, axis=0)
+        return float(np.nanmean(deviation)) if not np.isnan(deviation).all() else 0.0
+    
+    def _generations(self):
+        if self.objectives is not None:
+            return self._pareto_generations()
+        if self.representation == "genome":
+            return self._genome_generations()
+        return self._graph_generations()
+    
+    def iter_evolve(self, generations=10, checkpoint_path=None, checkpoint_every=10, max_seconds=None,
+                    max_evaluations=None, cancel=None):
+        """
+        Variante de evolve() que produce el registro de cada generación al
+        terminarla: generation, best_score, global_best, diversity (de la
+        población evaluada), evaluations y cache_hits de la generación,
+        phase_seconds (tiempo por fase: select, crossover, mutate, validate,
+        evaluate, surrogate) y seconds (tiempo total de la generación).
+        Args:
+            max_seconds, max_evaluations: Presupuestos de tiempo y de candidatos
+                evaluados para esta llamada; se comprueban entre generaciones
+            cancel: Objeto con is_set() (p. ej. threading.Event) para cancelar
+                entre generaciones
+        El motivo de parada queda en stop_reason: 'generations', 'time',
+        'evaluations', 'cancelled' (cancel o cierre del generador) o 'error' si
+        una excepción interrumpe la ejecución (la excepción se propaga). En
+        todos los casos se esperan los puntos de control pendientes.
+        """
+        steps = self._generations()
+        start = time.perf_counter()
+        evaluations_before = self.evaluations
+        self.stop_reason = None
+        try:
+            for _ in range(generations):
+                if cancel is not None and cancel.is_set():
+                    self.stop_reason = "cancelled"
+                elif max_seconds is not None and time.perf_counter() - start >= max_seconds:
+                    self.stop_reason = "time"
+                elif max_evaluations is not None and self.evaluations - evaluations_before >= max_evaluations:
+                    self.stop_reason = "evaluations"
+                if self.stop_reason is not None:
+                    return
+                
+                self._phase_seconds = dict.fromkeys(self.PHASES, 0.0)
+                cache = self.evaluator.cache
+                hits = cache.hits if cache is not None else 0
+                evaluations = self.evaluations
+                generation_start = time.perf_counter()
+                diversity = self.diversity()
+                record = next(steps)
+                record.update(
+                    diversity=diversity,
+                    evaluations=self.evaluations - evaluations,
+                    cache_hits=(cache.hits - hits) if cache is not None else 0,
+                    phase_seconds=dict(self._phase_seconds),
+                    seconds=time.perf_counter() - generation_start
+                )
+                self._end_generation(record, checkpoint_path, checkpoint_every)
+                yield record
+            self.stop_reason = "generations"
+        except GeneratorExit:
+            self.stop_reason = "cancelled"
+            raise
+        except BaseException:
+            self.stop_reason = "error"
+            raise
+        finally:
+            steps.close()
+            self._finish()
+    
+    def _finish(self):
+        """Espera los puntos de control, decodifica la mejor solución y guarda la caché"""
+        self._flush_checkpoints()
+        if self.best_genome is not None:
+            self.best_solution = self.encoding.decode(self.best_genome)
+        cache = self.evaluator.cache
+        if cache is not None and cache.path is not None:
+            cache.save()
+    
+    def evolve(self, generations=10, checkpoint_path=None, checkpoint_every=10, **budget):
+        """
+        Ejecuta el proceso evolutivo mejorado
+        Args:
+            checkpoint_path: Fichero de punto de control (ver save_checkpoint); se
+                escribe en segundo plano cada checkpoint_every generaciones y la
+                ejecución puede continuarse con GeneticOptimizer.resume
+            budget: max_seconds, max_evaluations y cancel (ver iter_evolve)
+        Returns:
+            (mejor grafo, mejor puntuación, historial de esta llamada)
+        """
+        history = []
+        for record in self.iter_evolve(generations, checkpoint_path, checkpoint_every, **budget):
+            history.append(record)
+            line = (f"Generación {record['generation']}: Mejor en Generación = {record['best_score']:.4f}, "
+                    f"Mejor Global = {record['global_best']:.4f}")
+            if "front_size" in record:
+                line += f", Frente de Pareto = {record['front_size']}"
+            print(line)
+        return self.best_solution, self.best_score, history
+    
+    async def aevolve(self, generations=10, checkpoint_path=None, checkpoint_every=10, **budget):
+        """
+        Iterador asíncrono de iter_evolve: cada generación se ejecuta en un hilo
+        aparte para no bloquear el bucle de eventos. Si la tarea se cancela, la
+        generación en curso termina y después se cierra la ejecución.
+        """
+        iterator = self.iter_evolve(generations, checkpoint_path, checkpoint_every, **budget)
+        executor = ThreadPoolExecutor(max_workers=1)
+        step = None
+        try:
+            while True:
+                step = executor.submit(next, iterator, None)
+                record = await asyncio.wrap_future(step)
+                if record is None:
+                    break
+                yield record
+        finally:
+            if step is None:
+                iterator.close()
+            else:
+                # Cierra el generador cuando termine la generación en curso (en su hilo)
+                step.add_done_callback(lambda _: iterator.close())
+            executor.shutdown(wait=False)
+    
+    def _end_generation(self, record, checkpoint_path, checkpoint_every):
+        """Registra la generación completada y escribe el punto de control si toca"""
+        self.generation += 1
+        self.history.append(record)
+        if checkpoint_path is not None and self.generation % checkpoint_every == 0:
+            if self._checkpoint_writer is None:
+                self._checkpoint_writer = CheckpointWriter()
+            with self.instrumentation.stage("checkpoint"):
+                snapshot = self._checkpoint_snapshot(checkpoint_path)
+            # La codificación de los grafos y de la caché se hace en el hilo de escritura
+            self._checkpoint_writer.submit(self._write_checkpoint, checkpoint_path, snapshot)
+    
+    def _flush_checkpoints(self):
+        if self._checkpoint_writer is not None:
+            self._checkpoint_writer.flush()
+    
+    def save_checkpoint(self, path):
+        """
+        Guarda el estado completo (población, última evaluación ordenada,
+        mejor solución, estados de los generadores aleatorios y caché) en un
+        .npz columnar: parámetros IRT, aristas y caché en arrays, no grafos
+        serializados. El historial se guarda aparte, en path + '.history.jsonl',
+        añadiendo solo los registros nuevos (ver checkpoint.save_checkpoint)
+        """
+        self._flush_checkpoints()
+        self._write_checkpoint(path, self._checkpoint_snapshot(path))
+    
+    def _checkpoint_snapshot(self, path):
+        """
+        Copia del estado para un punto de control, barata de tomar: copias de
+        los arrays, clones de los grafos de la población (sus elementos quedan
+        de solo lectura), las entradas de la caché y las líneas nuevas del
+        historial. La codificación columnar se hace después en _write_checkpoint
+        """
+        arrays = {}
+        graphs = None
+        if self.representation == "genome":
+            arrays.update(parameters=self.population.parameters.copy(),
+                          edge_mask=self.population.edge_mask.copy(),
+                          edge_weight=self.population.edge_weight.copy())
+            if self.best_genome is not None:
+                arrays.update(best_parameters=self.best_genome.parameters.copy(),
+                              best_edge_mask=self.best_genome.edge_mask.copy(),
+                              best_edge_weight=self.best_genome.edge_weight.copy())
+            if self._ranking is not None:
+                scores, order, population = self._ranking
+                arrays.update(ranking_scores=np.array(scores, dtype=np.float64),
+                              ranking_order=np.array(order, dtype=np.int64),
+                              ranking_parameters=population.parameters.copy(),
+                              ranking_edge_mask=population.edge_mask.copy(),
+                              ranking_edge_weight=population.edge_weight.copy())
+        else:
+            # Cada grafo se guarda una vez aunque esté en la población y en la última evaluación
+            graphs, positions = [], {}
+
+            def position(graph, clone=True):
+                if id(graph) not in positions:
+                    positions[id(graph)] = len(graphs)
+                    graphs.append(graph.clone() if clone else graph)
+                return positions[id(graph)]
             
-            self.population = new_population
+            arrays["population_graphs"] = np.array([position(graph) for graph in self.population], dtype=np.int64)
+            ranking = self._ranking or []
+            arrays["ranking_graphs"] = np.array([position(graph) for _, graph in ranking], dtype=np.int64)
+            arrays["ranking_scores"] = np.array([score for score, _ in ranking], dtype=np.float64)
+            # La mejor solución es una copia que el optimizador nunca modifica (solo la sustituye)
+            arrays["best_graph"] = np.array(position(self.best_solution, clone=False))
+        if isinstance(self.surrogate, RidgeSurrogate):
+            arrays.update({f"surrogate_{name}": np.copy(value) for name, value in self.surrogate.state().items()})
+        if self._predicted is not None:
+            arrays["surrogate_predicted"] = self._predicted.copy()
+        if self._pareto_metrics is not None:
+            arrays["pareto_metrics"] = self._pareto_metrics.copy()
+        
+        path = os.fspath(path)
+        saved_path, saved_records, offset = self._history_file or (None, 0, 0)
+        if saved_path != path:
+            saved_records, offset = 0, 0
+        lines = history_lines(self.history[saved_records:])
+        size = offset + sum(len(line.encode("utf-8")) for line in lines)
+        self._history_file = (path, len(self.history), size)
+        
+        evaluator = self.evaluator
+        cache = evaluator.cache.to_dict() if evaluator.cache is not None else None
+        state = {
+            "representation": self.representation,
+            "population_size": self.population_size,
+            "mutation_rate": self.mutation_rate,
+            "racing": self.racing,
+            "race_options": self.race_options,
+            "generation": self.generation,
+            "history": {"records": len(self.history), "bytes": size},
+            "best_score": float(self.best_score),
+            "simulations_run": self.simulations_run,
+            "evaluations": self.evaluations,
+            "seed_sequence": seed_sequence_state(self.seed_sequence),
+            "variation_seed": seed_sequence_state(self.variation_seed),
+            "rng": self.rng.bit_generator.state,
+            "surrogate": {"alpha": self.surrogate.alpha, "min_samples": self.surrogate.min_samples}
+                         if isinstance(self.surrogate, RidgeSurrogate) else None,
+            "surrogate_factor": self.surrogate_factor,
+            "objectives": self.objectives,
+            "evaluator": {
+                "settings": evaluator.settings(),
+                "seed_sequence": seed_sequence_state(evaluator.seed_sequence),
+                "simulations_run": evaluator.simulations_run,
+                # Contadores y ajustes; las entradas van en columnas (encode_cache)
+                "cache": {key: value for key, value in cache.items() if key != "entries"}
+                         if cache is not None else None
+            }
+        }
+        return {"base_graph": self.base_graph, "arrays": arrays, "graphs": graphs, "cache": cache,
+                "state": state, "lines": lines, "offset": offset}
+    
+    @staticmethod
+    def _write_checkpoint(path, snapshot):
+        """Codifica una instantánea de _checkpoint_snapshot y escribe el punto de control"""
+        arrays = dict(snapshot["arrays"])
+        if snapshot["graphs"] is not None:
+            arrays.update(encode_graphs(snapshot["base_graph"], snapshot["graphs"]))
+        if snapshot["cache"] is not None:
+            arrays.update(encode_cache(snapshot["cache"]))
+        arrays["base_graph"] = graph_array(snapshot["base_graph"])
+        save_checkpoint(path, arrays, snapshot["state"], snapshot["lines"], snapshot["offset"])
+    
+    @classmethod
+    def resume(cls, path, evaluator=None, surrogate=None):
+        """
+        Reanuda una ejecución desde un punto de control: la siguiente llamada a
+        evolve() continúa exactamente igual que si no se hubiera interrumpido.
+        Args:
+            evaluator: Evaluador a usar; por defecto se recrea con los ajustes
+                guardados (en ambos casos se restauran su flujo aleatorio y su caché)
+            surrogate: Sustituto a usar si no es un RidgeSurrogate (estos se
+                restauran desde el punto de control)
+        """
+        arrays, state, history = load_checkpoint(path)
+        base_graph = graph_from_array(arrays["base_graph"])
+        
+        evaluator_state = state["evaluator"]
+        evaluator = evaluator or PsychometricEvaluator(**evaluator_state["settings"])
+        evaluator.seed_sequence = restore_seed_sequence(evaluator_state["seed_sequence"])
+        evaluator.simulations_run = evaluator_state["simulations_run"]
+        if evaluator_state["cache"] is not None:
+            evaluator.cache = FitnessCache.from_dict(decode_cache(arrays, evaluator_state["cache"]))
+        
+        optimizer = cls.__new__(cls)
+        optimizer.base_graph = base_graph
+        optimizer.population_size = state["population_size"]
+        optimizer.mutation_rate = state["mutation_rate"]
+        optimizer.seed_sequence = restore_seed_sequence(state["seed_sequence"])
+        optimizer.variation_seed = restore_seed_sequence(state["variation_seed"])
+        optimizer.rng = np.random.default_rng()
+        optimizer.rng.bit_generator.state = state["rng"]
+        optimizer.evaluator = evaluator
+        optimizer.instrumentation = evaluator.instrumentation
+        optimizer.racing = state["racing"]
+        optimizer.race_options = state["race_options"]
+        optimizer.simulations_run = state["simulations_run"]
+        optimizer.validator = PsychometricValidator()
+        optimizer.representation = state["representation"]
+        optimizer.best_score = state["best_score"]
+        optimizer.best_genome = None
+        optimizer._ranking = None
+        optimizer._compiled_graphs = {}
+        optimizer.generation = state["generation"]
+        optimizer.history = history
+        optimizer._checkpoint_writer = None
+        optimizer._history_file = (os.fspath(path), len(history), state["history"]["bytes"])
+        optimizer.evaluations = state.get("evaluations", 0)
+        optimizer.stop_reason = None
+        optimizer._phase_seconds = dict.fromkeys(cls.PHASES, 0.0)
+        optimizer.surrogate_factor = state.get("surrogate_factor", 4)
+        optimizer.surrogate = surrogate
+        if state.get("surrogate") is not None:
+            optimizer.surrogate = RidgeSurrogate(**state["surrogate"])
+            optimizer.surrogate.load_state({name[len("surrogate_"):]: value for name, value in arrays.items()
+                                            if name.startswith("surrogate_") and name != "surrogate_predicted"})
+        optimizer._predicted = arrays.get("surrogate_predicted")
+        optimizer.objectives = state.get("objectives")
+        optimizer._pareto_metrics = arrays.get("pareto_metrics")
+        if optimizer.representation == "genome" or optimizer.surrogate is not None:
+            optimizer.encoding = GenomeEncoding(base_graph)
         
-        return self.best_solution, self.best_score, history
\ No newline at end of file
+        if optimizer.representation == "genome":
+            optimizer.population = GenomePopulation(arrays["parameters"], arrays["edge_mask"], arrays["edge_weight"])
+            if "ranking_scores" in arrays:
+                optimizer._ranking = (arrays["ranking_scores"], arrays["ranking_order"], GenomePopulation(
+                    arrays["ranking_parameters"], arrays["ranking_edge_mask"], arrays["ranking_edge_weight"]
+                ))
+            optimizer.best_solution = base_graph.copy()
+            if "best_parameters" in arrays:
+                optimizer.best_genome = GenomePopulation(
+                    arrays["best_parameters"], arrays["best_edge_mask"], arrays["best_edge_weight"]
+                )
+                optimizer.best_solution = optimizer.encoding.decode(optimizer.best_genome)
+        else:
+            graphs = decode_graphs(base_graph, arrays)
+            optimizer.population = [graphs[i] for i in arrays["population_graphs"]]
+            if len(arrays["ranking_graphs"]):
+                optimizer._ranking = [(score, graphs[i]) for score, i in
+                                      zip(arrays["ranking_scores"].tolist(), arrays["ranking_graphs"])]
+            optimizer.best_solution = graphs[int(arrays["best_graph"])].copy()
+        return optimizer
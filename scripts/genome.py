@@ -0,0 +1,307 @@
+import numpy as np
+from validator import PsychometricValidator
+
+
+# Columnas de la matriz de parámetros
+DIFFICULTY, DISCRIMINATION, GUESSING = 0, 1, 2
+
+# Límites usados por las mutaciones (los mismos que GraphGenerator)
+DIFFICULTY_BOUNDS = (-3.0, 3.0)
+DISCRIMINATION_BOUNDS = (0.3, 3.0)
+CORRELATION_BOUNDS = (0.05, 0.95)
+
+# Rango válido del parámetro de azar (PsychometricValidator.check_irt_parameters)
+GUESSING_BOUNDS = (0.0, 0.5)
+
+# Comprobaciones del validador que solo dependen de la estructura de medida fija
+FIXED_CHECKS = ("check_content_validity", "check_construct_coverage", "check_method_assignment")
+
+# Relaciones que no pueden activarse ni desactivarse: sin ellas el grafo no es válido
+PROTECTED_RELATIONSHIPS = ("measures", "uses_method")
+
+
+class GenomePopulation:
+    """
+    Población de P genomas en arrays planos:
+        - parameters (P, n_items, 3): difficulty, discrimination, guessing
+        - edge_mask (P, n_edges): aristas mutables activas
+        - edge_weight (P, n_edges): correlación (correlates_with) o strength del resto
+    """
+
+    def __init__(self, parameters, edge_mask, edge_weight):
+        self.parameters = np.asarray(parameters, dtype=np.float64)
+        self.edge_mask = np.asarray(edge_mask, dtype=bool)
+        self.edge_weight = np.asarray(edge_weight, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.parameters)
+
+    def take(self, indices):
+        """Subpoblación (copia) con los genomas indicados, en ese orden"""
+        return GenomePopulation(self.parameters[indices], self.edge_mask[indices], self.edge_weight[indices])
+
+    def copy(self):
+        return GenomePopulation(self.parameters.copy(), self.edge_mask.copy(), self.edge_weight.copy())
+
+    @staticmethod
+    def concatenate(populations):
+        populations = list(populations)
+        return GenomePopulation(
+            np.concatenate([p.parameters for p in populations]),
+            np.concatenate([p.edge_mask for p in populations]),
+            np.concatenate([p.edge_weight for p in populations])
+        )
+
+
+class GenomeEncoding:
+    """
+    Codificación de las variantes de un grafo base como genomas. La estructura
+    de medida (ítems, constructos, 'measures' y 'uses_method') es fija; varían
+    los parámetros IRT y un conjunto de aristas mutables: las aristas del grafo
+    base que no son de medida más las correlaciones posibles entre pares de
+    constructos aún no conectados.
+    """
+
+    def __init__(self, base_graph):
+        self.base_graph = base_graph
+        self.compiled = base_graph.compile()
+        self.item_ids = self.compiled.item_ids
+        self.parameters = np.column_stack(self.compiled.item_parameters())
+
+        # Aristas mutables: existentes (no protegidas) + correlaciones nuevas posibles
+        self.edge_keys = []
+        self.edge_types = []
+        for key, edge in base_graph.edges.items():
+            if edge.type not in PROTECTED_RELATIONSHIPS:
+                self.edge_keys.append(key)
+                self.edge_types.append(edge.type)
+        n_existing = len(self.edge_keys)
+        constructs = self.compiled.construct_ids
+        for i, source in enumerate(constructs):
+            for target in constructs[i + 1:]:
+                if (source, target) not in base_graph.edges and (target, source) not in base_graph.edges:
+                    self.edge_keys.append((source, target))
+                    self.edge_types.append("correlates_with")
+
+        n_edges = len(self.edge_keys)
+        self.edge_is_correlation = np.array([t == "correlates_with" for t in self.edge_types], dtype=bool)
+        self.edge_has_support = np.ones(n_edges, dtype=bool)  # Las nuevas se crean con soporte
+        self.base_edge_mask = np.zeros(n_edges, dtype=bool)
+        self.base_edge_mask[:n_existing] = True
+        self.base_edge_weight = np.full(n_edges, np.nan)
+        for e, key in enumerate(self.edge_keys[:n_existing]):
+            properties = self.base_graph.edges[key].properties
+            self.edge_has_support[e] = "empirical_support" in properties
+            self.base_edge_weight[e] = self._edge_weight(properties, self.edge_is_correlation[e])
+        self._init_validation()
+
+    def _init_validation(self):
+        """
+        Partes de la validación de PsychometricValidator que no dependen del
+        genoma: las comprobaciones de FIXED_CHECKS, los modelos y umbrales de
+        los ítems y, para las correlaciones del grafo base, el valor que se
+        valida cuando el genoma no cambia su peso
+        """
+        validator = PsychometricValidator()
+        self.structure_valid = all(
+            getattr(validator, name)(self.base_graph, self.compiled)["valid"] for name in FIXED_CHECKS
+        )
+        compiled = self.compiled
+        with np.errstate(invalid="ignore"):
+            grm = compiled.response_model == compiled.MODEL_GRM
+            self.item_model_valid = ~(
+                (grm & (np.diff(compiled.thresholds, axis=1) <= 0).any(axis=1)) | (compiled.response_model < 0)
+            )
+
+        n_edges = self.n_edges
+        self.edge_validation_support = np.ones(n_edges, dtype=bool)
+        self.edge_base_missing = np.zeros(n_edges, dtype=bool)
+        self.edge_base_value = np.full(n_edges, np.nan)
+        for e in np.flatnonzero(self.base_edge_mask & self.edge_is_correlation):
+            properties = self.base_graph.edges[self.edge_keys[e]].properties
+            strength, correlation = properties.get("strength"), properties.get("correlation")
+            self.edge_validation_support[e] = bool(properties.get("empirical_support"))
+            self.edge_base_missing[e] = strength is None and correlation is None
+            value = correlation if correlation is not None else strength
+            self.edge_base_value[e] = np.nan if value is None else float(value)
+
+    @staticmethod
+    def _edge_weight(properties, is_correlation):
+        value = properties.get("correlation" if is_correlation else "strength")
+        return np.nan if value is None else float(value)
+
+    @property
+    def n_items(self):
+        return len(self.item_ids)
+
+    @property
+    def n_edges(self):
+        return len(self.edge_keys)
+
+    def base_population(self, size):
+        """size copias del genoma del grafo base"""
+        return GenomePopulation(
+            np.repeat(self.parameters[np.newaxis], size, axis=0),
+            np.repeat(self.base_edge_mask[np.newaxis], size, axis=0),
+            np.repeat(self.base_edge_weight[np.newaxis], size, axis=0)
+        )
+
+    def encode(self, graphs):
+        """Genomas de grafos con la misma estructura de medida que el grafo base"""
+        graphs = list(graphs)
+        genomes = self.base_population(len(graphs))
+        genomes.edge_mask[:] = False
+        for p, graph in enumerate(graphs):
+            compiled = graph.compile()
+            columns = [compiled.item_index[item_id] for item_id in self.item_ids]
+            genomes.parameters[p] = np.column_stack(compiled.item_parameters())[columns]
+            for e, key in enumerate(self.edge_keys):
+                edge = graph.edges.get(key)
+                if edge is not None:
+                    genomes.edge_mask[p, e] = True
+                    genomes.edge_weight[p, e] = self._edge_weight(edge.properties, self.edge_is_correlation[e])
+        return genomes
+
+    def valid(self, genomes):
+        """
+        Validez de cada genoma (bool (P,)): el mismo resultado que
+        PsychometricValidator sobre el grafo decodificado, calculado en bloque
+        (rangos de los parámetros IRT y correlaciones activas)
+        """
+        if not self.structure_valid:
+            return np.zeros(len(genomes), dtype=bool)
+        parameters = genomes.parameters
+        with np.errstate(invalid="ignore"):
+            difficulty = parameters[..., DIFFICULTY]
+            discrimination = parameters[..., DISCRIMINATION]
+            guessing = parameters[..., GUESSING]
+            bad_parameters = (
+                (difficulty < DIFFICULTY_BOUNDS[0]) | (difficulty > DIFFICULTY_BOUNDS[1])
+                | (discrimination < DISCRIMINATION_BOUNDS[0]) | (discrimination > DISCRIMINATION_BOUNDS[1])
+                | (guessing < GUESSING_BOUNDS[0]) | (guessing > GUESSING_BOUNDS[1])
+            )
+        valid = ~(bad_parameters | ~self.item_model_valid).any(axis=1)
+
+        # Correlaciones activas: si el genoma no fija el peso se valida el del grafo base
+        weight = genomes.edge_weight
+        unchanged = np.isnan(weight)
+        value = np.where(unchanged, self.edge_base_value, weight)
+        with np.errstate(invalid="ignore"):
+            magnitude = np.abs(value)
+            bad_value = (
+                (unchanged & self.edge_base_missing)
+                | (value < -1.0) | (value > 1.0) | (magnitude > 0.95)
+                | ((magnitude > 0.7) & ~self.edge_validation_support)
+            )
+        active = genomes.edge_mask & self.edge_is_correlation
+        return valid & ~(active & bad_value).any(axis=1)
+
+    def decode(self, genomes, index=0):
+        """
+        Grafo del genoma index: una copia independiente del grafo base (ver
+        PsychometricGraph.copy) con los parámetros y aristas del genoma (los
+        umbrales explícitos se desplazan con la dificultad).
+        """
+        parameters = genomes.parameters[index]
+        mask = genomes.edge_mask[index]
+        weight = genomes.edge_weight[index]
+        graph = self.base_graph.copy()
+
+        raw = np.column_stack((self.compiled.difficulty, self.compiled.discrimination, self.compiled.guessing))
+        changed = ~(parameters == raw).all(axis=1)
+        for j in np.flatnonzero(changed):
+            params = graph.mutable_node(self.item_ids[j]).properties["irt_parameters"]
+            if params.get("thresholds"):
+                shift = parameters[j, DIFFICULTY] - self.parameters[j, DIFFICULTY]
+                params["thresholds"] = [float(b) + shift for b in params["thresholds"]]
+            params["difficulty"] = float(parameters[j, DIFFICULTY])
+            params["discrimination"] = float(parameters[j, DISCRIMINATION])
+            params["guessing"] = float(parameters[j, GUESSING])
+
+        for e, key in enumerate(self.edge_keys):
+            name = "correlation" if self.edge_is_correlation[e] else "strength"
+            if mask[e] and not self.base_edge_mask[e]:
+                properties = {name: float(weight[e])}
+                if self.edge_is_correlation[e]:
+                    properties.update(strength=float(weight[e]), empirical_support="Generated by AI")
+                graph.add_edge(*key, self.edge_types[e], **properties)
+            elif not mask[e] and self.base_edge_mask[e]:
+                graph.remove_edge(*key)
+            elif mask[e] and not np.isnan(weight[e]) and weight[e] != self.base_edge_weight[e]:
+                graph.mutable_edge(key).properties[name] = float(weight[e])
+        return graph
+
+    def threshold_matrix(self, difficulty):
+        """
+        Umbrales (P, n_items, M-1) de cada genoma: los del grafo base desplazados
+        con la dificultad (en ítems dicotómicos, la propia dificultad)
+        """
+        base = self.compiled.thresholds
+        thresholds = base + (difficulty - self.parameters[:, DIFFICULTY])[..., np.newaxis]
+        thresholds[..., 0] = np.where(self.compiled.n_categories == 2, difficulty, thresholds[..., 0])
+        return thresholds
+
+
+def mutate(genomes, encoding, rng, mutation_rate=0.3, correlation_boost=0.7):
+    """
+    Mutación de toda la población con operaciones de arrays (mismas reglas que
+    GraphGenerator):
+        - Con probabilidad mutation_rate por ítem: difficulty + N(0, 0.2) en
+          [-3, 3] y discrimination + N(0, 0.3) en [0.3, 3]
+        - Con probabilidad mutation_rate por genoma: activar una arista inactiva
+          (peso U(0.1, 0.8)) y, por separado, desactivar una activa
+        - Correlaciones activas: reforzar (x1.2) con probabilidad
+          correlation_boost o, si no, debilitar (x0.8) con probabilidad 0.3
+    Returns:
+        Nueva GenomePopulation
+    """
+    genomes = genomes.copy()
+    n_genomes, n_items = genomes.parameters.shape[:2]
+    parameters = genomes.parameters
+
+    mutated = rng.random((n_genomes, n_items)) < mutation_rate
+    noise = rng.normal(0.0, (0.2, 0.3), (n_genomes, n_items, 2))
+    parameters[..., :2] += np.where(mutated[..., np.newaxis], noise, 0.0)
+    np.clip(parameters[..., DIFFICULTY], *DIFFICULTY_BOUNDS, out=parameters[..., DIFFICULTY])
+    np.clip(parameters[..., DISCRIMINATION], *DISCRIMINATION_BOUNDS, out=parameters[..., DISCRIMINATION])
+
+    if encoding.n_edges:
+        rows = np.arange(n_genomes)
+        mask, weight = genomes.edge_mask, genomes.edge_weight
+
+        # Activación: una arista inactiva al azar (clave aleatoria máxima)
+        keys = np.where(mask, -1.0, rng.random(mask.shape))
+        add = (rng.random(n_genomes) < mutation_rate) & (~mask).any(axis=1)
+        chosen = keys.argmax(axis=1)
+        mask[rows[add], chosen[add]] = True
+        weight[rows[add], chosen[add]] = rng.uniform(0.1, 0.8, n_genomes)[add]
+
+        # Desactivación: una arista activa al azar
+        keys = np.where(mask, rng.random(mask.shape), -1.0)
+        remove = (rng.random(n_genomes) < mutation_rate) & mask.any(axis=1)
+        chosen = keys.argmax(axis=1)
+        mask[rows[remove], chosen[remove]] = False
+
+        # Refuerzo / debilitamiento de correlaciones activas
+        active = mask & encoding.edge_is_correlation & ~np.isnan(weight)
+        boost = rng.random(mask.shape) < correlation_boost
+        weaken = ~boost & (rng.random(mask.shape) < 0.3)
+        factor = np.where(boost, np.where(weight > 0, 1.2, 0.8), np.where(weight > 0, 0.8, 1.2))
+        adjusted = np.clip(weight * factor, *CORRELATION_BOUNDS)
+        genomes.edge_weight = np.where(active & (boost | weaken), adjusted, weight)
+
+    return genomes
+
+
+def crossover(first, second):
+    """
+    Cruce de pares de genomas (first[p], second[p]): el hijo parte de first,
+    hereda la discriminación mayor y la dificultad más cercana a 0
+    """
+    child = first.copy()
+    parameters = child.parameters
+    other = second.parameters
+    np.maximum(parameters[..., DISCRIMINATION], other[..., DISCRIMINATION], out=parameters[..., DISCRIMINATION])
+    closer = np.abs(other[..., DIFFICULTY]) < np.abs(parameters[..., DIFFICULTY])
+    parameters[..., DIFFICULTY] = np.where(closer, other[..., DIFFICULTY], parameters[..., DIFFICULTY])
+    return child
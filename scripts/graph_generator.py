@@ -1,16 +1,20 @@
-import copy
-import random
 import numpy as np
 
 class GraphGenerator:
-    def __init__(self, mutation_rate=0.3, item_mutation_prob=0.5, correlation_boost=0.7):
+    def __init__(self, mutation_rate=0.3, item_mutation_prob=0.5, correlation_boost=0.7, seed=None):
+        """
+        Args:
+            seed: Semilla o numpy.random.Generator para mutaciones reproducibles
+        """
         self.mutation_rate = mutation_rate
         self.item_mutation_prob = item_mutation_prob
         self.correlation_boost = correlation_boost
+        self.rng = np.random.default_rng(seed)
     
     def generate_variant(self, original_graph):
         """Crea una variante mutada del grafo original con protecciones"""
-        new_graph = copy.deepcopy(original_graph)
+        # Copia con estructura compartida: solo se duplican los nodos y aristas que se mutan
+        new_graph = original_graph.clone()
         
         # 1. Mutación de parámetros (segura)
         self._mutate_parameters(new_graph)
@@ -25,10 +29,10 @@ class GraphGenerator:
     
     def _mutate_parameters(self, graph):
         """Modifica propiedades de los nodos con restricciones psicométricas"""
-        for node_id, node in graph.nodes.items():
-            if node.type == "item" and random.random() < self.mutation_rate:
+        for node_id in graph.nodes_of_type("item"):
+            if self.rng.random() < self.mutation_rate:
                 # Mutar parámetros IRT de manera controlada
-                self._mutate_irt_parameters(node)
+                self._mutate_irt_parameters(graph.mutable_node(node_id))
     
     def _mutate_irt_parameters(self, node):
         """Mutación inteligente de parámetros IRT"""
@@ -36,21 +40,21 @@ class GraphGenerator:
         
         # Dificultad: cambios pequeños (±0.2) dentro de [-3, 3]
         if "difficulty" in params:
-            new_diff = params["difficulty"] + random.gauss(0, 0.2)
+            new_diff = params["difficulty"] + self.rng.normal(0, 0.2)
             params["difficulty"] = max(-3.0, min(3.0, new_diff))
         
         # Discriminación: cambios pequeños (±0.3) dentro de [0.3, 3.0]
         if "discrimination" in params:
-            new_disc = params["discrimination"] + random.gauss(0, 0.3)
+            new_disc = params["discrimination"] + self.rng.normal(0, 0.3)
             params["discrimination"] = max(0.3, min(3.0, new_disc))
     
     def _mutate_topology_intelligently(self, graph):
         """Modifica la estructura con protecciones para relaciones críticas"""
         # A. Posible adición de nuevas relaciones (favoreciendo 'correlates_with')
-        if random.random() < self.mutation_rate:
+        if self.rng.random() < self.mutation_rate:
             all_nodes = list(graph.nodes.keys())
             if len(all_nodes) >= 2:
-                node1, node2 = random.sample(all_nodes, 2)
+                node1, node2 = (all_nodes[i] for i in self.rng.choice(len(all_nodes), 2, replace=False))
                 
                 # Evitar auto-relaciones
                 if node1 == node2:
@@ -64,21 +68,21 @@ class GraphGenerator:
                 if node1_type == "construct" and node2_type == "construct":
                     relationship = "correlates_with"
                     properties = {
-                        "strength": random.uniform(0.1, 0.8),
-                        "correlation": random.uniform(0.1, 0.8),
+                        "strength": self.rng.uniform(0.1, 0.8),
+                        "correlation": self.rng.uniform(0.1, 0.8),
                         "empirical_support": "Generated by AI"
                     }
                 else:
                     # Para otros casos, usar relaciones genéricas
-                    relationship = random.choice(["influences", "related_to"])
-                    properties = {"strength": random.uniform(0.1, 1.0)}
+                    relationship = ("influences", "related_to")[self.rng.integers(2)]
+                    properties = {"strength": self.rng.uniform(0.1, 1.0)}
                 
                 # Añadir solo si la relación no existe
                 if (node1, node2) not in graph.edges:
                     graph.add_edge(node1, node2, relationship, **properties)
         
         # B. Eliminación de relaciones (PROTEGIENDO RELACIONES CRÍTICAS)
-        if random.random() < self.mutation_rate and graph.edges:
+        if self.rng.random() < self.mutation_rate and graph.edges:
             # Crear lista de relaciones que se pueden eliminar (excluyendo 'measures')
             removable_edges = [
                 edge_key for edge_key, edge in graph.edges.items()
@@ -86,40 +90,36 @@ class GraphGenerator:
             ]
             
             if removable_edges:
-                edge_to_remove = random.choice(removable_edges)
-                del graph.edges[edge_to_remove]
-                graph.graph.remove_edge(*edge_to_remove)
+                edge_to_remove = removable_edges[self.rng.integers(len(removable_edges))]
+                graph.remove_edge(*edge_to_remove)
     
     def _mutate_construct_relations(self, graph):
         """Refuerza o debilita relaciones entre constructos existentes"""
         # Identificar correlaciones existentes
-        correlations = [
-            (edge_key, edge) for edge_key, edge in graph.edges.items()
-            if edge.type == "correlates_with"
-        ]
+        correlations = [(edge_key, graph.edges[edge_key]) for edge_key in graph.edges_of_type("correlates_with")]
         
-        for (source, target), edge in correlations:
-            if random.random() < self.correlation_boost:
+        for edge_key, edge in correlations:
+            if self.rng.random() < self.correlation_boost:
                 # Reforzar correlación existente
                 factor = 1.2 if edge.properties["correlation"] > 0 else 0.8
                 new_corr = min(0.95, max(0.05, edge.properties["correlation"] * factor))
-                edge.properties["correlation"] = new_corr
-            elif random.random() < 0.3:
+                graph.mutable_edge(edge_key).properties["correlation"] = new_corr
+            elif self.rng.random() < 0.3:
                 # Debilitar correlación existente
                 factor = 0.8 if edge.properties["correlation"] > 0 else 1.2
                 new_corr = min(0.95, max(0.05, edge.properties["correlation"] * factor))
-                edge.properties["correlation"] = new_corr
+                graph.mutable_edge(edge_key).properties["correlation"] = new_corr
     
     def _add_new_item(self, graph):
         """Añade un nuevo ítem a un constructo existente (mutación avanzada)"""
-        if random.random() < 0.2:  # Probabilidad baja de añadir nuevo ítem
+        if self.rng.random() < 0.2:  # Probabilidad baja de añadir nuevo ítem
             # Seleccionar un constructo al azar
-            constructs = [n for n, node in graph.nodes.items() if node.type == "construct"]
+            constructs = graph.nodes_of_type("construct")
             if not constructs:
                 return
             
-            target_construct = random.choice(constructs)
-            new_item_id = f"new_item_{random.randint(1000,9999)}"
+            target_construct = constructs[self.rng.integers(len(constructs))]
+            new_item_id = f"new_item_{self.rng.integers(1000, 10000)}"
             
             # Crear nuevo ítem con parámetros razonables
             graph.add_node(
@@ -127,8 +127,8 @@ class GraphGenerator:
                 "item",
                 content=f"Nuevo ítem para {target_construct}",
                 irt_parameters={
-                    "difficulty": random.uniform(-1.0, 1.0),
-                    "discrimination": random.uniform(0.8, 1.8),
+                    "difficulty": self.rng.uniform(-1.0, 1.0),
+                    "discrimination": self.rng.uniform(0.8, 1.8),
                     "guessing": 0.0
                 }
             )
@@ -138,10 +138,10 @@ class GraphGenerator:
                 new_item_id,
                 target_construct,
                 "measures",
-                strength=random.uniform(0.8, 1.5)
+                strength=self.rng.uniform(0.8, 1.5)
             )
             
             # Conectar a método existente
-            methods = [n for n, node in graph.nodes.items() if node.type == "method"]
+            methods = graph.nodes_of_type("method")
             if methods:
                 graph.add_edge(new_item_id, methods[0], "uses_method")
\ No newline at end of file
@@ -0,0 +1,113 @@
+import threading
+import time
+
+
+class _NullStage:
+    """Etapa sin registro: coste prácticamente nulo cuando la instrumentación está desactivada"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def record(self, *arrays):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, instrumentation, name):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.elements = 0
+        self.nbytes = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.instrumentation._add(self.name, time.perf_counter() - self.start, self.elements, self.nbytes)
+        return False
+
+    def record(self, *arrays):
+        """Registra el tamaño de los arrays creados en la etapa"""
+        for array in arrays:
+            self.elements += getattr(array, "size", 0)
+            self.nbytes += getattr(array, "nbytes", 0)
+
+
+class Instrumentation:
+    """
+    Contadores por etapa: tiempo de reloj, número de llamadas y tamaño de los
+    arrays asignados. Uso:
+
+        with instrumentation.stage("simulation") as stage:
+            responses = ...
+            stage.record(responses)
+
+    Desactivada, stage() devuelve un objeto compartido que no hace nada.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def __getstate__(self):
+        # El cerrojo no se puede serializar (envío a procesos trabajadores)
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        """Context manager que mide una etapa"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def _add(self, name, seconds, elements, nbytes):
+        with self._lock:
+            counters = self._stages.setdefault(name, [0, 0.0, 0, 0])
+            counters[0] += 1
+            counters[1] += seconds
+            counters[2] += elements
+            counters[3] += nbytes
+
+    def merge(self, report):
+        """Acumula un informe (p. ej. de otro proceso) en esta instrumentación"""
+        with self._lock:
+            for name, stage in report.items():
+                counters = self._stages.setdefault(name, [0, 0.0, 0, 0])
+                counters[0] += stage["calls"]
+                counters[1] += stage["seconds"]
+                counters[2] += stage["elements"]
+                counters[3] += stage["bytes"]
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+    def report(self):
+        """
+        Informe estructurado por etapa:
+            {etapa: {'calls', 'seconds', 'mean_seconds', 'elements', 'bytes'}}
+        """
+        with self._lock:
+            return {
+                name: {
+                    "calls": calls,
+                    "seconds": seconds,
+                    "mean_seconds": seconds / calls if calls else 0.0,
+                    "elements": elements,
+                    "bytes": nbytes
+                }
+                for name, (calls, seconds, elements, nbytes) in self._stages.items()
+            }
@@ -0,0 +1,235 @@
+import contextlib
+import io
+import multiprocessing
+import numpy as np
+from genetic_optimizer import GeneticOptimizer
+from rng import as_seed_sequence
+
+
+def _island_epoch(optimizer, generations, immigrants, n_migrants):
+    """Recibe inmigrantes, ejecuta unas generaciones y devuelve el resultado de la isla"""
+    optimizer.receive_migrants(immigrants)
+    simulations_before = optimizer.simulations_run
+    # Las islas no imprimen: el coordinador informa del progreso combinado
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, _, history = optimizer.evolve(generations)
+    return {
+        "history": history,
+        "best_score": optimizer.best_score,
+        "best_solution": optimizer.best_solution,
+        "migrants": optimizer.migrants(n_migrants),
+        "simulations_run": optimizer.simulations_run - simulations_before
+    }
+
+
+def _island_worker(connection, base_graph, options):
+    """Proceso de una isla: mantiene su GeneticOptimizer y atiende las órdenes del coordinador"""
+    optimizer = GeneticOptimizer(base_graph, **options)
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        try:
+            connection.send(_island_epoch(optimizer, *message))
+        except Exception as error:
+            connection.send(error)
+    connection.close()
+
+
+class IslandModel:
+    """
+    Algoritmo genético de islas: N poblaciones independientes (cada una con su
+    tasa de mutación y su flujo aleatorio) que intercambian sus mejores
+    candidatos cada migration_interval generaciones.
+    """
+
+    TOPOLOGIES = ("ring", "full")
+
+    def __init__(self, base_graph, n_islands=4, population_size=12, mutation_rates=None,
+                 migration_interval=5, n_migrants=2, topology="ring", seed=None,
+                 processes=True, optimizer_options=None):
+        """
+        Args:
+            mutation_rates: Tasa de mutación de cada isla (por defecto, escala
+                geométrica entre 0.1 y 0.4)
+            migration_interval: Generaciones entre migraciones
+            n_migrants: Candidatos que emigra cada isla
+            topology: 'ring' (la isla i recibe de la i-1) o 'full' (cada isla recibe
+                los mejores n_migrants del resto de islas)
+            seed: Semilla raíz; cada isla usa un flujo hijo independiente (también
+                para evaluar, si se comparte un evaluador en optimizer_options)
+            processes: Si es True, cada isla se ejecuta en su propio proceso
+                (multiprocessing); si es False, en este proceso por turnos, con el
+                mismo resultado
+            optimizer_options: Argumentos adicionales de GeneticOptimizer
+                (representation, racing, evaluator...)
+        """
+        if topology not in self.TOPOLOGIES:
+            raise ValueError(f"Topología desconocida: {topology} (opciones: {', '.join(self.TOPOLOGIES)})")
+        if mutation_rates is None:
+            mutation_rates = np.geomspace(0.1, 0.4, n_islands) if n_islands > 1 else [0.2]
+        if len(mutation_rates) != n_islands:
+            raise ValueError(f"Se esperaban {n_islands} tasas de mutación, hay {len(mutation_rates)}")
+
+        self.base_graph = base_graph
+        self.n_islands = n_islands
+        self.migration_interval = migration_interval
+        self.n_migrants = n_migrants
+        self.topology = topology
+        self.processes = processes
+        self.seed_sequence = as_seed_sequence(seed)
+        evaluator = (optimizer_options or {}).get("evaluator")
+        self.island_options = []
+        for rate, island_seed in zip(mutation_rates, self.seed_sequence.spawn(n_islands)):
+            options = dict(optimizer_options or {}, population_size=population_size,
+                           mutation_rate=float(rate), seed=island_seed)
+            if evaluator is not None:
+                # Con el evaluador compartido tal cual, todas las islas (o sus copias en
+                # cada proceso) recibirían las mismas semillas: cada una evalúa con un
+                # flujo hijo propio, del que cada generación toma a su vez un hijo
+                options["evaluator"] = evaluator.with_seed(island_seed.spawn(1)[0])
+            self.island_options.append(options)
+        self.best_solution = base_graph.copy()
+        self.best_score = -np.inf
+        self.best_island = None
+        self.island_histories = [[] for _ in range(n_islands)]
+        self.simulations_run = 0
+        self.generation = 0  # Generaciones completadas (continúa entre llamadas a evolve)
+        # Estado de las islas entre llamadas: GeneticOptimizer en este proceso, o
+        # procesos trabajadores con sus conexiones; inmigrantes pendientes y
+        # generaciones ya ejecutadas de la época en curso
+        self._optimizers = None
+        self._connections = None
+        self._workers = None
+        self._closed = False
+        self._pending_immigrants = [[] for _ in range(n_islands)]
+        self._epoch_progress = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        """
+        Detiene los procesos de las islas y cierra los pools de sus evaluadores.
+        Con processes=True, el estado de las islas se pierde y evolve ya no
+        puede continuar
+        """
+        if self._connections is not None:
+            for connection in self._connections:
+                with contextlib.suppress(OSError):
+                    connection.send(None)
+                connection.close()
+            for worker in self._workers:
+                worker.join()
+            self._connections = self._workers = None
+            self._closed = True
+        for optimizer in self._optimizers or ():
+            optimizer.evaluator.close()
+
+    def _immigrants(self, results):
+        """Inmigrantes de cada isla según la topología"""
+        if self.n_islands < 2:
+            return [[] for _ in results]
+        if self.topology == "ring":
+            return [results[i - 1]["migrants"] for i in range(self.n_islands)]
+        immigrants = []
+        for i in range(self.n_islands):
+            pool = [m for j, result in enumerate(results) if j != i for m in result["migrants"]]
+            pool.sort(key=lambda migrant: migrant[0], reverse=True)
+            immigrants.append(pool[:self.n_migrants])
+        return immigrants
+
+    def _start(self):
+        """Crea las islas en la primera llamada a evolve"""
+        if self._closed:
+            raise ValueError("Las islas se cerraron con close(): crea un IslandModel nuevo")
+        if self._optimizers is not None or self._connections is not None:
+            return
+        if self.processes:
+            context = multiprocessing.get_context()
+            self._connections, self._workers = [], []
+            for options in self.island_options:
+                parent_end, child_end = context.Pipe()
+                worker = context.Process(target=_island_worker, args=(child_end, self.base_graph, options),
+                                         daemon=True)
+                worker.start()
+                child_end.close()
+                self._connections.append(parent_end)
+                self._workers.append(worker)
+        else:
+            self._optimizers = [GeneticOptimizer(self.base_graph, **options) for options in self.island_options]
+
+    def _run_epoch(self, n_generations, immigrants):
+        """Ejecuta n_generations en cada isla, tras recibir sus inmigrantes"""
+        if self._optimizers is not None:
+            return [_island_epoch(optimizer, n_generations, incoming, self.n_migrants)
+                    for optimizer, incoming in zip(self._optimizers, immigrants)]
+        for connection, incoming in zip(self._connections, immigrants):
+            connection.send((n_generations, incoming, self.n_migrants))
+        results = [connection.recv() for connection in self._connections]
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
+
+    def evolve(self, generations=10):
+        """
+        Ejecuta las islas por épocas de migration_interval generaciones. Las
+        islas conservan su población, sus flujos aleatorios y la época en curso
+        entre llamadas: evolve(a) seguido de evolve(b) equivale a evolve(a + b).
+        Con processes=True, los procesos siguen vivos hasta close() (o al
+        salir de un bloque with).
+        Returns:
+            (mejor grafo, mejor puntuación, historial combinado por generación)
+            El historial por isla queda en island_histories
+        """
+        self._start()
+        history = []
+        try:
+            done = 0
+            while done < generations:
+                n_generations = min(self.migration_interval - self._epoch_progress, generations - done)
+                results = self._run_epoch(n_generations, self._pending_immigrants)
+                self._merge(results, history, self.generation)
+                self.generation += n_generations
+                self._epoch_progress += n_generations
+                # Solo se migra al completar la época
+                if self._epoch_progress == self.migration_interval:
+                    self._pending_immigrants = self._immigrants(results)
+                    self._epoch_progress = 0
+                else:
+                    self._pending_immigrants = [[] for _ in range(self.n_islands)]
+                done += n_generations
+        except BaseException:
+            # Los procesos de las islas pueden haber quedado a medias: no se puede continuar
+            self.close()
+            raise
+
+        return self.best_solution, self.best_score, history
+
+    def _merge(self, results, history, offset):
+        """Combina los historiales de las islas y actualiza el mejor global"""
+        for i, result in enumerate(results):
+            self.simulations_run += result["simulations_run"]
+            for record in result["history"]:
+                self.island_histories[i].append(dict(record, island=i))
+            if result["best_score"] > self.best_score:
+                self.best_score = result["best_score"]
+                self.best_solution = result["best_solution"]
+                self.best_island = i
+
+        for g in range(len(results[0]["history"])):
+            island_best = [result["history"][g]["best_score"] for result in results]
+            history.append({
+                "generation": offset + g + 1,
+                "best_score": max(island_best),
+                "global_best": max(result["history"][g]["global_best"] for result in results),
+                "island_best": island_best
+            })
+            record = history[-1]
+            print(f"Generación {record['generation']}: Mejor en Generación = {record['best_score']:.4f}, "
+                  f"Mejor Global = {record['global_best']:.4f}")
@@ -1,41 +1,132 @@
+import copy
+import sys
+from readonly import plain_copy, read_only, _MESSAGE
+
+# Propiedades base para todos los nodos
+BASE_PROPERTIES = {
+    "description": "",
+    "bias_risk": {
+        "dif": None,
+        "cultural_bias": None
+    }
+}
+
+# Propiedades específicas por tipo de nodo (plantillas compartidas: cada nodo
+# solo crea su copia de las propiedades al acceder a properties)
+DEFAULT_PROPERTIES = {
+    "construct": {
+        **BASE_PROPERTIES,
+        "content_domains": [],
+        "theoretical_framework": ""
+    },
+    "item": {
+        **BASE_PROPERTIES,
+        "irt_parameters": {
+            "difficulty": None,
+            "discrimination": None,
+            "guessing": None
+        },
+        "classical_metrics": {
+            "p_value": None,
+            "item_total_correlation": None
+        }
+    },
+    "method": {
+        **BASE_PROPERTIES,
+        "response_options": []
+    }
+}
+
+
 class PsychometricNode:
+    __slots__ = ("id", "type", "content", "_properties", "_frozen")
+
     def __init__(self, node_id, node_type, content=None):
+        self._frozen = False
         self.id = node_id
-        self.type = node_type
+        self.type = sys.intern(str(node_type)) if isinstance(node_type, str) else node_type
         self.content = content
-        self.properties = self._create_initial_properties()
-    
-    def _create_initial_properties(self):
-        # Propiedades base para todos los nodos
-        base_props = {
-            "description": "",
-            "bias_risk": {
-                "dif": None,
-                "cultural_bias": None
-            }
+        self._properties = None  # None: las de la plantilla del tipo, sin copiar todavía
+
+    def _defaults(self):
+        return DEFAULT_PROPERTIES.get(self.type, BASE_PROPERTIES)
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise TypeError(f"{_MESSAGE} (nodo {self.id})")
+        object.__setattr__(self, name, value)
+
+    @property
+    def properties(self):
+        """
+        Propiedades del nodo, un dict normal: las propiedades por defecto del
+        tipo se copian de la plantilla en el primer acceso (get_property lee
+        sin copiarlas). Vista de solo lectura si el nodo está compartido.
+        """
+        if self._frozen:
+            return read_only(self._defaults() if self._properties is None else self._properties)
+        if self._properties is None:
+            self._properties = plain_copy(self._defaults())
+        return self._properties
+
+    @properties.setter
+    def properties(self, value):
+        self._properties = value
+
+    def get_property(self, name, default=None):
+        """
+        Valor de una propiedad (default si no existe) sin copiar las
+        propiedades por defecto; los valores de la plantilla y los de un nodo
+        compartido se devuelven como vista de solo lectura
+        """
+        if self._properties is None:
+            properties = self._defaults()
+        elif self._frozen:
+            properties = self._properties
+        else:
+            return self._properties.get(name, default)
+        return read_only(properties[name]) if name in properties else default
+
+    def stored_properties(self):
+        """Propiedades tal como están guardadas: None si aún son las de la plantilla"""
+        return self._properties
+
+    @property
+    def frozen(self):
+        """True si el nodo está compartido entre grafos y no puede modificarse"""
+        return self._frozen
+
+    def freeze(self):
+        """Marca el nodo como compartido: a partir de aquí es de solo lectura"""
+        object.__setattr__(self, "_frozen", True)
+
+    def __deepcopy__(self, memo):
+        # La copia no está compartida con nadie: se puede modificar
+        node = PsychometricNode.__new__(PsychometricNode)
+        for name in ("id", "type", "content", "_properties"):
+            object.__setattr__(node, name, copy.deepcopy(getattr(self, name), memo))
+        object.__setattr__(node, "_frozen", False)
+        return node
+
+    def __reduce__(self):
+        return _restore_node, (self.id, self.type, self.content, self._properties, self._frozen)
+
+    def to_dict(self):
+        """Representación como dicts y listas normales (p. ej. para JSON)"""
+        return {
+            "id": self.id,
+            "type": self.type,
+            "content": self.content,
+            "properties": plain_copy(self._defaults() if self._properties is None else self._properties)
         }
-        
-        # Propiedades específicas por tipo de nodo
-        if self.type == "construct":
-            base_props.update({
-                "content_domains": [],
-                "theoretical_framework": ""
-            })
-        elif self.type == "item":
-            base_props.update({
-                "irt_parameters": {
-                    "difficulty": None,
-                    "discrimination": None,
-                    "guessing": None
-                },
-                "classical_metrics": {
-                    "p_value": None,
-                    "item_total_correlation": None
-                }
-            })
-        elif self.type == "method":
-            base_props.update({
-                "response_options": []
-            })
-            
-        return base_props
\ No newline at end of file
+
+    def __repr__(self):
+        return f"<Node {self.id} ({self.type})>"
+
+
+def _restore_node(node_id, node_type, content, properties, frozen):
+    node = PsychometricNode.__new__(PsychometricNode)
+    for name, value in (("id", node_id), ("type", node_type), ("content", content),
+                        ("_properties", properties), ("_frozen", frozen)):
+        object.__setattr__(node, name, value)
+    return node
@@ -0,0 +1,144 @@
+import numpy as np
+from evaluator import PsychometricEvaluator
+from genetic_optimizer import GeneticOptimizer
+from genome import GenomeEncoding
+from rng import as_seed_sequence
+from strategies import STRATEGIES, parameter_bounds
+
+
+class Optimizer:
+    """
+    Fachada común de las estrategias de búsqueda. 'ga' usa GeneticOptimizer;
+    las estrategias continuas (strategies.STRATEGIES: 'cmaes', 'de') optimizan
+    el vector de difficulty y discrimination de los ítems, con la estructura
+    del grafo base fija, y evalúan cada generación en bloque como genomas.
+    Como en las mutaciones del genético, guessing no forma parte de la
+    búsqueda y conserva el valor del grafo base. Los candidatos no válidos
+    (GenomeEncoding.valid) puntúan -1 sin evaluarse, como en GeneticOptimizer.
+    Todas devuelven lo mismo: (mejor grafo, mejor puntuación, historial), con
+    registros {'generation', 'best_score', 'global_best', 'evaluations'} (candidatos
+    evaluados en la generación; el total acumulado está en self.evaluations).
+    """
+
+    # Opciones del evaluador por defecto que aceptan las estrategias continuas
+    EVALUATOR_OPTIONS = ("instrumentation", "backend", "n_workers")
+
+    def __init__(self, base_graph, strategy="ga", population_size=12, evaluator=None, seed=None,
+                 strategy_options=None, **options):
+        """
+        Args:
+            strategy: 'ga' o una clave de strategies.STRATEGIES
+            population_size: Candidatos por generación (lambda en CMA-ES)
+            evaluator, seed: Como en GeneticOptimizer
+            strategy_options: Argumentos de la estrategia continua (p. ej. sigma
+                en CMA-ES; differential_weight y crossover_rate en DE)
+            options: Resto de argumentos de GeneticOptimizer ('ga') o del
+                evaluador por defecto (instrumentation, backend, n_workers)
+        """
+        if strategy != "ga" and strategy not in STRATEGIES:
+            raise ValueError(f"Estrategia desconocida: {strategy} "
+                             f"(opciones: ga, {', '.join(STRATEGIES)})")
+        self.base_graph = base_graph
+        self.strategy_name = strategy
+        self.population_size = population_size
+        self.history = []
+        self.generation = 0
+        self.evaluations = 0  # Candidatos evaluados
+        self.simulations_run = 0
+        self.best_genome = None
+
+        if strategy == "ga":
+            self.genetic = GeneticOptimizer(base_graph, population_size=population_size, evaluator=evaluator,
+                                            seed=seed, **options)
+            self.evaluator = self.genetic.evaluator
+            self.best_solution = self.genetic.best_solution
+            self.best_score = self.genetic.best_score
+            return
+
+        unknown = set(options) - set(self.EVALUATOR_OPTIONS)
+        if unknown:
+            raise ValueError(f"Opciones no soportadas por la estrategia {strategy}: {', '.join(sorted(unknown))}")
+        evaluation_seed, strategy_seed = as_seed_sequence(seed).spawn(2)
+        self.genetic = None
+        self.evaluator = evaluator or PsychometricEvaluator(n_respondents=3000, n_simulations=3,
+                                                            seed=evaluation_seed, **options)
+        self.encoding = GenomeEncoding(base_graph)
+        lower, upper = parameter_bounds(self.encoding.n_items)
+        self.strategy = STRATEGIES[strategy](
+            self.encoding.parameters[:, :2].ravel(), lower, upper, population_size,
+            rng=np.random.default_rng(strategy_seed), **(strategy_options or {})
+        )
+        self.best_solution = base_graph.copy()
+        self.best_score = self._evaluate(self.encoding.base_population(1))[0][0]
+
+    def instrumentation_report(self):
+        return self.evaluator.instrumentation.report()
+
+    def _evaluate(self, genomes):
+        """
+        Puntuación de cada genoma: los no válidos tienen -1 y no se evalúan.
+        Returns:
+            (puntuaciones (P,), genomas evaluados)
+        """
+        scores = np.full(len(genomes), -1.0)
+        valid = np.flatnonzero(self.encoding.valid(genomes))
+        if len(valid):
+            simulations_before = self.evaluator.simulations_run
+            scores[valid] = self.evaluator.evaluate_genomes(self.encoding, genomes.take(valid))["overall_score"]
+            self.simulations_run += self.evaluator.simulations_run - simulations_before
+        return scores, len(valid)
+
+    def _genomes(self, candidates):
+        """Genomas del grafo base con los parámetros de cada candidato (n, 2 * n_items)"""
+        genomes = self.encoding.base_population(len(candidates))
+        genomes.parameters[..., :2] = candidates.reshape(len(candidates), self.encoding.n_items, 2)
+        return genomes
+
+    def evolve(self, generations=10):
+        """
+        Ejecuta generations generaciones de la estrategia
+        Returns:
+            (mejor grafo, mejor puntuación, historial de esta llamada)
+        """
+        if self.genetic is not None:
+            return self._evolve_genetic(generations)
+
+        history = []
+        stage = self.evaluator.instrumentation.stage
+        for gen in range(generations):
+            with stage("variation"):
+                candidates = self.strategy.ask()
+            genomes = self._genomes(candidates)
+            scores, n_evaluated = self._evaluate(genomes)
+            self.evaluations += n_evaluated
+            best = int(np.argmax(scores))
+            if scores[best] > self.best_score:
+                self.best_score = scores[best]
+                self.best_genome = genomes.take([best])
+            with stage("selection"):
+                self.strategy.tell(scores)
+
+            self.generation += 1
+            history.append({
+                "generation": self.generation,
+                "best_score": scores[best],
+                "global_best": self.best_score,
+                "evaluations": n_evaluated
+            })
+            self.history.append(history[-1])
+            print(f"Generación {self.generation}: Mejor en Generación = {scores[best]:.4f}, "
+                  f"Mejor Global = {self.best_score:.4f}")
+
+        if self.best_genome is not None:
+            self.best_solution = self.encoding.decode(self.best_genome)
+        return self.best_solution, self.best_score, history
+
+    def _evolve_genetic(self, generations):
+        genetic = self.genetic
+        simulations_before = genetic.simulations_run
+        self.best_solution, self.best_score, history = genetic.evolve(generations)
+        self.simulations_run += genetic.simulations_run - simulations_before
+        self.evaluations += sum(record["evaluations"] for record in history)
+        self.generation = genetic.generation
+        self.history.extend(history)
+        return self.best_solution, self.best_score, history
@@ -0,0 +1,93 @@
+import numpy as np
+
+
+def _dominates(first, second):
+    """Matriz (len(first), len(second)): [i, j] si first[i] domina a second[j] (maximización)"""
+    at_least = np.ones((len(first), len(second)), dtype=bool)
+    better = np.zeros((len(first), len(second)), dtype=bool)
+    for a, b in zip(first.T, second.T):
+        at_least &= a[:, np.newaxis] >= b
+        better |= a[:, np.newaxis] > b
+    return at_least & better
+
+
+def _dominated_counts(values, dominators, block_size):
+    """Número de candidatos de dominators (índices) que dominan a cada candidato"""
+    counts = np.zeros(len(values), dtype=np.int64)
+    for start in range(0, len(dominators), block_size):
+        counts += _dominates(values[dominators[start:start + block_size]], values).sum(axis=0)
+    return counts
+
+
+def non_dominated_sort(values, max_elements=2 ** 20):
+    """
+    Ordenación rápida por frentes no dominados (NSGA-II) sobre una matriz
+    (N, n_objetivos), sin guardar la matriz de dominancia N×N: se cuentan los
+    dominadores de cada candidato y, al cerrar cada frente, se descuentan los
+    que aporta, comparando por bloques de filas de como mucho max_elements
+    pares. La memoria es O(N·M + max_elements).
+    Returns:
+        Rango (N,) de cada candidato: 0 = frente de Pareto, 1 = siguiente...
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    block_size = max(1, max_elements // max(n, 1))
+    n_dominators = _dominated_counts(values, np.arange(n), block_size)
+    ranks = np.full(n, -1)
+    rank = 0
+    front = np.flatnonzero(n_dominators == 0)
+    while len(front):
+        ranks[front] = rank
+        n_dominators[front] = -1
+        n_dominators -= _dominated_counts(values, front, block_size)
+        front = np.flatnonzero(n_dominators == 0)
+        rank += 1
+    return ranks
+
+
+def crowding_distance(values, ranks):
+    """
+    Distancia de hacinamiento de cada candidato dentro de su frente (todos los
+    frentes a la vez); los extremos de cada frente tienen distancia infinita
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    distance = np.zeros(n)
+    if n == 0:
+        return distance
+    for column in values.T:
+        order = np.lexsort((column, ranks))
+        sorted_values = column[order]
+        sorted_ranks = ranks[order]
+        first = np.r_[True, sorted_ranks[1:] != sorted_ranks[:-1]]
+        last = np.r_[sorted_ranks[1:] != sorted_ranks[:-1], True]
+        front = np.cumsum(first) - 1
+        span = (sorted_values[last] - sorted_values[first])[front]
+
+        gap = np.zeros(n)
+        gap[1:-1] = sorted_values[2:] - sorted_values[:-2]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gap = np.where(span > 0, gap / span, 0.0)
+        gap[first | last] = np.inf
+        distance[order] += gap
+    return distance
+
+
+def select_survivors(values, n):
+    """
+    Índices de los n mejores candidatos según NSGA-II (rango de frente y, a
+    igual rango, mayor distancia de hacinamiento), en ese orden
+    """
+    ranks = non_dominated_sort(values)
+    crowding = crowding_distance(values, ranks)
+    return np.lexsort((-crowding, ranks))[:n], ranks, crowding
+
+
+def tournament(ranks, crowding, n, rng):
+    """n ganadores de torneos binarios (menor rango; a igual rango, más hacinamiento)"""
+    contestants = rng.integers(0, len(ranks), (n, 2))
+    first, second = contestants[:, 0], contestants[:, 1]
+    first_wins = (ranks[first] < ranks[second]) | (
+        (ranks[first] == ranks[second]) & (crowding[first] >= crowding[second])
+    )
+    return np.where(first_wins, first, second)
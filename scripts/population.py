@@ -0,0 +1,365 @@
+import copy
+import threading
+import numpy as np
+from scipy.stats import norm
+from dif import dif_table, dif_statistics, dif_accumulator
+from compiled_graph import CompiledGraph
+from simulation import cumulative_probabilities
+
+
+class CompiledPopulation:
+    """
+    Parámetros de K grafos compilados apilados en arrays (K, n_items).
+
+    Los grafos con menos ítems se rellenan hasta el máximo de la población con
+    ítems de dificultad infinita (nunca se responden); item_mask indica qué
+    columnas son ítems reales. membership[k, j, c] vale 1
+    si el ítem j del candidato k mide su constructo c.
+
+    thresholds (K, n_items, M-1) contiene los umbrales de categoría (+inf donde
+    el ítem no tiene esa categoría); en ítems dicotómicos es la dificultad.
+    """
+
+    def __init__(self, compiled_graphs):
+        self.graphs = list(compiled_graphs)
+        n_candidates = len(self.graphs)
+        self.n_items = np.array([g.n_items for g in self.graphs], dtype=np.int64)
+        max_items = int(self.n_items.max(initial=0))
+        max_constructs = max((g.n_constructs for g in self.graphs), default=0)
+        max_categories = max((int(g.n_categories.max(initial=2)) for g in self.graphs), default=2)
+
+        self.difficulty = np.full((n_candidates, max_items), np.inf)
+        self.discrimination = np.ones((n_candidates, max_items))
+        self.guessing = np.zeros((n_candidates, max_items))
+        self.item_mask = np.zeros((n_candidates, max_items), dtype=bool)
+        self.membership = np.zeros((n_candidates, max_items, max_constructs), dtype=np.float32)
+        self.thresholds = np.full((n_candidates, max_items, max_categories - 1), np.inf)
+        self.max_score = np.zeros((n_candidates, max_items))
+        self.pcm_mask = np.zeros((n_candidates, max_items), dtype=bool)
+
+        for k, graph in enumerate(self.graphs):
+            n = graph.n_items
+            (self.difficulty[k, :n],
+             self.discrimination[k, :n],
+             self.guessing[k, :n]) = graph.item_parameters()
+            self.item_mask[k, :n] = True
+            constructs = np.repeat(np.arange(graph.n_constructs), np.diff(graph.construct_offsets))
+            self.membership[k, graph.construct_items, constructs] = 1
+
+            thresholds = graph.thresholds
+            self.thresholds[k, :n, :thresholds.shape[1]] = np.where(np.isnan(thresholds), np.inf, thresholds)
+            self.max_score[k, :n] = graph.n_categories - 1
+            self.pcm_mask[k, :n] = graph.response_model == CompiledGraph.MODEL_PCM
+            # El parámetro de azar solo se aplica a ítems dicotómicos
+            self.guessing[k, :n][graph.n_categories > 2] = 0.0
+
+        self.construct_sizes = self.membership.sum(axis=1)
+
+    @classmethod
+    def from_parameters(cls, compiled, parameters, thresholds):
+        """
+        K candidatos con la estructura de un mismo grafo compilado y parámetros
+        propios, sin compilar cada variante (ver genome.GenomeEncoding).
+        Args:
+            parameters: (K, n_items, 3) con difficulty, discrimination, guessing
+            thresholds: Umbrales (K, n_items, M-1)
+        """
+        population = cls([compiled])
+        n_candidates = len(parameters)
+        population.graphs = [compiled] * n_candidates
+        for name in ("n_items", "item_mask", "membership", "construct_sizes", "max_score", "pcm_mask"):
+            array = getattr(population, name)
+            setattr(population, name, np.repeat(array, n_candidates, axis=0))
+        population.difficulty = parameters[..., 0].copy()
+        population.discrimination = parameters[..., 1].copy()
+        population.guessing = np.where(population.max_score > 1, 0.0, parameters[..., 2])
+        population.thresholds = np.where(np.isnan(thresholds), np.inf, thresholds)
+        return population
+
+    def __len__(self):
+        return len(self.n_items)
+
+    def subset(self, indices):
+        """Subpoblación con los candidatos indicados (sin recompilar)"""
+        sub = copy.copy(self)
+        sub.graphs = [self.graphs[k] for k in indices] if self.graphs else []
+        for name in ("n_items", "difficulty", "discrimination", "guessing", "item_mask",
+                     "membership", "construct_sizes", "thresholds", "max_score", "pcm_mask"):
+            setattr(sub, name, getattr(self, name)[indices])
+        return sub
+
+    def compact(self):
+        """Copia solo con los arrays (sin las instantáneas CompiledGraph), para enviarla a otros procesos"""
+        compact = copy.copy(self)
+        compact.graphs = []
+        return compact
+
+    @property
+    def max_items(self):
+        return self.item_mask.shape[1]
+
+    @property
+    def is_polytomous(self):
+        """True si algún candidato tiene ítems con más de dos categorías"""
+        return self.thresholds.shape[2] > 1
+
+    @property
+    def n_strata(self):
+        """Estratos de puntuación total posibles (fijos para poder sumar bloques)"""
+        return int(self.max_score.sum(axis=1).max(initial=0)) + 1
+
+
+def moment_statistics(responses, membership):
+    """
+    Sumas y sumas de cuadrados por ítem y por puntuación total de constructo.
+    Args:
+        responses: Respuestas de forma (K, n_respondents, n_items)
+        membership: Matriz ítem-constructo de forma (K, n_items, n_constructs)
+    """
+    values = responses.astype(np.float32)
+    totals = np.matmul(values, membership)
+    return {
+        'n': responses.shape[1],
+        'item_sum': values.sum(axis=1, dtype=np.float64),
+        'item_sumsq': np.square(values).sum(axis=1, dtype=np.float64),
+        'total_sum': totals.sum(axis=1, dtype=np.float64),
+        'total_sumsq': np.square(totals).sum(axis=1, dtype=np.float64)
+    }
+
+
+def response_statistics(responses, membership, group, n_groups=2, n_strata=None):
+    """
+    Estadísticos suficientes de un bloque de respuestas de toda la población.
+    Args:
+        responses: Respuestas de forma (K, n_respondents, n_items)
+        membership: Matriz ítem-constructo de forma (K, n_items, n_constructs)
+        group: Grupo (0 = referencia, 1..n_groups-1 = focales) de cada persona,
+            compartido por los K candidatos
+        n_strata: Estratos de puntuación total (por defecto, n_items + 1)
+    Returns:
+        Dict con sumas por ítem, por puntuación total de constructo y la tabla
+        estrato × grupo × ítem para el análisis de DIF
+    """
+    stats = moment_statistics(responses, membership)
+    # Número de estratos fijo para poder sumar tablas de distintos bloques
+    n_strata = n_strata or responses.shape[2] + 1
+    stats['dif_counts'], stats['dif_sums'] = dif_table(responses, group, n_groups, n_strata=n_strata)
+    return stats
+
+
+class StatisticsAccumulator:
+    """
+    Estadísticos suficientes de una réplica acumulados bloque a bloque a medida
+    que cada bloque de personas termina, sin guardar los bloques. Es seguro
+    entre hilos: cada bloque se suma con un cerrojo.
+    """
+
+    def __init__(self, population, n_groups, n_respondents):
+        self.n_groups = n_groups
+        self.n_strata = population.n_strata
+        self.stats = None
+        self.dif = dif_accumulator(
+            len(population), self.n_strata, n_groups, population.max_items,
+            n_respondents * int(population.max_score.max(initial=0))
+        )
+        self._lock = threading.Lock()
+
+    def add_moments(self, responses, membership):
+        """Suma las sumas de moment_statistics de un bloque (K, n_respondents, n_items)"""
+        stats = moment_statistics(responses, membership)
+        with self._lock:
+            if self.stats is None:
+                self.stats = stats
+            else:
+                for key, value in stats.items():
+                    self.stats[key] += value
+        return stats
+
+    def add_dif(self, responses, group):
+        """Suma la tabla de DIF de un bloque"""
+        dif_table(responses, group, self.n_groups, n_strata=self.n_strata, out=self.dif, lock=self._lock)
+
+    def statistics(self):
+        """Dict con las sumas de moment_statistics y la tabla de DIF ('dif_counts', 'dif_sums')"""
+        return dict(self.stats, dif_counts=self.dif[0], dif_sums=self.dif[1])
+
+
+def _variance(total, total_sq, n):
+    """Varianza muestral (ddof=1) a partir de sumas y sumas de cuadrados"""
+    return (total_sq - total * total / n) / (n - 1)
+
+
+def reliability_from_statistics(stats, population):
+    """Alfa de Cronbach promedio por candidato (vector de longitud K)"""
+    n = stats['n']
+    if n < 2 or population.max_items == 0:
+        return np.zeros(len(population))
+
+    item_var = _variance(stats['item_sum'], stats['item_sumsq'], n)
+    total_var = _variance(stats['total_sum'], stats['total_sumsq'], n)
+    return alpha_from_variances(item_var, total_var, population)
+
+
+def alpha_from_variances(item_var, total_var, population):
+    """
+    Alfa de Cronbach promedio por candidato a partir de las varianzas de los
+    ítems (K, n_items) y de las puntuaciones totales por constructo (K, n_constructs)
+    """
+    sum_item_var = np.einsum('ki,kic->kc', item_var, population.membership)
+    sizes = population.construct_sizes
+
+    valid = (sizes >= 2) & (total_var > 1e-10)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        alpha = (sizes / (sizes - 1)) * (1 - sum_item_var / total_var)
+    alpha = np.where(valid, np.clip(alpha, 0, 1), 0.0)
+
+    n_valid = valid.sum(axis=1)
+    return np.where(n_valid > 0, alpha.sum(axis=1) / np.maximum(n_valid, 1), 0.0)
+
+
+def expected_statistics(population, theta_mean=0, theta_std=1, n_quadrature=41):
+    """
+    Varianzas esperadas de ítems y puntuaciones totales bajo theta ~ N(mean, std),
+    integrando con cuadratura de Gauss-Hermite en lugar de simular respuestas.
+    Con independencia local, Var(T) = E[Var(T | theta)] + Var(E[T | theta]).
+    Para ítems politómicos, E[X | theta] = sum_k P(X >= k) y
+    E[X^2 | theta] = sum_k (2k - 1) P(X >= k).
+    Returns:
+        Dict con 'item_var' (K, n_items), 'total_var' (K, n_constructs) y
+        'stratified_var' (K, n_items), la varianza de cada ítem dentro de los
+        estratos de puntuación total del análisis de DIF (ver stratified_item_variance)
+    """
+    nodes, weights = np.polynomial.hermite_e.hermegauss(n_quadrature)
+    weights = weights / weights.sum()
+    theta = theta_mean + theta_std * nodes
+
+    cumulative = cumulative_probabilities(
+        theta,
+        population.discrimination[:, np.newaxis, :],
+        population.guessing[:, np.newaxis, :],
+        population.thresholds[:, np.newaxis, :, :],
+        population.pcm_mask[:, np.newaxis, :]
+    )
+    score_weights = 2 * np.arange(1, cumulative.shape[-1] + 1) - 1
+    item_mean = cumulative.sum(axis=-1)
+    item_second = cumulative @ score_weights
+
+    mean = np.einsum('q,kqi->ki', weights, item_mean)
+    item_var = np.einsum('q,kqi->ki', weights, item_second) - np.square(mean)
+
+    conditional_var = np.matmul(item_second - np.square(item_mean), population.membership)
+    conditional_mean = np.matmul(item_mean, population.membership)
+    total_mean = np.einsum('q,kqc->kc', weights, conditional_mean)
+    total_var = (np.einsum('q,kqc->kc', weights, conditional_var + np.square(conditional_mean))
+                 - np.square(total_mean))
+
+    # P(X = k | theta) a partir de las acumuladas P(X >= k)
+    n_candidates, n_nodes, n_items = cumulative.shape[:3]
+    bounds = np.concatenate((np.ones((n_candidates, n_nodes, n_items, 1)), cumulative,
+                             np.zeros((n_candidates, n_nodes, n_items, 1))), axis=-1)
+    categories = np.maximum(-np.diff(bounds, axis=-1), 0.0)
+    stratified_var = stratified_item_variance(categories, weights, population.max_score)
+
+    return {'item_var': item_var, 'total_var': total_var, 'stratified_var': stratified_var}
+
+
+def _add_item(distribution, categories):
+    """Distribución de la puntuación total tras sumar un ítem (recursión de Lord-Wingersky)"""
+    result = distribution * categories[..., :1]
+    for x in range(1, min(categories.shape[-1], distribution.shape[-1])):
+        result[..., x:] += distribution[..., :-x] * categories[..., x:x + 1]
+    return result
+
+
+def stratified_item_variance(categories, weights, max_score, max_elements=2 ** 22):
+    """
+    E[Var(X_j | S)]: varianza esperada de cada ítem dentro de los estratos de
+    puntuación total S que usa el STD P-DIF. Para cada nodo de cuadratura, la
+    distribución de S y la conjunta de (X_j, S) se obtienen sumando ítems con
+    la recursión de Lord-Wingersky; la del resto de ítems se forma con las
+    distribuciones de los ítems anteriores y posteriores a j.
+    Args:
+        categories: P(X = k | theta) de forma (K, Q, n_items, M)
+        weights: Pesos de cuadratura (Q,) que suman 1
+        max_score: Puntuación máxima de cada ítem (K, n_items)
+        max_elements: Tamaño máximo de los arrays intermedios; los candidatos
+            se procesan por bloques para no superarlo
+    Returns:
+        Array (K, n_items)
+    """
+    n_candidates, n_nodes, n_items, n_categories = categories.shape
+    # Puntuaciones alcanzables por los ítems anteriores y posteriores a cada uno
+    item_max = max_score.max(axis=0, initial=0).astype(np.int64) if n_candidates else np.zeros(n_items, dtype=np.int64)
+    n_strata = int(item_max.sum()) + 1
+    before = np.concatenate(([0], np.cumsum(item_max)))
+    after = before[-1] - before[1:]
+    scores = np.arange(n_categories)
+
+    result = np.zeros((n_candidates, n_items))
+    block = max(1, max_elements // max(1, (n_items + 1) * n_nodes * n_strata))
+    for start in range(0, n_candidates, block):
+        probs = categories[start:start + block]
+        shape = probs.shape[:2] + (n_strata,)
+        prefix = np.zeros((n_items + 1,) + shape)
+        prefix[0, ..., 0] = 1.0
+        for j in range(n_items):
+            prefix[j + 1] = _add_item(prefix[j], probs[:, :, j])
+        total = np.einsum('q,kqs->ks', weights, prefix[n_items])
+
+        suffix = np.zeros(shape)
+        suffix[..., 0] = 1.0
+        for j in reversed(range(n_items)):
+            # Distribución del resto de ítems: convolución de prefijo y sufijo,
+            # recorriendo el soporte más corto de los dos
+            rest = np.zeros(shape)
+            short, long = (prefix[j], suffix) if before[j] <= after[j] else (suffix, prefix[j])
+            for s in range(min(before[j], after[j]) + 1):
+                rest[..., s:] += short[..., s:s + 1] * long[..., :n_strata - s]
+            item = probs[:, :, j]
+            joint_mean = np.einsum('q,kqs->ks', weights, _add_item(rest, item * scores))
+            second = np.einsum('q,kq->k', weights, item @ np.square(scores))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                between = np.where(total > 0, np.square(joint_mean) / total, 0.0).sum(axis=1)
+            result[start:start + block, j] = np.maximum(second - between, 0.0)
+            suffix = _add_item(suffix, item)
+    return result
+
+
+def bias_from_statistics(stats, population):
+    """
+    Indicador de sesgo por candidato a partir de la diferencia de proporciones
+    estandarizada (STD P-DIF, estratificada por puntuación total), promediada
+    sobre los grupos focales
+    """
+    std_p_dif = dif_statistics(stats['dif_counts'], stats['dif_sums'])['std_p_dif']
+    # En ítems politómicos es una diferencia de medias: se reescala a [0, 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        diff = np.abs(np.nan_to_num(std_p_dif, nan=0.0)).mean(axis=1) / population.max_score
+    bias_scores = np.where(population.item_mask, 1.0 - np.minimum(1.0, diff * 3), 0.0)
+    n_items = population.n_items
+    return np.where(n_items > 0, bias_scores.sum(axis=1) / np.maximum(n_items, 1), 1.0)
+
+
+def expected_bias(stratified_var, population, n_respondents, n_groups=2):
+    """
+    Indicador de sesgo esperado (el de bias_from_statistics) cuando los
+    n_respondents se reparten al azar en n_groups grupos con la misma
+    distribución de habilidad, como en la simulación. El STD P-DIF de cada ítem
+    es entonces ruido de muestreo dentro de los estratos de puntuación total:
+    D ~ N(0, E[Var(X | S)] (1/n_focal + 1/n_ref)), y el indicador por ítem es
+    1 - E[min(1, 3 |D| / max_score)], con forma cerrada para la normal plegada.
+    Es exacto (salvo la aproximación normal) con un solo grupo focal; con
+    varios, usa el valor esperado de cada uno.
+    Args:
+        stratified_var: E[Var(X_j | S)] de expected_statistics (K, n_items)
+    """
+    group_size = n_respondents / n_groups
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = 3 * np.sqrt(np.maximum(stratified_var, 0.0) * 2 / group_size) / population.max_score
+        scale = np.where(population.item_mask, scale, 0.0)
+        # E[min(1, Y)] con Y = |N(0, scale^2)|: E[Y] - E[(Y - 1)+]
+        z = np.where(scale > 0, 1 / scale, np.inf)
+        truncated = scale * np.sqrt(2 / np.pi) - 2 * (scale * norm.pdf(z) - norm.sf(z))
+    bias_scores = np.where(population.item_mask, 1.0 - truncated, 0.0)
+    n_items = population.n_items
+    return np.where(n_items > 0, bias_scores.sum(axis=1) / np.maximum(n_items, 1), 1.0)
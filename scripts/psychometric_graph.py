@@ -1,13 +1,105 @@
+import copy
+import json
+import sys
+import numpy as np
 import networkx as nx
-from node import PsychometricNode
+from node import BASE_PROPERTIES, DEFAULT_PROPERTIES, PsychometricNode
 from edge import PsychometricEdge
+from compiled_graph import CompiledGraph
+from serialization import graph_from_dict, graph_to_dict, graph_to_json, open_graph, write_graph
+
+
+def _intern(node_id):
+    """
+    Identificador internado: los ids repetidos en nodos y aristas comparten el
+    mismo objeto (las subclases de str, como numpy.str_, pasan a str)
+    """
+    return sys.intern(str(node_id)) if isinstance(node_id, str) else node_id
+
+
+def _values(column):
+    """Valores Python de una columna (array de numpy, Series de pandas o secuencia)"""
+    return column.tolist() if hasattr(column, "tolist") else list(column)
+
+
+def _column(values, n, name):
+    """
+    Columna de n valores Python: un escalar se repite y los NaN pasan a None
+    """
+    if values is None or isinstance(values, (str, bytes)) or not hasattr(values, "__len__"):
+        return [values] * n
+    values = _values(values)
+    if len(values) != n:
+        raise ValueError(f"La columna {name} tiene {len(values)} valores; se esperaban {n}")
+    return [None if isinstance(value, float) and value != value else value for value in values]
+
+
+def _irt_parameters(irt, n):
+    """Dicts irt_parameters de n ítems a partir de columnas de IRT_COLUMNS"""
+    missing = [None] * n
+    difficulty, discrimination, guessing = (
+        [None if value is None else float(value) for value in irt.get(name, missing)]
+        for name in ("difficulty", "discrimination", "guessing")
+    )
+    thresholds = irt.get("thresholds", missing)
+    models = irt.get("model", missing)
+    parameters = []
+    for i in range(n):
+        params = {"difficulty": difficulty[i], "discrimination": discrimination[i], "guessing": guessing[i]}
+        if thresholds[i] is not None:
+            item_thresholds = [float(b) for b in thresholds[i] if b == b]
+            if item_thresholds:
+                params["thresholds"] = item_thresholds
+        if models[i] is not None:
+            params["model"] = models[i]
+        parameters.append(params)
+    return parameters
+
+
+def _copies(template, n):
+    """n copias independientes de un dict con tipos JSON (decodificadas en bloque)"""
+    text = json.dumps(template)
+    return json.loads("[" + ",".join([text] * n) + "]")
+
+
+def _table_columns(table):
+    """Columnas de un DataFrame de pandas como dict {nombre: array}"""
+    return {name: table[name].to_numpy() for name in table.columns}
+
 
 class PsychometricGraph:
+    # Columnas de add_items_from_arrays que forman irt_parameters
+    IRT_COLUMNS = ("difficulty", "discrimination", "guessing", "thresholds", "model")
+    # Estructuras internas que los clones comparten hasta que una se modifica
+    SHARED_STRUCTURES = ("_node_ids", "_node_index", "_item_method")
+
     def __init__(self):
         """Grafo psicométrico con soporte para metadatos estructurados"""
-        self.graph = nx.DiGraph()
         self.nodes = {}  # Dict {node_id: PsychometricNode}
-        self.edges = {}  # Dict {(source, target): PsychometricEdge}
+        self.edges = {}  # Dict {(source, target): PsychometricEdge}; única copia de las relaciones
+        # Cada nodo tiene un índice entero, usado por la adyacencia en formato CSR
+        self._node_ids = []  # Índice -> node_id
+        self._node_index = {}  # node_id -> índice
+        self._csr = {}  # Caché por tipo de la adyacencia directa e inversa, derivada de _edges_by_type
+        # Índices mantenidos al añadir y eliminar (conjuntos como dicts ordenados
+        # por inserción, {miembro: None}); con _edges_by_type, eliminar una
+        # relación no recorre las demás
+        self._nodes_by_type = {}  # {tipo de nodo: {node_id}}
+        self._edges_by_type = {}  # {tipo de relación: {(source, target)}}
+        self._construct_items = {}  # {constructo: {ítem}} (relaciones 'measures')
+        self._item_method = {}  # {ítem: método} (relación 'uses_method' más reciente)
+        # Nodos, aristas, conjuntos de los índices y SHARED_STRUCTURES propios
+        # (no compartidos con clones): se pueden modificar in situ
+        self._owned_nodes = set()
+        self._owned_edges = set()
+        self._owned_buckets = set()
+        self._owned_structures = set(self.SHARED_STRUCTURES)
+
+    def __getstate__(self):
+        # La caché CSR se reconstruye al usarse
+        state = self.__dict__.copy()
+        state["_csr"] = {}
+        return state
 
     def add_node(self, node_id, node_type, content=None, **kwargs):
         """
@@ -18,6 +110,7 @@ class PsychometricGraph:
             content: Descripción/texto del nodo
             kwargs: Propiedades adicionales
         """
+        node_id = _intern(node_id)
         node = PsychometricNode(node_id, node_type, content)
         
         # Añadir propiedades estándar y personalizadas
@@ -27,8 +120,13 @@ class PsychometricGraph:
             else:
                 node.properties[key] = value
         
-        self.graph.add_node(node_id)
+        if node_id not in self._node_index:
+            self._add_node_ids([node_id])
+        elif self.nodes[node_id].type != node.type:
+            self._index_remove("_nodes_by_type", self.nodes[node_id].type, node_id)
+        self._index_add("_nodes_by_type", node.type, node_id)
         self.nodes[node_id] = node
+        self._owned_nodes.add(node_id)
         return node
 
     def add_edge(self, source_id, target_id, relationship_type, **kwargs):
@@ -39,6 +137,8 @@ class PsychometricGraph:
         """
         if source_id not in self.nodes or target_id not in self.nodes:
             raise ValueError(f"Nodos no encontrados: {source_id} o {target_id}")
+        source_id = self._node_ids[self._node_index[source_id]]
+        target_id = self._node_ids[self._node_index[target_id]]
 
         edge = PsychometricEdge(source_id, target_id, relationship_type)
         
@@ -56,28 +156,502 @@ class PsychometricGraph:
         edge.properties.update(properties)
         edge.update_metadata(metadata)
         
-        # Registrar en la estructura
-        self.graph.add_edge(source_id, target_id)
-        self.edges[(source_id, target_id)] = edge
+        # Registrar en la estructura (la arista es propia: se puede modificar)
+        self._insert_edge(edge)
+        self._owned_edges.add((source_id, target_id))
         return edge
 
+    def add_items_from_arrays(self, ids, content=None, node_type="item", **columns):
+        """
+        Añade nodos en bloque a partir de columnas, sin el coste de add_node por
+        elemento. Los valores None o NaN se omiten.
+        Args:
+            ids: Identificadores, o un DataFrame de pandas con una columna 'id'
+                (si no la tiene, se usa el índice) y las demás columnas con los
+                nombres de los argumentos
+            content: Texto de cada nodo (secuencia o valor común)
+            node_type: Tipo común de los nodos
+            columns: Columnas de IRT_COLUMNS, que forman irt_parameters
+                (thresholds: una lista o fila con NaN de relleno por ítem), y de
+                propiedades adicionales
+        Returns:
+            Lista de nodos creados
+        """
+        if hasattr(ids, "columns"):
+            table = _table_columns(ids)
+            ids = table.pop("id") if "id" in table else ids.index
+            table_content = table.pop("content", None)
+            content = table_content if content is None else content
+            columns = {**table, **columns}
+        ids = [_intern(node_id) for node_id in _values(ids)]
+        n = len(ids)
+        contents = _column(content, n, "content")
+        irt = {name: _column(columns.pop(name), n, name) for name in self.IRT_COLUMNS if name in columns}
+        irt_parameters = _irt_parameters(irt, n) if irt else None
+        properties = [(name, _column(values, n, name)) for name, values in columns.items()]
+
+        nodes = []
+        defaults = _copies(DEFAULT_PROPERTIES.get(node_type, BASE_PROPERTIES), n)
+        for i, node_id in enumerate(ids):
+            node = PsychometricNode(node_id, node_type, contents[i])
+            node_properties = defaults[i]
+            if irt_parameters is not None:
+                node_properties["irt_parameters"] = irt_parameters[i]
+            for name, values in properties:
+                if values[i] is not None:
+                    node_properties[name] = values[i]
+            node.properties = node_properties
+            nodes.append(node)
+
+        self.insert_nodes(nodes, owned=True)
+        return nodes
+
+    def add_edges_from(self, sources, targets=None, relationship_types=None, **columns):
+        """
+        Añade relaciones en bloque a partir de columnas, sin el coste de add_edge
+        por elemento. Como en add_edge, las columnas con prefijo 'meta_' son
+        metadatos (con anidación por puntos) y el resto propiedades; los valores
+        None o NaN se omiten.
+        Args:
+            sources, targets: Identificadores de origen y destino, o sources como
+                DataFrame de pandas con columnas 'source', 'target' y 'type' (las
+                demás son columnas de propiedades o metadatos)
+            relationship_types: Tipo de cada relación (secuencia o valor común)
+        Returns:
+            Lista de aristas registradas (de una clave repetida, solo la última)
+        """
+        if hasattr(sources, "columns"):
+            table = _table_columns(sources)
+            sources = table.pop("source")
+            targets = table.pop("target") if targets is None else targets
+            table_types = table.pop("type", None)
+            relationship_types = table_types if relationship_types is None else relationship_types
+            columns = {**table, **columns}
+        if targets is None or relationship_types is None:
+            raise ValueError("Faltan los destinos o los tipos de las relaciones")
+        sources = _values(sources)
+        n = len(sources)
+        targets = _column(targets, n, "target")
+        types = _column(relationship_types, n, "type")
+        self._check_nodes(sources, targets)
+        sources = [self._node_ids[self._node_index[s]] for s in sources]
+        targets = [self._node_ids[self._node_index[t]] for t in targets]
+
+        properties = []
+        metadata = []
+        for name, values in columns.items():
+            if name.startswith('meta_'):
+                metadata.append((name[5:], _column(values, n, name)))
+            else:
+                properties.append((name, _column(values, n, name)))
+
+        edges = []
+        for i in range(n):
+            edge = PsychometricEdge(sources[i], targets[i], types[i])
+            for name, values in properties:
+                if values[i] is not None:
+                    edge.properties[name] = values[i]
+            if metadata:
+                edge.update_metadata({key: values[i] for key, values in metadata if values[i] is not None})
+            edges.append(edge)
+        return self.insert_edges(edges, owned=True)
+
+    def _check_nodes(self, sources, targets):
+        missing = [node_id for node_id in dict.fromkeys(list(sources) + list(targets))
+                   if node_id not in self._node_index]
+        if missing:
+            raise ValueError(f"Nodos no encontrados: {', '.join(str(node_id) for node_id in missing[:10])}")
+
+    def insert_nodes(self, nodes, owned=False):
+        """
+        Registra en bloque PsychometricNode ya creados, con el mismo resultado
+        que add_node uno a uno (cada nodo sustituye al que tuviera su id).
+        Args:
+            owned: Si los nodos son exclusivos de este grafo; si no (p. ej.
+                compartidos con otro grafo), quedan de solo lectura y
+                mutable_node los copiará antes de modificarlos
+        """
+        added = []
+        buckets = {}
+        for node in nodes:
+            node_id = node.id
+            if node_id not in self.nodes:
+                added.append(node_id)
+            elif self.nodes[node_id].type != node.type:
+                self._index_remove("_nodes_by_type", self.nodes[node_id].type, node_id)
+            bucket = buckets.get(node.type)
+            if bucket is None:
+                bucket = buckets[node.type] = self._writable_bucket("_nodes_by_type", node.type)
+            bucket[node_id] = None
+            self.nodes[node_id] = node
+            if owned:
+                self._owned_nodes.add(node_id)
+            else:
+                node.freeze()
+                self._owned_nodes.discard(node_id)
+        if added:
+            self._add_node_ids(added)
+
+    def _add_node_ids(self, node_ids):
+        """Asigna índices a nodos nuevos"""
+        node_index = self._writable("_node_index")
+        ids = self._writable("_node_ids")
+        for node_id in node_ids:
+            node_index[node_id] = len(ids)
+            ids.append(node_id)
+        self._csr = {}
+
+    def insert_edges(self, edges, owned=False):
+        """
+        Registra en bloque PsychometricEdge ya creados, con el mismo resultado
+        que insert_edge uno a uno: las relaciones existentes entre los mismos
+        nodos se sustituyen y, si una clave se repite, solo cuenta la última.
+        Args:
+            owned: Como en insert_nodes (mutable_edge copia las no propias)
+        Returns:
+            Lista de aristas registradas
+        """
+        edges = list(edges)
+        self._check_nodes((edge.source for edge in edges), (edge.target for edge in edges))
+        keys = [(edge.source, edge.target) for edge in edges]
+        last = dict(zip(keys, range(len(edges))))
+        replaced = [key for key in last if key in self.edges]
+        if replaced:
+            self._remove_edges(replaced)
+        kept = sorted(last.values()) if len(last) < len(edges) else range(len(edges))
+
+        positions = {edge.type: [] for edge in edges}
+        for i in kept:
+            positions[edges[i].type].append(i)
+        for relationship_type, group in positions.items():
+            self._writable_bucket("_edges_by_type", relationship_type).update(dict.fromkeys(keys[i] for i in group))
+            self._changed(relationship_type)
+        construct_items = {}
+        for i in positions.get("measures", ()):
+            construct_items.setdefault(keys[i][1], []).append(keys[i][0])
+        for construct, items in construct_items.items():
+            self._writable_bucket("_construct_items", construct).update(dict.fromkeys(items))
+        if positions.get("uses_method"):
+            item_method = self._writable("_item_method")
+            for i in positions["uses_method"]:
+                item_method[keys[i][0]] = keys[i][1]
+        self.edges.update((keys[i], edges[i]) for i in kept)
+        if owned:
+            self._owned_edges.update(last)
+        else:
+            for i in kept:
+                edges[i].freeze()
+        return [edges[i] for i in kept]
+
+    def insert_edge(self, edge):
+        """
+        Registra un PsychometricEdge ya creado (p. ej. compartido con otro grafo).
+        No se considera propio: queda de solo lectura y mutable_edge lo
+        copiará antes de modificarlo. Sustituye a la arista que hubiera entre
+        los mismos nodos.
+        """
+        self._insert_edge(edge)
+        edge.freeze()
+
+    def _insert_edge(self, edge):
+        if edge.source not in self.nodes or edge.target not in self.nodes:
+            raise ValueError(f"Nodos no encontrados: {edge.source} o {edge.target}")
+        key = (edge.source, edge.target)
+        if key in self.edges:
+            self.remove_edge(*key)
+        self.edges[key] = edge
+        self._index_add("_edges_by_type", edge.type, key)
+        if edge.type == "measures":
+            self._index_add("_construct_items", edge.target, edge.source)
+        elif edge.type == "uses_method":
+            self._writable("_item_method")[edge.source] = edge.target
+        self._changed(edge.type)
+
+    def remove_edge(self, source_id, target_id):
+        """Elimina la relación source -> target"""
+        key = (source_id, target_id)
+        edge = self.edges.pop(key, None)
+        if edge is None:
+            raise ValueError(f"Relación no encontrada: {source_id} -> {target_id}")
+        self._owned_edges.discard(key)
+        self._index_remove("_edges_by_type", edge.type, key)
+        if edge.type == "measures":
+            self._index_remove("_construct_items", target_id, source_id)
+        elif edge.type == "uses_method" and self._item_method.get(source_id) == target_id:
+            # Si al ítem le queda otro método, pasa a ser el más reciente de ellos
+            methods = [t for s, t in self._edges_by_type.get("uses_method", ()) if s == source_id]
+            item_method = self._writable("_item_method")
+            if methods:
+                item_method[source_id] = methods[-1]
+            else:
+                del item_method[source_id]
+        self._changed(edge.type)
+        return edge
+
+    def _remove_edges(self, keys):
+        """Elimina en bloque relaciones existentes (como remove_edge sobre cada una)"""
+        groups = {}
+        for key in keys:
+            edge = self.edges.pop(key)
+            self._owned_edges.discard(key)
+            groups.setdefault(edge.type, []).append(key)
+        orphans = set()  # Ítems que pierden su método actual
+        for relationship_type, group in groups.items():
+            bucket = self._writable_bucket("_edges_by_type", relationship_type)
+            for key in group:
+                del bucket[key]
+            if relationship_type == "measures":
+                for source_id, target_id in group:
+                    self._index_remove("_construct_items", target_id, source_id)
+            elif relationship_type == "uses_method":
+                orphans.update(s for s, t in group if self._item_method.get(s) == t)
+            self._changed(relationship_type)
+        if orphans:
+            # Como en remove_edge: pasa a contar el método más reciente que quede
+            item_method = self._writable("_item_method")
+            for item_id in orphans:
+                del item_method[item_id]
+            for source_id, target_id in self._edges_by_type.get("uses_method", ()):
+                if source_id in orphans:
+                    item_method[source_id] = target_id
+
+    def clear_edges(self):
+        """Elimina todas las relaciones (los nodos se conservan)"""
+        self.edges = {}
+        self._csr = {}
+        self._edges_by_type = {}
+        self._construct_items = {}
+        self._item_method = {}
+        self._owned_structures.add("_item_method")
+        self._owned_edges = set()
+        self._owned_buckets = {(name, key) for name, key in self._owned_buckets if name == "_nodes_by_type"}
+
+    def _writable(self, name):
+        """Estructura de SHARED_STRUCTURES que se puede modificar (se copia si está compartida)"""
+        if name not in self._owned_structures:
+            setattr(self, name, copy.copy(getattr(self, name)))
+            self._owned_structures.add(name)
+        return getattr(self, name)
+
+    def _writable_bucket(self, index_name, key):
+        """Conjunto de un índice que se puede modificar (se copia si está compartido)"""
+        index = getattr(self, index_name)
+        if (index_name, key) not in self._owned_buckets:
+            index[key] = dict(index.get(key, {}))  # Copia del conjunto compartido
+            self._owned_buckets.add((index_name, key))
+        return index[key]
+
+    def _index_add(self, index_name, key, member):
+        self._writable_bucket(index_name, key)[member] = None
+
+    def _index_remove(self, index_name, key, member):
+        index = getattr(self, index_name)
+        if member not in index.get(key, ()):
+            return
+        if (index_name, key) not in self._owned_buckets:
+            index[key] = dict(index[key])
+            self._owned_buckets.add((index_name, key))
+        del index[key][member]
+
+    def nodes_of_type(self, node_type):
+        """Identificadores de los nodos de un tipo, en orden de inserción"""
+        return list(self._nodes_by_type.get(node_type, ()))
+
+    def edges_of_type(self, relationship_type):
+        """Claves (source, target) de las relaciones de un tipo, en orden de inserción"""
+        return list(self._edges_by_type.get(relationship_type, ()))
+
+    def construct_items(self, construct_id):
+        """Ítems que miden un constructo (relaciones 'measures')"""
+        return list(self._construct_items.get(construct_id, ()))
+
+    def item_method(self, item_id):
+        """Método de respuesta de un ítem (relación 'uses_method') o None"""
+        return self._item_method.get(item_id)
+
+    def _changed(self, relationship_type):
+        self._csr.pop(relationship_type, None)
+
+    def _csr_arrays(self, relationship_type):
+        """
+        Adyacencia de un tipo en formato CSR (se construye al pedirla y se guarda
+        hasta el siguiente cambio): (offsets, destinos, offsets inversos, orígenes)
+        """
+        csr = self._csr.get(relationship_type)
+        if csr is None:
+            n_nodes = len(self._node_ids)
+            keys = self._edges_by_type.get(relationship_type, {})
+            index = self._node_index
+            sources = np.fromiter((index[source] for source, _ in keys), dtype=np.int64, count=len(keys))
+            targets = np.fromiter((index[target] for _, target in keys), dtype=np.int64, count=len(keys))
+            csr = []
+            for keys, values in ((sources, targets), (targets, sources)):
+                offsets = np.zeros(n_nodes + 1, dtype=np.int64)
+                np.cumsum(np.bincount(keys, minlength=n_nodes), out=offsets[1:])
+                csr.extend((offsets, values[np.argsort(keys, kind="stable")]))
+            csr = tuple(csr)
+            self._csr[relationship_type] = csr
+        return csr
+
+    def _neighbors(self, node_id, relationship_type, reverse):
+        index = self._node_index[node_id]
+        types = self._edges_by_type if relationship_type is None else [relationship_type]
+        neighbors = []
+        for t in types:
+            offsets, values = self._csr_arrays(t)[2:] if reverse else self._csr_arrays(t)[:2]
+            neighbors.extend(self._node_ids[i] for i in values[offsets[index]:offsets[index + 1]])
+        return neighbors
+
+    def successors(self, node_id, relationship_type=None):
+        """Destinos de las relaciones que salen de un nodo (opcionalmente de un tipo)"""
+        return self._neighbors(node_id, relationship_type, reverse=False)
+
+    def predecessors(self, node_id, relationship_type=None):
+        """Orígenes de las relaciones que llegan a un nodo (opcionalmente de un tipo)"""
+        return self._neighbors(node_id, relationship_type, reverse=True)
+
+    @property
+    def graph(self):
+        """
+        networkx.DiGraph con los nodos y relaciones del grafo (el tipo de cada
+        relación en el atributo 'relationship_type'), para dibujo y algoritmos
+        de grafos. Se construye en cada acceso: puede modificarse, pero los
+        cambios no se reflejan en este grafo (se usan add_node/add_edge)
+        """
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self._node_ids)
+        graph.add_edges_from(
+            (source, target, {"relationship_type": edge.type})
+            for (source, target), edge in self.edges.items()
+        )
+        return graph
+
     def get_node(self, node_id):
         """Obtiene un nodo por su ID"""
         return self.nodes.get(node_id)
 
     def get_edges_from(self, node_id):
         """Lista de aristas que salen de un nodo"""
-        return [
-            self.edges[(node_id, target)] 
-            for target in self.graph.successors(node_id)
-            if (node_id, target) in self.edges
-        ]
+        return [self.edges[(node_id, target)] for target in self.successors(node_id)]
+
+    def get_edges_to(self, node_id):
+        """Lista de aristas que llegan a un nodo"""
+        return [self.edges[(source, node_id)] for source in self.predecessors(node_id)]
+
+    def clone(self):
+        """
+        Copia con estructura compartida (copy-on-write): los objetos nodo y arista,
+        los conjuntos de los índices y SHARED_STRUCTURES se comparten entre ambos
+        grafos hasta que uno de ellos los modifica (mutable_node/mutable_edge
+        copian solo ese elemento; añadir o eliminar aristas copia solo el
+        conjunto de ese tipo de relación). Solo se copian los dicts nodes y
+        edges (referencias, O(N + E)). Añadir o eliminar nodos y aristas no
+        afecta al otro grafo.
+        Los nodos y aristas compartidos quedan de solo lectura en ambos grafos
+        (escribir en ellos lanza TypeError): se modifican a través de
+        mutable_node/mutable_edge o, para entregar un grafo que pueda
+        modificarse libremente, se usa copy().
+        """
+        # Tras clonar, ningún elemento es exclusivo de este grafo
+        for node_id in self._owned_nodes:
+            self.nodes[node_id].freeze()
+        for key in self._owned_edges:
+            self.edges[key].freeze()
+        self._owned_nodes = set()
+        self._owned_edges = set()
+        return self._shallow_clone()
+
+    def _shallow_clone(self):
+        """Grafo que comparte nodos, aristas y estructuras internas con este"""
+        clone = PsychometricGraph.__new__(PsychometricGraph)
+        clone.nodes = dict(self.nodes)
+        clone.edges = dict(self.edges)
+        for name in self.SHARED_STRUCTURES:
+            setattr(clone, name, getattr(self, name))
+        clone._csr = dict(self._csr)  # La caché es de solo lectura
+        clone._nodes_by_type = dict(self._nodes_by_type)
+        clone._edges_by_type = dict(self._edges_by_type)
+        clone._construct_items = dict(self._construct_items)
+        clone._owned_nodes = set()
+        clone._owned_edges = set()
+        clone._owned_buckets = set()
+        clone._owned_structures = set()
+        self._owned_buckets = set()
+        self._owned_structures = set()
+        return clone
+
+    def copy(self):
+        """
+        Copia independiente: a diferencia de clone(), los nodos y aristas se
+        copian, de modo que pueden modificarse directamente (p. ej.
+        graph.nodes[i].properties[...]) sin afectar al grafo original ni a sus
+        clones. Las estructuras internas siguen compartidas con copy-on-write y
+        los elementos de este grafo siguen pudiendo modificarse.
+        """
+        graph = self._shallow_clone()
+        graph.nodes = {node_id: copy.deepcopy(node) for node_id, node in graph.nodes.items()}
+        graph.edges = {key: copy.deepcopy(edge) for key, edge in graph.edges.items()}
+        graph._owned_nodes = set(graph.nodes)
+        graph._owned_edges = set(graph.edges)
+        return graph
+
+    def mutable_node(self, node_id):
+        """Nodo que puede modificarse in situ (se copia si está compartido con un clon)"""
+        node = self.nodes[node_id]
+        if node_id not in self._owned_nodes or node.frozen:
+            node = copy.deepcopy(node)
+            self.nodes[node_id] = node
+            self._owned_nodes.add(node_id)
+        return node
+
+    def mutable_edge(self, edge_key):
+        """Arista (source, target) que puede modificarse in situ (se copia si está compartida)"""
+        edge = self.edges[edge_key]
+        if edge_key not in self._owned_edges or edge.frozen:
+            edge = copy.deepcopy(edge)
+            self.edges[edge_key] = edge
+            self._owned_edges.add(edge_key)
+        return edge
+
+    def compile(self):
+        """
+        Crea una instantánea numérica de solo lectura (CompiledGraph) con los
+        parámetros IRT en vectores contiguos y las relaciones en formato CSR.
+        La instantánea no se actualiza si el grafo cambia después.
+        """
+        return CompiledGraph(self)
+
+    def to_dict(self):
+        """Representación de intercambio con tipos JSON (ver serialization.graph_to_dict)"""
+        return graph_to_dict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Grafo de un dict de to_dict o de una plantilla JSON"""
+        return graph_from_dict(data, cls())
+
+    def serialize(self):
+        """Representación de intercambio como texto JSON"""
+        return graph_to_json(self)
+
+    def save(self, path):
+        """Guarda el grafo en el formato binario columnar de serialization"""
+        write_graph(self, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Carga un grafo guardado con save. Para consultar partes de un banco
+        grande sin decodificarlo entero, serialization.open_graph(path)
+        """
+        with open_graph(path) as archive:
+            return archive.load(cls())
 
     def describe(self):
         """Resumen estadístico del grafo"""
         return {
             'nodes': len(self.nodes),
             'edges': len(self.edges),
-            'node_types': {n.type for n in self.nodes.values()},
-            'relationship_types': {e.type for e in self.edges.values()}
-        }
\ No newline at end of file
+            'node_types': {t for t, ids in self._nodes_by_type.items() if ids},
+            'relationship_types': {t for t, keys in self._edges_by_type.items() if keys}
+        }
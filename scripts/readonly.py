@@ -0,0 +1,110 @@
+import copy
+from collections.abc import Mapping, Sequence
+
+_MESSAGE = ("Elemento compartido con otros grafos (solo lectura): "
+            "modifícalo a través de mutable_node o mutable_edge")
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError(_MESSAGE)
+
+
+def read_only(value):
+    """Vista de solo lectura de un valor (los dicts y listas anidados también lo son)"""
+    if isinstance(value, dict):
+        return ReadOnlyDict(value)
+    if isinstance(value, list):
+        return ReadOnlyList(value)
+    return value
+
+
+def plain(value):
+    """Datos originales de una vista de solo lectura (o el propio valor)"""
+    return value._data if type(value) in (ReadOnlyDict, ReadOnlyList) else value
+
+
+class ReadOnlyDict(Mapping):
+    """
+    Vista de solo lectura de un dict: la lectura funciona como en el dict y
+    cualquier escritura lanza TypeError. Se compara igual que el dict y
+    copy.deepcopy devuelve un dict normal que se puede modificar.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getitem__(self, key):
+        return read_only(self._data[key])
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __eq__(self, other):
+        return self._data == plain(other)
+
+    __hash__ = None
+    __setitem__ = __delitem__ = _read_only
+    update = pop = popitem = setdefault = clear = _read_only
+
+    def copy(self):
+        return copy.deepcopy(self._data)
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(self._data, memo)
+
+    def __repr__(self):
+        return repr(self._data)
+
+
+class ReadOnlyList(Sequence):
+    """Vista de solo lectura de una lista (ver ReadOnlyDict)"""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ReadOnlyList(self._data[index])
+        return read_only(self._data[index])
+
+    def __len__(self):
+        return len(self._data)
+
+    def __eq__(self, other):
+        return self._data == plain(other)
+
+    __hash__ = None
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = remove = pop = sort = reverse = clear = _read_only
+
+    def copy(self):
+        return copy.deepcopy(self._data)
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(self._data, memo)
+
+    def __repr__(self):
+        return repr(self._data)
+
+
+_ATOMS = frozenset((str, int, float, bool, type(None)))
+
+
+def plain_copy(value):
+    """Copia profunda con dicts y listas normales (también de vistas de solo lectura)"""
+    value = plain(value)
+    if isinstance(value, dict):
+        return {key: item if type(item) in _ATOMS else plain_copy(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [item if type(item) in _ATOMS else plain_copy(item) for item in value]
+    return value
@@ -0,0 +1,21 @@
+import numpy as np
+
+
+def as_seed_sequence(seed=None):
+    """
+    Normaliza una semilla a numpy.random.SeedSequence.
+    Args:
+        seed: None (entropía del sistema), int, SeedSequence o numpy.random.Generator.
+            De un Generator se extrae la entropía de su estado actual (lo avanza),
+            así que dos llamadas con el mismo generador dan flujos distintos
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    if isinstance(seed, np.random.Generator):
+        return np.random.SeedSequence(seed.integers(2 ** 63, size=4))
+    return np.random.SeedSequence(seed)
+
+
+def spawn_generators(seed_sequence, n):
+    """Crea n generadores independientes a partir de flujos hijos de seed_sequence"""
+    return [np.random.default_rng(child) for child in seed_sequence.spawn(n)]
@@ -0,0 +1,653 @@
+import gc
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+from contextlib import contextmanager
+import numpy as np
+from edge import PsychometricEdge
+from node import PsychometricNode
+
+FORMAT_NAME = "psychometric_graph"
+FORMAT_VERSION = 1
+MAGIC = b"PSYGRAPH"
+_PREFIX = struct.Struct("<8sII")  # MAGIC, versión, longitud de la cabecera JSON
+_ALIGNMENT = 64
+
+# Columnas numéricas del formato binario
+PARAMETER_NAMES = ("difficulty", "discrimination", "guessing")
+EDGE_COLUMNS = ("strength", "correlation")
+
+# Campos estándar del formato de intercambio (en las plantillas, el resto son propiedades)
+NODE_FIELDS = ("id", "type", "content", "properties")
+EDGE_FIELDS = ("source", "target", "type", "properties", "metadata")
+
+# Contenido de los nodos en el formato binario
+_CONTENT_NONE, _CONTENT_TEXT, _CONTENT_JSON = 0, 1, 2
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Valor no serializable en JSON: {type(value).__name__}")
+
+
+_ENCODER = json.JSONEncoder(ensure_ascii=False, default=_json_default)
+_dumps = _ENCODER.encode
+
+
+def encode_json(value):
+    """Texto JSON de un valor con los tipos de numpy convertidos (el codificador de los formatos)"""
+    return _dumps(value)
+
+
+def _loads_all(strings):
+    """Decodifica en bloque una lista de textos JSON (None para los vacíos)"""
+    filled = [i for i, text in enumerate(strings) if text]
+    values = [None] * len(strings)
+    for i, value in zip(filled, json.loads("[" + ",".join(strings[i] for i in filled) + "]")):
+        values[i] = value
+    return values
+
+
+def _intern(value):
+    return sys.intern(str(value)) if isinstance(value, str) else value
+
+
+def _node_id(value):
+    """
+    Identificador leído de JSON: las listas vuelven a ser tuplas (un id es
+    hashable, así que una lista solo puede proceder de una tupla)
+    """
+    if isinstance(value, list):
+        return tuple(_node_id(part) for part in value)
+    return _intern(value)
+
+
+def _check_node_id(node_id):
+    """Comprueba que un id no textual se puede guardar y recuperar sin cambiar de tipo"""
+    if isinstance(node_id, tuple):
+        for part in node_id:
+            _check_node_id(part)
+    elif not (node_id is None or isinstance(node_id, (str, int, float, np.integer, np.floating))):
+        raise ValueError(f"Identificador de nodo no serializable: {node_id!r} ({type(node_id).__name__})")
+
+
+def with_columns(stored, columns):
+    """
+    Propiedades guardadas con los valores de columna reinsertados en su
+    posición original: columns es una lista de (posición, clave, valor)
+    """
+    if not stored:
+        return {key: value for _, key, value in sorted(columns, key=lambda column: column[0])}
+    items = list(stored.items())
+    for position, key, value in sorted(columns, key=lambda column: column[0]):
+        items.insert(position, (key, value))
+    return dict(items)
+
+
+@contextmanager
+def _collector_paused():
+    """
+    Pausa el recolector de ciclos mientras se crean en masa nodos y aristas
+    (no forman ciclos): evita que recorra repetidamente todo el heap
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _json_table(name, texts):
+    """
+    Secciones de una columna de textos JSON que guardan una sola vez los textos
+    repetidos: {name}_code (posición en la tabla de cadenas o -1 si está vacío)
+    y la tabla de cadenas de los textos distintos
+    """
+    unique = {}
+    codes = np.array([unique.setdefault(text, len(unique)) if text else -1 for text in texts], dtype=np.int32)
+    sections = {f"{name}_code": codes}
+    sections.update(_string_table(name, unique))
+    return sections
+
+
+def _aligned(offset):
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+# --- Formato de intercambio (JSON) ---
+
+def graph_to_dict(graph):
+    """
+    Representación de intercambio de un grafo, con tipos JSON:
+    {'format', 'version', 'nodes': [...], 'edges': [...]} con las propiedades
+    y metadatos completos de cada nodo y relación
+    """
+    return {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "nodes": [node.to_dict() for node in graph.nodes.values()],
+        "edges": [edge.to_dict() for edge in graph.edges.values()]
+    }
+
+
+def graph_to_json(graph):
+    return _dumps(graph_to_dict(graph))
+
+
+def graph_from_dict(data, graph):
+    """
+    Añade a graph (normalmente vacío) los nodos y relaciones de un dict de
+    graph_to_dict o de una plantilla JSON. En las plantillas (sin 'format'),
+    las claves de nodos y relaciones distintas de NODE_FIELDS y EDGE_FIELDS
+    son propiedades, las propiedades por defecto que falten se conservan y
+    el tipo de relación por defecto es 'measures'.
+    Returns:
+        graph
+    """
+    complete = data.get("format") == FORMAT_NAME
+    if complete and data.get("version", FORMAT_VERSION) != FORMAT_VERSION:
+        raise ValueError(f"Versión de formato no soportada: {data['version']}")
+    with _collector_paused():
+        return _fill_from_dict(data, graph, complete)
+
+
+def _fill_from_dict(data, graph, complete):
+
+    nodes = []
+    for entry in data.get("nodes", []):
+        if "id" not in entry or "type" not in entry:
+            raise ValueError(f"Nodo sin id o tipo: {entry}")
+        node = PsychometricNode(_node_id(entry["id"]), entry["type"], entry.get("content"))
+        properties = dict(entry.get("properties") or {})
+        properties.update((key, value) for key, value in entry.items() if key not in NODE_FIELDS)
+        if complete:
+            node.properties = properties
+        else:
+            node.properties.update(properties)
+        nodes.append(node)
+    graph.insert_nodes(nodes, owned=True)
+
+    edges = []
+    for entry in data.get("edges", []):
+        if "source" not in entry or "target" not in entry:
+            raise ValueError(f"Relación sin origen o destino: {entry}")
+        edge = PsychometricEdge(_node_id(entry["source"]), _node_id(entry["target"]), entry.get("type", "measures"))
+        edge.properties.update(entry.get("properties") or {})
+        edge.properties.update((key, value) for key, value in entry.items() if key not in EDGE_FIELDS)
+        metadata = entry.get("metadata")
+        if metadata is not None:
+            if complete:
+                edge.metadata = dict(metadata)
+            else:
+                edge.metadata.update(metadata)
+        edges.append(edge)
+    graph.insert_edges(edges, owned=True)
+    return graph
+
+
+# --- Formato binario columnar ---
+
+def _categories(values):
+    """Códigos int16 de una columna categórica y sus nombres, por orden de aparición"""
+    names = list(dict.fromkeys(values))
+    index = {name: code for code, name in enumerate(names)}
+    return np.array([index[value] for value in values], dtype=np.int16), names
+
+
+def _string_table(name, strings):
+    """Secciones de una tabla de cadenas: offsets en bytes y datos UTF-8 concatenados"""
+    encoded = [string.encode() for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(data) for data in encoded], out=offsets[1:])
+    return {f"{name}_offsets": offsets, f"{name}_data": np.frombuffer(b"".join(encoded), dtype=np.uint8)}
+
+
+def _is_standard_parameters(params):
+    """
+    Parámetros IRT representables en columnas sin pérdida: dict con
+    difficulty, discrimination y guessing (float o None), y opcionalmente
+    thresholds (lista no vacía de floats) y model (str), en ese orden
+    """
+    if type(params) is not dict:
+        return False
+    keys = list(params)
+    if keys[:3] != list(PARAMETER_NAMES) or keys[3:] not in ([], ["thresholds"], ["model"], ["thresholds", "model"]):
+        return False
+    if not all(params[name] is None or (type(params[name]) is float and params[name] == params[name])
+               for name in PARAMETER_NAMES):
+        return False
+    if "thresholds" in params:
+        thresholds = params["thresholds"]
+        if type(thresholds) is not list or not thresholds or not all(type(b) is float and b == b for b in thresholds):
+            return False
+    return type(params.get("model", "")) is str
+
+
+def write_graph(graph, path):
+    """
+    Guarda el grafo en el formato binario columnar (escritura atómica): un
+    prefijo (MAGIC, versión, longitud de la cabecera), una cabecera JSON que
+    describe cada sección y las secciones como arrays alineados:
+    - ids, tipos, contenido y propiedades de los nodos (tablas de cadenas; de
+      los nodos que conservan las propiedades de la plantilla sin copiar, una
+      cadena vacía)
+    - parámetros IRT de los ítems en columnas (difficulty, discrimination,
+      guessing, thresholds y model), si tienen la forma estándar
+    - aristas como índices de origen y destino con código de tipo, strength y
+      correlation en columnas y el resto de propiedades y metadatos en JSON
+      (metadatos vacíos si la arista no los ha usado)
+    Los valores en columnas guardan su posición entre las propiedades, de modo
+    que el grafo cargado tiene las claves en el mismo orden. Los ids que no son
+    str deben ser números, None o tuplas de ellos.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        _write(graph, f)
+    os.replace(tmp_path, path)
+
+
+def graph_to_bytes(graph):
+    """El formato binario de write_graph como bytes (p. ej. para incrustarlo en otro fichero)"""
+    with io.BytesIO() as f:
+        _write(graph, f)
+        return f.getvalue()
+
+
+def graph_from_bytes(data, graph):
+    """Añade a graph (normalmente vacío) el grafo de graph_to_bytes; devuelve graph"""
+    with GraphArchive(buffer=bytes(data)) as archive:
+        return archive.load(graph)
+
+
+def _write(graph, f):
+    """Escribe el formato binario en un fichero binario con seek (ver write_graph)"""
+    node_ids = list(graph.nodes)
+    nodes = list(graph.nodes.values())
+    node_index = {node_id: i for i, node_id in enumerate(node_ids)}
+    id_encoding = "text" if all(isinstance(node_id, str) for node_id in node_ids) else "json"
+    if id_encoding == "json":
+        for node_id in node_ids:
+            _check_node_id(node_id)
+    node_types, node_type_names = _categories([node.type for node in nodes])
+
+    sections = {"node_type": node_types}
+    sections.update(_string_table("node_id", node_ids if id_encoding == "text" else map(_dumps, node_ids)))
+
+    content_kind = np.empty(len(nodes), dtype=np.int8)
+    contents = []
+    item_node, item_position, parameters, threshold_values, models = [], [], [], [], []
+    threshold_offsets = [0]
+    blobs = []
+    for i, node in enumerate(nodes):
+        if node.content is None:
+            content_kind[i] = _CONTENT_NONE
+            contents.append("")
+        elif isinstance(node.content, str):
+            content_kind[i] = _CONTENT_TEXT
+            contents.append(node.content)
+        else:
+            content_kind[i] = _CONTENT_JSON
+            contents.append(_dumps(node.content))
+
+        properties = node.stored_properties()
+        if properties is None:
+            blobs.append("")
+            continue
+        properties = dict(properties)
+        params = properties.get("irt_parameters")
+        if _is_standard_parameters(params):
+            item_position.append(list(properties).index("irt_parameters"))
+            del properties["irt_parameters"]
+            item_node.append(i)
+            parameters.append([np.nan if params[name] is None else params[name] for name in PARAMETER_NAMES])
+            threshold_values.extend(params.get("thresholds", ()))
+            threshold_offsets.append(len(threshold_values))
+            models.append(params.get("model"))
+        blobs.append(_dumps(properties))
+
+    model_names = list(dict.fromkeys(model for model in models if model is not None))
+    model_index = {model: code for code, model in enumerate(model_names)}
+    model_codes = np.array([-1 if model is None else model_index[model] for model in models], dtype=np.int16)
+    sections["content_kind"] = content_kind
+    sections.update(_string_table("content", contents))
+    sections.update(_json_table("node_properties", blobs))
+    sections["item_node"] = np.array(item_node, dtype=np.int64)
+    sections["item_position"] = np.array(item_position, dtype=np.int32)
+    sections["item_parameters"] = np.array(parameters, dtype=np.float64).reshape(len(item_node), len(PARAMETER_NAMES))
+    sections["threshold_offsets"] = np.array(threshold_offsets, dtype=np.int64)
+    sections["threshold_values"] = np.array(threshold_values, dtype=np.float64)
+    sections["item_model"] = model_codes
+
+    edges = list(graph.edges.values())
+    index_dtype = np.int32 if len(nodes) < 2 ** 31 else np.int64
+    relationship_types, relationship_type_names = _categories([edge.type for edge in edges])
+    sections["edge_source"] = np.array([node_index[edge.source] for edge in edges], dtype=index_dtype)
+    sections["edge_target"] = np.array([node_index[edge.target] for edge in edges], dtype=index_dtype)
+    sections["edge_type"] = relationship_types
+    edge_columns = {name: np.full(len(edges), np.nan) for name in EDGE_COLUMNS}
+    edge_positions = {name: np.full(len(edges), -1, dtype=np.int32) for name in EDGE_COLUMNS}
+    property_blobs, metadata_blobs = [], []
+    for e, edge in enumerate(edges):
+        properties = dict(edge.stored_properties())
+        keys = None
+        for name, column in edge_columns.items():
+            value = properties.get(name)
+            if type(value) is float and value == value:
+                keys = keys or list(properties)
+                column[e] = value
+                edge_positions[name][e] = keys.index(name)
+        for name in EDGE_COLUMNS:
+            if edge_positions[name][e] >= 0:
+                del properties[name]
+        property_blobs.append(_dumps(properties) if properties else "")
+        metadata = edge.stored_metadata()
+        metadata_blobs.append("" if metadata is None else _dumps(metadata))
+    for name, column in edge_columns.items():
+        sections[f"edge_{name}"] = column
+        sections[f"edge_{name}_position"] = edge_positions[name]
+    sections.update(_json_table("edge_properties", property_blobs))
+    sections.update(_json_table("edge_metadata", metadata_blobs))
+
+    layout = {}
+    offset = 0
+    for name, array in sections.items():
+        offset = _aligned(offset)
+        layout[name] = {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+        offset += array.nbytes
+    header = _dumps({
+        "format": FORMAT_NAME,
+        "n_nodes": len(nodes),
+        "n_edges": len(edges),
+        "node_id_encoding": id_encoding,
+        "node_types": node_type_names,
+        "relationship_types": relationship_type_names,
+        "models": model_names,
+        "sections": layout
+    }).encode()
+    data_start = _aligned(_PREFIX.size + len(header))
+
+    f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)))
+    f.write(header)
+    for name, array in sections.items():
+        f.seek(data_start + layout[name]["offset"])
+        f.write(np.ascontiguousarray(array).tobytes())
+    f.truncate(data_start + offset)
+
+
+def _parameters(row, thresholds, model):
+    params = {name: None if value != value else value for name, value in zip(PARAMETER_NAMES, row)}
+    if thresholds:
+        params["thresholds"] = thresholds
+    if model is not None:
+        params["model"] = model
+    return params
+
+
+def _build_node(node_id, node_type, content, params, position, stored):
+    node = PsychometricNode(node_id, node_type, content)
+    if stored is not None:
+        node.properties = with_columns(stored, [] if params is None else [(position, "irt_parameters", params)])
+    return node
+
+
+def _build_edge(source, target, relationship_type, columns, positions, stored, metadata):
+    edge = PsychometricEdge(source, target, relationship_type)
+    edge.properties = with_columns(stored, [
+        (position, name, value) for name, value, position in zip(EDGE_COLUMNS, columns, positions) if value == value
+    ])
+    if metadata is not None:
+        edge.metadata = metadata
+    return edge
+
+
+class GraphArchive:
+    """
+    Grafo guardado con write_graph, abierto sin decodificarlo: el fichero se
+    proyecta en memoria (mmap), abrir solo lee la cabecera y cada sección se
+    decodifica al pedirla. Los arrays devueltos son vistas de solo lectura
+    sobre el fichero, válidas mientras el archivo siga abierto. Con buffer
+    (bytes de graph_to_bytes) se lee de memoria en lugar de un fichero.
+    """
+
+    def __init__(self, path=None, buffer=None):
+        self.path = path
+        if buffer is not None:
+            self._buffer = buffer
+        else:
+            with open(path, "rb") as f:
+                self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._buffer) < _PREFIX.size or self._buffer[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"Formato de grafo no reconocido: {path or 'buffer'}")
+        _, self.version, header_length = _PREFIX.unpack_from(self._buffer)
+        if self.version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Versión de formato no soportada: {self.version}")
+        self.header = json.loads(self._buffer[_PREFIX.size:_PREFIX.size + header_length].decode())
+        self._data_start = _aligned(_PREFIX.size + header_length)
+        self._arrays = {}
+        self._node_ids = None
+        self._node_index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._arrays = {}
+        if not isinstance(self._buffer, mmap.mmap):
+            return
+        try:
+            self._buffer.close()
+        except BufferError:
+            pass  # Quedan vistas en uso: el mmap se libera con la última
+
+    @property
+    def n_nodes(self):
+        return self.header["n_nodes"]
+
+    @property
+    def n_edges(self):
+        return self.header["n_edges"]
+
+    @property
+    def node_types(self):
+        return self.header["node_types"]
+
+    @property
+    def relationship_types(self):
+        return self.header["relationship_types"]
+
+    def _array(self, name):
+        array = self._arrays.get(name)
+        if array is None:
+            section = self.header["sections"][name]
+            shape = tuple(section["shape"])
+            count = int(np.prod(shape))
+            if count == 0:
+                array = np.empty(shape, dtype=section["dtype"])
+            else:
+                array = np.frombuffer(self._buffer, dtype=section["dtype"], count=count,
+                                      offset=self._data_start + section["offset"]).reshape(shape)
+            self._arrays[name] = array
+        return array
+
+    def _string(self, name, i):
+        offsets = self._array(f"{name}_offsets")
+        start = self._data_start + self.header["sections"][f"{name}_data"]["offset"]
+        return self._buffer[start + int(offsets[i]):start + int(offsets[i + 1])].decode()
+
+    def _strings(self, name):
+        offsets = self._array(f"{name}_offsets").tolist()
+        start = self._data_start + self.header["sections"][f"{name}_data"]["offset"]
+        data = self._buffer[start:start + offsets[-1]]
+        return [data[a:b].decode() for a, b in zip(offsets, offsets[1:])]
+
+    def _json_value(self, name, i):
+        """Valor de la fila i de una columna de _json_table (None si está vacía)"""
+        code = int(self._array(f"{name}_code")[i])
+        return None if code < 0 else json.loads(self._string(name, code))
+
+    def _json_values(self, name):
+        """Valores de una columna de _json_table; las filas repetidas son objetos distintos"""
+        texts = self._strings(name)
+        return _loads_all([texts[code] if code >= 0 else "" for code in self._array(f"{name}_code").tolist()])
+
+    def _decode_id(self, text):
+        return _intern(text) if self.header["node_id_encoding"] == "text" else _node_id(json.loads(text))
+
+    def _content(self, kind, text):
+        if kind == _CONTENT_NONE:
+            return None
+        return text if kind == _CONTENT_TEXT else json.loads(text)
+
+    def node_ids(self):
+        """Identificadores de los nodos, en orden de inserción"""
+        if self._node_ids is None:
+            self._node_ids = [self._decode_id(text) for text in self._strings("node_id")]
+        return self._node_ids
+
+    def _index(self, node_id):
+        """Posición de un nodo; sin decodificar todos los ids, se busca en la tabla de cadenas"""
+        if self._node_ids is not None:
+            if self._node_index is None:
+                self._node_index = {node_id: i for i, node_id in enumerate(self._node_ids)}
+            if node_id in self._node_index:
+                return self._node_index[node_id]
+        else:
+            needle = (node_id if self.header["node_id_encoding"] == "text" else _dumps(node_id))
+            needle = needle.encode() if isinstance(needle, str) else None
+            offsets = self._array("node_id_offsets")
+            start = self._data_start + self.header["sections"]["node_id_data"]["offset"]
+            end = start + int(offsets[-1])
+            position = self._buffer.find(needle, start, end) if needle is not None else -1
+            while position >= 0:
+                i = int(np.searchsorted(offsets, position - start))
+                if i < len(offsets) - 1 and offsets[i] == position - start and offsets[i + 1] - offsets[i] == len(needle):
+                    return i
+                position = self._buffer.find(needle, position + 1, end)
+        raise ValueError(f"Nodo no encontrado: {node_id}")
+
+    def _node_id(self, i):
+        if self._node_ids is not None:
+            return self._node_ids[i]
+        return self._decode_id(self._string("node_id", i))
+
+    def nodes_of_type(self, node_type):
+        """Identificadores de los nodos de un tipo (solo decodifica esos ids)"""
+        if node_type not in self.node_types:
+            return []
+        positions = np.flatnonzero(self._array("node_type") == self.node_types.index(node_type))
+        return [self._node_id(i) for i in positions]
+
+    def item_parameters(self):
+        """
+        Parámetros IRT en columnas, sin decodificar los nodos: {'node_index'
+        (posición en node_ids), 'difficulty', 'discrimination', 'guessing'}
+        con NaN si faltan; solo ítems con parámetros en la forma estándar
+        """
+        parameters = self._array("item_parameters")
+        columns = {"node_index": self._array("item_node")}
+        columns.update((name, parameters[:, k]) for k, name in enumerate(PARAMETER_NAMES))
+        return columns
+
+    def edge_arrays(self):
+        """
+        Aristas en columnas, sin decodificarlas: {'source', 'target' (posiciones
+        en node_ids), 'type' (códigos de relationship_types), 'strength',
+        'correlation' (NaN si faltan o no son float)}
+        """
+        arrays = {"source": self._array("edge_source"), "target": self._array("edge_target"),
+                  "type": self._array("edge_type")}
+        arrays.update((name, self._array(f"edge_{name}")) for name in EDGE_COLUMNS)
+        return arrays
+
+    def _item_row(self, i):
+        """(parámetros IRT en columnas del nodo i, posición entre sus propiedades)"""
+        item_node = self._array("item_node")
+        rows = np.flatnonzero(item_node == i)
+        if not len(rows):
+            return None, 0
+        row = int(rows[0])
+        offsets = self._array("threshold_offsets")
+        model = int(self._array("item_model")[row])
+        params = _parameters(self._array("item_parameters")[row].tolist(),
+                             self._array("threshold_values")[offsets[row]:offsets[row + 1]].tolist(),
+                             None if model < 0 else self.header["models"][model])
+        return params, int(self._array("item_position")[row])
+
+    def node(self, node_id):
+        """Decodifica un único nodo"""
+        i = self._index(node_id)
+        return _build_node(self._node_id(i), self.node_types[self._array("node_type")[i]],
+                           self._content(self._array("content_kind")[i], self._string("content", i)),
+                           *self._item_row(i), self._json_value("node_properties", i))
+
+    def edge(self, source_id, target_id):
+        """Decodifica una única relación source -> target"""
+        source, target = self._index(source_id), self._index(target_id)
+        matches = np.flatnonzero((self._array("edge_source") == source) & (self._array("edge_target") == target))
+        if not len(matches):
+            raise ValueError(f"Relación no encontrada: {source_id} -> {target_id}")
+        e = int(matches[0])
+        return _build_edge(self._node_id(source), self._node_id(target), self.relationship_types[self._array("edge_type")[e]],
+                           [float(self._array(f"edge_{name}")[e]) for name in EDGE_COLUMNS],
+                           [int(self._array(f"edge_{name}_position")[e]) for name in EDGE_COLUMNS],
+                           self._json_value("edge_properties", e), self._json_value("edge_metadata", e))
+
+    def load(self, graph):
+        """
+        Decodifica el grafo completo y lo añade a graph (normalmente vacío)
+        Returns:
+            graph
+        """
+        with _collector_paused():
+            return self._load(graph)
+
+    def _load(self, graph):
+        node_ids = self.node_ids()
+        node_types = [self.node_types[code] for code in self._array("node_type").tolist()]
+        contents = [self._content(kind, text) for kind, text in
+                    zip(self._array("content_kind").tolist(), self._strings("content"))]
+        offsets = self._array("threshold_offsets").tolist()
+        thresholds = self._array("threshold_values").tolist()
+        models = [None if code < 0 else self.header["models"][code] for code in self._array("item_model").tolist()]
+        item_node = self._array("item_node").tolist()
+        positions = dict(zip(item_node, self._array("item_position").tolist()))
+        parameters = {
+            i: _parameters(row, thresholds[offsets[r]:offsets[r + 1]], models[r])
+            for r, (i, row) in enumerate(zip(item_node, self._array("item_parameters").tolist()))
+        }
+        nodes = [
+            _build_node(node_id, node_types[i], contents[i], parameters.get(i), positions.get(i, 0), stored)
+            for i, (node_id, stored) in enumerate(zip(node_ids, self._json_values("node_properties")))
+        ]
+        graph.insert_nodes(nodes, owned=True)
+
+        arrays = self.edge_arrays()
+        columns = zip(*(arrays[name].tolist() for name in EDGE_COLUMNS))
+        positions = zip(*(self._array(f"edge_{name}_position").tolist() for name in EDGE_COLUMNS))
+        edges = [
+            _build_edge(node_ids[source], node_ids[target], self.relationship_types[code], values, value_positions,
+                        stored, metadata)
+            for e, (source, target, code, values, value_positions, stored, metadata) in enumerate(zip(
+                arrays["source"].tolist(), arrays["target"].tolist(), arrays["type"].tolist(), columns, positions,
+                self._json_values("edge_properties"), self._json_values("edge_metadata")))
+        ]
+        graph.insert_edges(edges, owned=True)
+        return graph
+
+
+def open_graph(path):
+    """Abre un grafo guardado con write_graph sin decodificarlo (GraphArchive)"""
+    return GraphArchive(path)
@@ -0,0 +1,81 @@
+import numpy as np
+
+
+def response_probabilities(theta, difficulty, discrimination, guessing):
+    """
+    Probabilidad de respuesta correcta del modelo 3PL.
+    Args:
+        theta: Habilidades latentes de forma (..., n_respondents)
+        difficulty, discrimination, guessing: Vectores de forma (n_items,)
+    Returns:
+        Array de forma (..., n_respondents, n_items)
+    """
+    # Cálculo in situ para no crear temporales del tamaño del tensor
+    prob = theta[..., np.newaxis] - difficulty
+    prob *= -discrimination
+    np.exp(prob, out=prob)
+    prob += 1
+    np.divide(1 - guessing, prob, out=prob)
+    prob += guessing
+    return prob
+
+
+def simulate_dichotomous(theta, difficulty, discrimination, guessing, uniform):
+    """
+    Muestrea respuestas 0/1 para todas las réplicas, personas e ítems a la vez.
+    Args:
+        theta: Habilidades latentes de forma (..., n_respondents)
+        difficulty, discrimination, guessing: Vectores (n_items,) o arrays
+            (K, 1, n_items) para simular K candidatos con las mismas theta
+        uniform: Extracciones U(0, 1) de forma (..., n_respondents, n_items)
+    Returns:
+        Respuestas uint8 de forma (..., n_respondents, n_items)
+    """
+    prob = response_probabilities(theta, difficulty, discrimination, guessing)
+    return np.greater(prob, uniform).view(np.uint8)
+
+
+def cumulative_probabilities(theta, discrimination, guessing, thresholds, pcm_mask=None):
+    """
+    Probabilidades acumuladas P(X >= k | theta), k = 1..M-1, del modelo de
+    respuesta graduada (con azar en ítems dicotómicos) y de crédito parcial.
+    Args:
+        theta: Habilidades latentes de forma (..., n_respondents)
+        discrimination, guessing: Arrays (n_items,) o (K, 1, n_items)
+        thresholds: Umbrales (n_items, M-1) o (K, 1, n_items, M-1), con +inf en
+            las categorías que el ítem no tiene
+        pcm_mask: Ítems de crédito parcial, con la forma de discrimination
+    Returns:
+        Array de forma (..., n_respondents, n_items, M-1)
+    """
+    logit = theta[..., np.newaxis, np.newaxis] - thresholds
+    logit *= discrimination[..., np.newaxis]
+
+    # Respuesta graduada: P(X >= k) = c + (1 - c) / (1 + exp(-a (theta - b_k)))
+    cumulative = np.exp(-logit)
+    cumulative += 1
+    np.divide((1 - guessing)[..., np.newaxis], cumulative, out=cumulative)
+    cumulative += guessing[..., np.newaxis] * np.isfinite(thresholds)
+
+    if pcm_mask is not None and np.any(pcm_mask):
+        # Crédito parcial: P(X = k) proporcional a exp(sum_{v <= k} a (theta - d_v))
+        steps = np.cumsum(logit, axis=-1)
+        shift = np.maximum(steps.max(axis=-1, keepdims=True), 0)
+        weights = np.exp(steps - shift)
+        denominator = np.exp(-shift) + weights.sum(axis=-1, keepdims=True)
+        tail = np.flip(np.cumsum(np.flip(weights, axis=-1), axis=-1), axis=-1)
+        cumulative = np.where(pcm_mask[..., np.newaxis], tail / denominator, cumulative)
+
+    return cumulative
+
+
+def simulate_polytomous(theta, discrimination, guessing, thresholds, uniform, pcm_mask=None):
+    """
+    Muestrea categorías 0..M-1 para todas las personas e ítems en un solo paso:
+    con una uniforme por respuesta, la categoría es el número de probabilidades
+    acumuladas que la superan (equivale a searchsorted sobre la acumulada).
+    Returns:
+        Respuestas int8 de forma (..., n_respondents, n_items)
+    """
+    cumulative = cumulative_probabilities(theta, discrimination, guessing, thresholds, pcm_mask)
+    return np.less(uniform[..., np.newaxis], cumulative).sum(axis=-1, dtype=np.int8)
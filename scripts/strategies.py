@@ -0,0 +1,174 @@
+from abc import ABC, abstractmethod
+import numpy as np
+from genome import DIFFICULTY_BOUNDS, DISCRIMINATION_BOUNDS
+
+
+def parameter_bounds(n_items):
+    """
+    Límites del vector continuo de parámetros (difficulty y discrimination de
+    cada ítem, intercalados): los rangos válidos de PsychometricValidator
+    """
+    lower = np.tile([DIFFICULTY_BOUNDS[0], DISCRIMINATION_BOUNDS[0]], n_items)
+    upper = np.tile([DIFFICULTY_BOUNDS[1], DISCRIMINATION_BOUNDS[1]], n_items)
+    return lower, upper
+
+
+class SearchStrategy(ABC):
+    """
+    Interfaz de las estrategias de búsqueda sobre un vector continuo acotado
+    (maximización): ask() propone una matriz (n, d) de candidatos dentro de los
+    límites y tell(puntuaciones) actualiza el estado con las puntuaciones de la
+    última propuesta.
+    """
+
+    def __init__(self, x0, lower, upper, population_size=None, rng=None):
+        self.lower = np.asarray(lower, dtype=np.float64)
+        self.upper = np.asarray(upper, dtype=np.float64)
+        self.x0 = self.repair(np.asarray(x0, dtype=np.float64))
+        self.dimension = len(self.x0)
+        self.population_size = population_size or 4 + int(3 * np.log(max(self.dimension, 1)))
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def repair(self, candidates):
+        """Proyecta los candidatos sobre los límites"""
+        return np.clip(candidates, self.lower, self.upper)
+
+    @abstractmethod
+    def ask(self):
+        """Matriz (population_size, dimension) de candidatos"""
+
+    @abstractmethod
+    def tell(self, scores):
+        """Actualiza el estado con las puntuaciones de la última propuesta"""
+
+
+class CMAES(SearchStrategy):
+    """
+    CMA-ES (mu/mu_w, lambda) con adaptación de la matriz de covarianza y del
+    tamaño de paso. Trabaja en coordenadas normalizadas ([0, 1] por dimensión);
+    los candidatos fuera de los límites se reparan por proyección y la
+    actualización usa los candidatos reparados.
+    """
+
+    def __init__(self, x0, lower, upper, population_size=None, rng=None, sigma=0.1):
+        """
+        Args:
+            sigma: Tamaño de paso inicial, como fracción del rango de cada parámetro
+        """
+        super().__init__(x0, lower, upper, population_size, rng)
+        n = self.dimension
+        self.scale = self.upper - self.lower
+        self.mean = (self.x0 - self.lower) / self.scale
+        self.sigma = sigma
+
+        mu = self.population_size // 2
+        weights = np.log(mu + 0.5) - np.log(np.arange(1, mu + 1))
+        self.weights = weights / weights.sum()
+        self.mu_eff = 1.0 / np.square(self.weights).sum()
+        self.c_c = (4 + self.mu_eff / n) / (n + 4 + 2 * self.mu_eff / n)
+        self.c_s = (self.mu_eff + 2) / (n + self.mu_eff + 5)
+        self.c_1 = 2 / ((n + 1.3) ** 2 + self.mu_eff)
+        self.c_mu = min(1 - self.c_1, 2 * (self.mu_eff - 2 + 1 / self.mu_eff) / ((n + 2) ** 2 + self.mu_eff))
+        self.damping = 1 + 2 * max(0.0, np.sqrt((self.mu_eff - 1) / (n + 1)) - 1) + self.c_s
+        self.chi_n = np.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n ** 2))
+
+        self.covariance = np.eye(n)
+        self.basis = np.eye(n)
+        self.axis_lengths = np.ones(n)
+        self.path_c = np.zeros(n)
+        self.path_s = np.zeros(n)
+        self.iteration = 0
+        self._steps = None
+
+    def ask(self):
+        z = self.rng.standard_normal((self.population_size, self.dimension))
+        x = np.clip(self.mean + self.sigma * (z * self.axis_lengths) @ self.basis.T, 0.0, 1.0)
+        self._steps = (x - self.mean) / self.sigma
+        return self.lower + x * self.scale
+
+    def tell(self, scores):
+        n = self.dimension
+        order = np.argsort(-np.asarray(scores), kind="stable")
+        selected = self._steps[order[:len(self.weights)]]
+        step = self.weights @ selected
+        self.mean = self.mean + self.sigma * step
+
+        # Trayectorias de evolución (C^-1/2 · paso medio para el tamaño de paso)
+        whitened = self.basis @ ((self.basis.T @ step) / self.axis_lengths)
+        self.path_s = (1 - self.c_s) * self.path_s + np.sqrt(self.c_s * (2 - self.c_s) * self.mu_eff) * whitened
+        self.iteration += 1
+        norm_s = np.linalg.norm(self.path_s)
+        h_sigma = norm_s / np.sqrt(1 - (1 - self.c_s) ** (2 * self.iteration)) / self.chi_n < 1.4 + 2 / (n + 1)
+        self.path_c = (1 - self.c_c) * self.path_c + h_sigma * np.sqrt(self.c_c * (2 - self.c_c) * self.mu_eff) * step
+
+        rank_one = np.outer(self.path_c, self.path_c) + (1 - h_sigma) * self.c_c * (2 - self.c_c) * self.covariance
+        rank_mu = (selected.T * self.weights) @ selected
+        self.covariance = ((1 - self.c_1 - self.c_mu) * self.covariance + self.c_1 * rank_one
+                           + self.c_mu * rank_mu)
+        self.sigma *= np.exp((self.c_s / self.damping) * (norm_s / self.chi_n - 1))
+
+        self.covariance = (self.covariance + self.covariance.T) / 2
+        eigenvalues, self.basis = np.linalg.eigh(self.covariance)
+        self.axis_lengths = np.sqrt(np.maximum(eigenvalues, 1e-20))
+
+
+class DifferentialEvolution(SearchStrategy):
+    """
+    Evolución diferencial rand/1/bin. La primera propuesta es la población
+    inicial (x0 y puntos uniformes dentro de los límites); después, cada
+    candidato compite con su vector de prueba. Los componentes fuera de los
+    límites se reparan con un punto aleatorio entre el padre y el límite.
+    """
+
+    def __init__(self, x0, lower, upper, population_size=None, rng=None, differential_weight=0.5,
+                 crossover_rate=0.9):
+        """
+        Args:
+            differential_weight: Factor F de la diferencia entre donantes
+            crossover_rate: Probabilidad CR de heredar cada componente del mutante
+        """
+        super().__init__(x0, lower, upper, population_size, rng)
+        self.population_size = max(self.population_size, 4)
+        self.differential_weight = differential_weight
+        self.crossover_rate = crossover_rate
+        self.population = self.lower + self.rng.random((self.population_size, self.dimension)) * (self.upper - self.lower)
+        self.population[0] = self.x0
+        self.scores = None
+        self._trials = None
+
+    def ask(self):
+        if self.scores is None:
+            return self.population.copy()
+        size, n = self.population.shape
+        # Tres donantes distintos entre sí y del propio candidato
+        keys = self.rng.random((size, size))
+        np.fill_diagonal(keys, np.inf)
+        donors = np.argsort(keys, axis=1)[:, :3]
+        mutants = (self.population[donors[:, 0]]
+                   + self.differential_weight * (self.population[donors[:, 1]] - self.population[donors[:, 2]]))
+
+        inherit = self.rng.random((size, n)) < self.crossover_rate
+        inherit[np.arange(size), self.rng.integers(0, n, size)] = True
+        trials = np.where(inherit, mutants, self.population)
+
+        below, above = trials < self.lower, trials > self.upper
+        fraction = self.rng.random((size, n))
+        trials = np.where(below, self.lower + fraction * (self.population - self.lower), trials)
+        trials = np.where(above, self.upper - fraction * (self.upper - self.population), trials)
+        self._trials = trials
+        return trials.copy()
+
+    def tell(self, scores):
+        scores = np.asarray(scores, dtype=np.float64)
+        if self.scores is None:
+            self.scores = scores.copy()
+            return
+        better = scores >= self.scores
+        self.population[better] = self._trials[better]
+        self.scores[better] = scores[better]
+
+
+STRATEGIES = {
+    "cmaes": CMAES,
+    "de": DifferentialEvolution
+}
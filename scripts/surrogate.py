@@ -0,0 +1,131 @@
+import numpy as np
+from scipy.stats import rankdata
+from genome import DIFFICULTY, DISCRIMINATION
+
+
+def genome_features(genomes, encoding):
+    """
+    Matriz de características (P, n_features) de una población de genomas:
+    difficulty, |difficulty| y discrimination de cada ítem, resúmenes por
+    genoma (media, desviación y mínimo de la discriminación, media de
+    |difficulty|) y aristas mutables activas con su peso.
+    """
+    difficulty = genomes.parameters[..., DIFFICULTY]
+    discrimination = genomes.parameters[..., DISCRIMINATION]
+    n_genomes = len(genomes)
+    if encoding.n_items:
+        summaries = np.column_stack((
+            discrimination.mean(axis=1), discrimination.std(axis=1), discrimination.min(axis=1),
+            np.abs(difficulty).mean(axis=1)
+        ))
+    else:
+        summaries = np.zeros((n_genomes, 4))
+    weight = np.where(genomes.edge_mask, np.nan_to_num(genomes.edge_weight, nan=0.0), 0.0)
+    return np.column_stack((
+        difficulty, np.abs(difficulty), discrimination, summaries,
+        genomes.edge_mask.astype(np.float64), weight
+    ))
+
+
+def prediction_accuracy(predicted, actual):
+    """
+    Precisión de unas predicciones frente a las puntuaciones reales:
+    {'r2', 'spearman' (correlación de rangos), 'mae', 'n'}
+    """
+    predicted = np.asarray(predicted, dtype=np.float64)
+    actual = np.asarray(actual, dtype=np.float64)
+    if len(actual) == 0:
+        return {"r2": np.nan, "spearman": np.nan, "mae": np.nan, "n": 0}
+    residual = actual - predicted
+    total = np.square(actual - actual.mean()).sum()
+    r2 = 1.0 - np.square(residual).sum() / total if total > 0 else np.nan
+    spearman = np.nan
+    if len(actual) > 1:
+        # Rangos medios en los empates (con argsort, valores iguales tendrían rangos distintos)
+        ranks_actual = rankdata(actual)
+        ranks_predicted = rankdata(predicted)
+        if ranks_actual.std() > 0 and ranks_predicted.std() > 0:
+            spearman = np.corrcoef(ranks_actual, ranks_predicted)[0, 1]
+    return {"r2": float(r2), "spearman": float(spearman), "mae": float(np.abs(residual).mean()),
+            "n": int(len(actual))}
+
+
+class RidgeSurrogate:
+    """
+    Regresión ridge incremental (puntuación ~ características). Solo guarda
+    estadísticos suficientes (n, sumas, X'X, X'y), de modo que reentrenar con
+    cada generación cuesta O(d^2) por muestra y no requiere guardar los datos.
+    La penalización se escala con la varianza de cada característica
+    (equivale a ridge sobre características estandarizadas).
+    """
+
+    def __init__(self, alpha=1.0, min_samples=20):
+        """
+        Args:
+            alpha: Intensidad de la regularización
+            min_samples: Muestras necesarias antes de usar el modelo para cribar
+        """
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.n = 0
+        self.sum_x = None
+        self.sum_y = 0.0
+        self.xtx = None
+        self.xty = None
+        self._coef = None
+        self._intercept = 0.0
+
+    @property
+    def is_trained(self):
+        return self.n >= self.min_samples
+
+    def update(self, features, scores):
+        """Añade un bloque de muestras y marca el modelo para reajustarse"""
+        features = np.asarray(features, dtype=np.float64)
+        scores = np.asarray(scores, dtype=np.float64)
+        if len(scores) == 0:
+            return
+        if self.xtx is None:
+            n_features = features.shape[1]
+            self.sum_x = np.zeros(n_features)
+            self.xtx = np.zeros((n_features, n_features))
+            self.xty = np.zeros(n_features)
+        self.n += len(scores)
+        self.sum_x += features.sum(axis=0)
+        self.sum_y += scores.sum()
+        self.xtx += features.T @ features
+        self.xty += features.T @ scores
+        self._coef = None
+
+    def _fit(self):
+        mean_x = self.sum_x / self.n
+        mean_y = self.sum_y / self.n
+        cov = self.xtx - self.n * np.outer(mean_x, mean_x)
+        cross = self.xty - self.n * mean_x * mean_y
+        penalty = self.alpha * (np.diag(cov) + 1e-9)
+        self._coef = np.linalg.solve(cov + np.diag(penalty), cross)
+        self._intercept = mean_y - mean_x @ self._coef
+
+    def predict(self, features):
+        if self.n == 0:
+            return np.zeros(len(features))
+        if self._coef is None:
+            self._fit()
+        return np.asarray(features, dtype=np.float64) @ self._coef + self._intercept
+
+    def state(self):
+        """Estadísticos suficientes como arrays (para puntos de control)"""
+        if self.xtx is None:
+            return {}
+        return {"n": np.array(self.n), "sum_x": self.sum_x, "sum_y": np.array(self.sum_y),
+                "xtx": self.xtx, "xty": self.xty}
+
+    def load_state(self, state):
+        if not state:
+            return
+        self.n = int(state["n"])
+        self.sum_x = np.array(state["sum_x"], dtype=np.float64)
+        self.sum_y = float(state["sum_y"])
+        self.xtx = np.array(state["xtx"], dtype=np.float64)
+        self.xty = np.array(state["xty"], dtype=np.float64)
+        self._coef = None
@@ -0,0 +1,123 @@
+"""
+Pruebas (pytest) de los puntos de control: reanudación exacta, última
+evaluación, caché, historial incremental y codificación columnar de aristas
+"""
+import contextlib
+import io
+import json
+import shutil
+import numpy as np
+import pytest
+from checkpoint import history_path
+from evaluator import PsychometricEvaluator
+from genetic_optimizer import GeneticOptimizer
+from test_graph import build_valid_graph
+
+
+@pytest.fixture(scope="module")
+def base_graph():
+    np.random.seed(0)  # build_valid_graph usa el generador global para los metadatos
+    return build_valid_graph()
+
+
+def _evolve(optimizer, generations, **options):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return optimizer.evolve(generations, **options)
+
+
+def _history(optimizer):
+    """Historial sin los tiempos medidos"""
+    return [{key: value for key, value in record.items() if key not in ("seconds", "phase_seconds")}
+            for record in optimizer.history]
+
+
+@pytest.mark.parametrize("options", [{}, {"representation": "genome"}, {"racing": True}])
+def test_checkpoint_resume_matches_uninterrupted_run(base_graph, tmp_path, options):
+    def make():
+        evaluator = PsychometricEvaluator(n_respondents=300, seed=3)
+        return GeneticOptimizer(base_graph, population_size=6, seed=9, evaluator=evaluator, **options)
+
+    uninterrupted = make()
+    best, score, _ = _evolve(uninterrupted, 4)
+
+    path = tmp_path / "checkpoint.npz"
+    _evolve(make(), 2, checkpoint_path=str(path), checkpoint_every=2)
+    resumed = GeneticOptimizer.resume(str(path))
+    resumed_best, resumed_score, _ = _evolve(resumed, 2)
+
+    assert resumed_score == score
+    assert resumed_best.serialize() == best.serialize()
+    assert _history(resumed) == _history(uninterrupted)
+    assert resumed.simulations_run == uninterrupted.simulations_run
+
+
+def _migrants(optimizer):
+    """Migrantes comparables: (puntuación, grafo serializado o parámetros del genoma)"""
+    return [(score, candidate.serialize() if hasattr(candidate, "serialize") else candidate.parameters.tolist())
+            for score, candidate in optimizer.migrants(3)]
+
+
+@pytest.mark.parametrize("options", [{}, {"representation": "genome"}, {"objectives": ["reliability", "validity"]}])
+def test_resume_restores_last_ranking_and_cache(base_graph, tmp_path, options):
+    def make():
+        evaluator = PsychometricEvaluator(n_respondents=200, seed=3, cache=True)
+        return GeneticOptimizer(base_graph, population_size=6, seed=5, evaluator=evaluator, **options)
+
+    reference = make()
+    path = str(tmp_path / "checkpoint.npz")
+    _evolve(reference, 3, checkpoint_path=path, checkpoint_every=3)
+    resumed = GeneticOptimizer.resume(path)
+    assert _migrants(resumed) and _migrants(resumed) == _migrants(reference)
+    assert resumed.evaluator.cache.to_dict() == reference.evaluator.cache.to_dict()
+
+
+def test_history_is_appended_outside_the_state(base_graph, tmp_path):
+    path = str(tmp_path / "checkpoint.npz")
+    optimizer = GeneticOptimizer(base_graph, population_size=4, seed=2,
+                                 evaluator=PsychometricEvaluator(n_respondents=200, seed=2, cache=True))
+    _evolve(optimizer, 3, checkpoint_path=path, checkpoint_every=1)
+    with np.load(path) as data:
+        state = json.loads(str(data["state"]))
+        assert len(data["cache_keys_offsets"]) == len(optimizer.evaluator.cache) + 1
+    # El estado solo guarda contadores: el historial y la caché no lo hacen crecer
+    assert state["history"]["records"] == 3
+    assert "entries" not in state["evaluator"]["cache"]
+    with open(history_path(path), "rb") as f:
+        assert len(f.read().splitlines()) == 3
+
+    # Un .npz anterior a las últimas líneas del historial (p. ej. si la escritura
+    # se interrumpió entre ambos ficheros) solo usa las suyas, y al continuar
+    # se descartan las sobrantes
+    shutil.copy(path, path + ".bak")
+    _evolve(optimizer, 1, checkpoint_path=path, checkpoint_every=1)
+    shutil.copy(path + ".bak", path)
+    resumed = GeneticOptimizer.resume(path)
+    assert len(resumed.history) == 3
+    _evolve(resumed, 2, checkpoint_path=path, checkpoint_every=1)
+    _evolve(optimizer, 1)
+    assert _history(GeneticOptimizer.resume(path)) == _history(optimizer)
+
+
+def test_checkpoint_keeps_edge_properties(base_graph, tmp_path):
+    optimizer = GeneticOptimizer(base_graph, population_size=4, seed=1,
+                                 evaluator=PsychometricEvaluator(n_respondents=200, seed=1))
+    variant = optimizer.population[1].clone()
+    variant.add_edge("anxiety", "depression", "correlates_with", correlation=0.4,
+                     empirical_support="Metaanálisis", meta_reliability=np.float64(0.8))
+    edge = variant.mutable_edge(("dep1", "depression"))
+    edge.properties["note"] = "revisado"
+    del edge.metadata["empirical"]
+    optimizer.population[1] = variant
+
+    path = str(tmp_path / "checkpoint.npz")
+    optimizer.save_checkpoint(path)
+    resumed = GeneticOptimizer.resume(path)
+    assert [graph.serialize() for graph in resumed.population] == \
+        [graph.serialize() for graph in optimizer.population]
+    assert resumed.base_graph.serialize() == base_graph.serialize()
+
+    # strength y correlation van en columnas float; el resto, en la tabla JSON
+    with np.load(path) as data:
+        assert 0.4 in data["record_correlation"].tolist()
+        records = bytes(data["edge_records_data"]).decode()
+    assert '"correlation"' not in records and "revisado" in records
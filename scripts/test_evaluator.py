@@ -0,0 +1,179 @@
+"""
+Pruebas (pytest) de PsychometricEvaluator: evaluación por poblaciones,
+modo esperado, simulación por bloques, carreras, DIF, ítems politómicos,
+instrumentación y caché
+"""
+import contextlib
+import io
+import numpy as np
+import pytest
+from evaluator import PsychometricEvaluator
+from genetic_optimizer import GeneticOptimizer
+from population import CompiledPopulation, StatisticsAccumulator
+from test_graph import build_valid_graph
+
+
+@pytest.fixture(scope="module")
+def base_graph():
+    np.random.seed(0)  # build_valid_graph usa el generador global para los metadatos
+    return build_valid_graph()
+
+
+def _variant(graph, difficulty, discrimination=None):
+    """Clon del grafo con la dificultad (y discriminación) de todos los ítems desplazadas"""
+    variant = graph.clone()
+    for item_id in variant.nodes_of_type("item"):
+        params = variant.mutable_node(item_id).properties["irt_parameters"]
+        params["difficulty"] += difficulty
+        if discrimination is not None:
+            params["discrimination"] = discrimination
+    return variant
+
+
+@pytest.fixture(scope="module")
+def population(base_graph):
+    return [base_graph, _variant(base_graph, 0.8), _variant(base_graph, -0.5, 0.4)]
+
+
+def test_population_scores_do_not_depend_on_batch_composition(population):
+    joint = PsychometricEvaluator(n_respondents=500, seed=3).evaluate_population(population)
+    for k, graph in enumerate(population):
+        alone = PsychometricEvaluator(n_respondents=500, seed=3).evaluate_graph(graph)
+        assert alone == pytest.approx(joint[k], rel=1e-12)
+
+    reversed_scores = PsychometricEvaluator(n_respondents=500, seed=3).evaluate_population(population[::-1])
+    assert reversed_scores[::-1] == [pytest.approx(metrics, rel=1e-12) for metrics in joint]
+
+
+def test_common_random_numbers_give_identical_candidates_identical_scores(base_graph):
+    results = PsychometricEvaluator(n_respondents=300, seed=1).evaluate_population(
+        [base_graph, base_graph.clone(), base_graph.copy()]
+    )
+    assert results[0] == results[1] == results[2]
+
+
+def test_expected_bias_matches_monte_carlo_mean(base_graph):
+    # Se compara 1 - indicador, que es del orden de E|STD P-DIF|
+    expected = PsychometricEvaluator(n_respondents=1000, mode="expected").evaluate_graph(base_graph)
+    simulated = PsychometricEvaluator(n_respondents=1000, n_simulations=300, seed=5).evaluate_graph(base_graph)
+    assert 1 - expected["bias_indicators"] == pytest.approx(1 - simulated["bias_indicators"], rel=0.05)
+    assert expected["reliability"] == pytest.approx(simulated["reliability"], abs=0.01)
+
+
+def test_expected_mode_runs_no_simulations(base_graph):
+    evaluator = PsychometricEvaluator(n_respondents=300, seed=1, mode="expected")
+    optimizer = GeneticOptimizer(base_graph, population_size=6, seed=2, evaluator=evaluator,
+                                 representation="genome")
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer.evolve(2)
+    assert optimizer.simulations_run == evaluator.simulations_run == 0
+
+
+def test_chunked_statistics_match_a_single_block(population):
+    compiled = CompiledPopulation([graph.compile() for graph in population])
+    rng = np.random.default_rng(0)
+    responses = rng.integers(0, 5, size=(len(population), 900, compiled.max_items)).astype(np.int8)
+    responses[~np.broadcast_to(compiled.item_mask[:, np.newaxis], responses.shape)] = 0
+    group = rng.integers(0, 2, size=900)
+
+    def accumulate(blocks):
+        accumulator = StatisticsAccumulator(compiled, 2, 900)
+        for block in blocks:
+            accumulator.add_moments(responses[:, block], compiled.membership)
+            accumulator.add_dif(responses[:, block], group[block])
+        return accumulator.statistics()
+
+    whole = accumulate([slice(None)])
+    chunked = accumulate([slice(0, 250), slice(250, 251), slice(251, 900)])
+    assert whole.keys() == chunked.keys()
+    for key in whole:
+        np.testing.assert_array_equal(chunked[key], whole[key])
+    # La tabla de DIF se acumula en enteros
+    assert np.issubdtype(chunked["dif_sums"].dtype, np.unsignedinteger)
+    assert chunked["dif_counts"].sum() == len(population) * 900
+
+
+def test_streaming_result_does_not_depend_on_threads(base_graph):
+    single = PsychometricEvaluator(n_respondents=2000, chunk_size=300, seed=3).evaluate_graph(base_graph)
+    with PsychometricEvaluator(n_respondents=2000, chunk_size=300, n_jobs=3, seed=3) as evaluator:
+        assert evaluator.evaluate_graph(base_graph) == single
+        # El pool de hilos de los bloques se reutiliza entre evaluaciones
+        executor = evaluator._chunk_executor
+        assert executor is not None
+        evaluator.evaluate_graph(base_graph)
+        assert evaluator._chunk_executor is executor
+    assert evaluator._chunk_executor is None
+
+
+def test_racing_stops_simulating_dominated_candidates(population):
+    candidates = population + [_variant(population[0], 0.0, 2.5)]
+    evaluator = PsychometricEvaluator(n_respondents=300, seed=2)
+    raced = evaluator.race_population(candidates, elite_size=1, max_simulations=10)
+    full = PsychometricEvaluator(n_respondents=300, n_simulations=10, seed=2).evaluate_population(candidates)
+
+    runs = [metrics["n_simulations"] for metrics in raced]
+    best = int(np.argmax([metrics["overall_score"] for metrics in full]))
+    assert runs[best] == 10
+    assert all(n == 3 for k, n in enumerate(runs) if k != best)
+    assert evaluator.simulations_run == sum(runs)
+    assert int(np.argmax([metrics["overall_score"] for metrics in raced])) == best
+    for raced_metrics, full_metrics in zip(raced, full):
+        assert raced_metrics["overall_score"] == pytest.approx(full_metrics["overall_score"], abs=0.02)
+
+
+def test_racing_stops_converged_candidates(population):
+    raced = PsychometricEvaluator(n_respondents=300, seed=2).race_population(
+        population, tolerance=1.0, min_simulations=2, max_simulations=10
+    )
+    assert [metrics["n_simulations"] for metrics in raced] == [2] * len(population)
+    assert all(metrics["score_se"] > 0 for metrics in raced)
+
+
+def test_likert_items_are_simulated_with_graded_responses(base_graph):
+    compiled = base_graph.compile()
+    assert compiled.is_polytomous
+    assert (compiled.n_categories == 5).all()
+    difficulty = compiled.item_parameters()[0]
+    np.testing.assert_allclose(compiled.thresholds, difficulty[:, np.newaxis] + np.linspace(-1.5, 1.5, 4))
+
+    responses = PsychometricEvaluator(n_respondents=2000, seed=4).simulate_responses(base_graph)["responses"]
+    assert responses.dtype == np.int8
+    for j in range(compiled.n_items):
+        assert np.bincount(responses[:, j], minlength=5).tolist().count(0) == 0
+    assert responses.max() == 4
+
+    # Sin método de respuesta, el ítem sigue siendo dicotómico
+    dichotomous = base_graph.copy()
+    for item_id in dichotomous.nodes_of_type("item"):
+        dichotomous.remove_edge(item_id, "likert_5")
+    assert not dichotomous.compile().is_polytomous
+    responses = PsychometricEvaluator(n_respondents=500, seed=4).simulate_responses(dichotomous)["responses"]
+    assert set(np.unique(responses)) == {0, 1}
+
+
+def test_instrumentation_counts_stages_without_changing_results(population):
+    plain = PsychometricEvaluator(n_respondents=400, chunk_size=150, seed=6)
+    assert plain.evaluate_population(population) == \
+        PsychometricEvaluator(n_respondents=400, chunk_size=150, seed=6, instrumentation=True).evaluate_population(population)
+    assert plain.instrumentation_report() == {}
+
+    evaluator = PsychometricEvaluator(n_respondents=400, chunk_size=150, seed=6, instrumentation=True)
+    evaluator.evaluate_population(population)
+    report = evaluator.instrumentation_report()
+    assert {"compile", "simulation", "reliability", "bias_indicators",
+            "validity", "discrimination_power", "model_fit"} <= report.keys()
+    # 3 réplicas × 3 bloques de personas
+    assert report["simulation"]["calls"] == 9
+    assert report["simulation"]["bytes"] > 0
+    assert report["compile"]["calls"] == 1
+    for stage in report.values():
+        assert stage["mean_seconds"] == pytest.approx(stage["seconds"] / stage["calls"])
+
+
+def test_worker_instrumentation_is_merged(population):
+    with PsychometricEvaluator(n_respondents=300, seed=6, instrumentation=True, backend="process",
+                               n_workers=2, batch_size=1) as evaluator:
+        evaluator.evaluate_population(population)
+        report = evaluator.instrumentation_report()
+    # Un lote por candidato, cada uno con sus 3 réplicas
+    assert report["simulation"]["calls"] == 3 * len(population)
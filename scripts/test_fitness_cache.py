@@ -0,0 +1,69 @@
+"""
+Pruebas (pytest) de la caché de fitness indexada por el contenido del grafo
+"""
+import numpy as np
+import pytest
+from evaluator import PsychometricEvaluator
+from fitness_cache import FitnessCache, graph_fingerprint
+from test_graph import build_valid_graph
+
+
+@pytest.fixture(scope="module")
+def base_graph():
+    np.random.seed(0)  # build_valid_graph usa el generador global para los metadatos
+    return build_valid_graph()
+
+
+def test_fingerprint_depends_on_content_not_identity(base_graph):
+    fingerprint = graph_fingerprint(base_graph)
+    assert graph_fingerprint(base_graph.copy()) == fingerprint
+    assert graph_fingerprint(base_graph.compile()) == fingerprint
+
+    changed = base_graph.clone()
+    changed.mutable_node("dep1").properties["irt_parameters"]["difficulty"] += 0.1
+    assert graph_fingerprint(changed) != fingerprint
+    rewired = base_graph.clone()
+    rewired.mutable_edge(rewired.edges_of_type("correlates_with")[0]).properties["correlation"] = 0.2
+    assert graph_fingerprint(rewired) != fingerprint
+
+
+def test_cached_evaluation_matches_uncached_and_skips_simulation(base_graph):
+    changed = base_graph.clone()
+    changed.mutable_node("dep1").properties["irt_parameters"]["difficulty"] += 0.5
+    graphs = [base_graph, changed, base_graph.copy()]
+    uncached = PsychometricEvaluator(n_respondents=300, seed=8).evaluate_population(graphs)
+
+    cache = FitnessCache()
+    evaluator = PsychometricEvaluator(n_respondents=300, seed=8, cache=cache)
+    first = evaluator.evaluate_population(graphs)
+    assert first[0] == first[2]
+    # El contenido repetido se simula una sola vez
+    assert evaluator.simulations_run == 2 * evaluator.n_simulations
+    assert cache.stats()["size"] == 2
+
+    simulations = evaluator.simulations_run
+    assert evaluator.evaluate_population(graphs[::-1]) == first[::-1]
+    assert evaluator.simulations_run == simulations
+    assert cache.hits == 2
+    assert first[1] == pytest.approx(uncached[1], abs=0.02)
+
+    # Otros ajustes u otra semilla no comparten entradas
+    other = PsychometricEvaluator(n_respondents=300, seed=9, cache=cache)
+    other.evaluate_graph(base_graph)
+    assert other.simulations_run == other.n_simulations
+
+
+def test_cache_is_lru_bounded_and_persists(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = FitnessCache(max_size=2, path=path)
+    for key in "abc":
+        cache.put(key, {"overall_score": np.float64(ord(key))})
+    assert "a" not in cache and len(cache) == 2
+    cache.get("b")
+    cache.put("d", {"overall_score": 1.0})
+    assert "c" not in cache and "b" in cache
+    cache.save()
+
+    restored = FitnessCache(path=path)
+    assert restored.get("b") == {"overall_score": 98.0}
+    assert FitnessCache.from_dict(cache.to_dict()).to_dict() == cache.to_dict()
@@ -0,0 +1,92 @@
+"""
+Pruebas (pytest) de GeneticOptimizer: reproducibilidad con semilla, backends,
+clones, genomas, islas, puntos de control, cribado con sustituto, modo
+multiobjetivo y progreso en streaming
+"""
+import contextlib
+import io
+import threading
+import numpy as np
+import pytest
+from evaluator import PsychometricEvaluator
+from genetic_optimizer import GeneticOptimizer
+from test_graph import build_valid_graph
+
+
+@pytest.fixture(scope="module")
+def base_graph():
+    np.random.seed(0)  # build_valid_graph usa el generador global para los metadatos
+    return build_valid_graph()
+
+
+def _evolve(optimizer, generations, **options):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return optimizer.evolve(generations, **options)
+
+
+def _history(optimizer):
+    """Historial sin los tiempos medidos"""
+    return [{key: value for key, value in record.items() if key not in ("seconds", "phase_seconds")}
+            for record in optimizer.history]
+
+
+def _run(graph, backend, representation="graph"):
+    with PsychometricEvaluator(n_respondents=300, seed=11, backend=backend, n_workers=2) as evaluator:
+        optimizer = GeneticOptimizer(graph, population_size=6, seed=5, evaluator=evaluator,
+                                     representation=representation)
+        best, score, _ = _evolve(optimizer, 2)
+        return best.serialize(), score, _history(optimizer), optimizer.simulations_run, evaluator.simulations_run
+
+
+@pytest.mark.parametrize("representation", ["graph", "genome"])
+def test_seeded_run_is_identical_across_backends(base_graph, representation):
+    serial = _run(base_graph, "serial", representation)
+    assert serial[3] > 0
+    assert _run(base_graph, "serial", representation) == serial
+    assert _run(base_graph, "thread", representation) == serial
+    assert _run(base_graph, "process", representation) == serial
+
+
+def test_stop_reason_tells_cancellation_from_errors(base_graph):
+    optimizer = GeneticOptimizer(base_graph, population_size=4, seed=2,
+                                 evaluator=PsychometricEvaluator(n_respondents=100, seed=2))
+    assert len(list(optimizer.iter_evolve(2))) == 2
+    assert optimizer.stop_reason == "generations"
+    assert list(optimizer.iter_evolve(3, max_evaluations=1)) and optimizer.stop_reason == "evaluations"
+
+    cancel = threading.Event()
+    cancel.set()
+    assert list(optimizer.iter_evolve(2, cancel=cancel)) == []
+    assert optimizer.stop_reason == "cancelled"
+
+    iterator = optimizer.iter_evolve(5)
+    next(iterator)
+    iterator.close()
+    assert optimizer.stop_reason == "cancelled"
+
+    def fail(graphs):
+        raise RuntimeError("evaluador caído")
+
+    optimizer.evaluator.evaluate_population = fail
+    with pytest.raises(RuntimeError):
+        list(optimizer.iter_evolve(2))
+    assert optimizer.stop_reason == "error"
+
+
+def test_graph_diversity_reads_compiled_parameters(base_graph):
+    optimizer = GeneticOptimizer(base_graph, population_size=6, seed=7, mutation_rate=0.8,
+                                 evaluator=PsychometricEvaluator(n_respondents=100, seed=7))
+    item_ids = base_graph.nodes_of_type("item")
+    parameters = np.array([
+        [[(graph.nodes[item_id].properties.get("irt_parameters") or {}).get(name, np.nan)
+          for name in ("difficulty", "discrimination")] for item_id in item_ids]
+        for graph in optimizer.population
+    ], dtype=np.float64)
+    expected = float(np.nanmean(np.nanstd(parameters, axis=0)))
+    assert expected > 0
+    assert optimizer.diversity() == pytest.approx(expected)
+
+    # La validación y la evaluación reutilizan las instantáneas de la diversidad
+    compiled = [optimizer._compiled_graphs[id(graph)][1] for graph in optimizer.population]
+    optimizer.evaluate_population()
+    assert [optimizer._compiled_graphs[id(graph)][1] for graph in optimizer.population] == compiled
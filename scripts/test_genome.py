@@ -0,0 +1,34 @@
+"""
+Pruebas (pytest) de la codificación por genomas: codificación y
+decodificación de grafos y validez vectorizada
+"""
+import numpy as np
+import pytest
+from genome import GenomeEncoding, mutate
+from validator import PsychometricValidator
+from test_graph import build_valid_graph
+
+
+@pytest.fixture(scope="module")
+def base_graph():
+    np.random.seed(0)  # build_valid_graph usa el generador global para los metadatos
+    return build_valid_graph()
+
+
+def test_decode_of_encoded_graph_preserves_it(base_graph):
+    encoding = GenomeEncoding(base_graph)
+    genomes = encoding.encode([base_graph])
+    assert encoding.decode(genomes).serialize() == base_graph.serialize()
+
+
+def test_genome_validity_matches_validator(base_graph):
+    encoding = GenomeEncoding(base_graph)
+    rng = np.random.default_rng(0)
+    genomes = mutate(encoding.base_population(40), encoding, rng, 0.9)
+    genomes.parameters[::7, 0, 1] = 3.5  # Discriminación fuera de rango
+    genomes.edge_weight[::5] = 0.9  # Correlación fuerte (con soporte empírico)
+    validator = PsychometricValidator()
+    expected = [all(result["valid"] for result in validator.validate(encoding.decode(genomes, k)).values())
+                for k in range(len(genomes))]
+    assert encoding.valid(genomes).tolist() == expected
+    assert not all(expected)
@@ -3,6 +3,7 @@ from validator import PsychometricValidator
 from evaluator import PsychometricEvaluator
 from graph_generator import GraphGenerator
 from genetic_optimizer import GeneticOptimizer
+from fitness_cache import FitnessCache
 import json
 import numpy as np
 import matplotlib.pyplot as plt
@@ -114,7 +115,8 @@ def main():
     
     # 3. Evaluación inicial
     print("\n=== EVALUACIÓN INICIAL ===")
-    evaluator = PsychometricEvaluator(n_respondents=3000, n_simulations=3)
+    # Caché compartida: la reevaluación del grafo base y del mejor grafo no se simula de nuevo
+    evaluator = PsychometricEvaluator(n_respondents=3000, n_simulations=3, cache=FitnessCache())
     base_metrics = evaluator.evaluate_graph(base_graph)
     print("Métricas iniciales:")
     for metric, value in base_metrics.items():
@@ -125,7 +127,8 @@ def main():
     optimizer = GeneticOptimizer(
         base_graph=base_graph,
         population_size=12,
-        mutation_rate=0.2
+        mutation_rate=0.2,
+        evaluator=evaluator
     )
     
     best_graph, best_score, history = optimizer.evolve(generations=10)
@@ -137,6 +140,8 @@ def main():
     
     # 5.1. Comparación de métricas
     optimized_metrics = evaluator.evaluate_graph(best_graph)
+    cache_stats = evaluator.cache.stats()
+    print(f"\nCaché de evaluaciones: {cache_stats['hits']} aciertos, {cache_stats['misses']} fallos")
     print("\nComparación de métricas:")
     print(f"{'Métrica':<20} {'Original':<10} {'Optimizado':<10} {'Mejora':<10}")
     for metric in base_metrics:
@@ -186,10 +191,7 @@ def main():
             "initial": base_metrics,
             "optimized": optimized_metrics
         },
-        "best_graph": {
-            "nodes": {n_id: vars(n) for n_id, n in best_graph.nodes.items()},
-            "edges": {f"{s}-{t}": vars(e) for (s,t), e in best_graph.edges.items()}
-        },
+        "best_graph": best_graph.to_dict(),
         "optimization_history": history
     }
     
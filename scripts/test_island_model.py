@@ -0,0 +1,64 @@
+"""
+Pruebas (pytest) del modelo de islas: continuidad entre llamadas a evolve,
+semillas por isla y equivalencia entre procesos y ejecución por turnos
+"""
+import contextlib
+import io
+import numpy as np
+import pytest
+from evaluator import PsychometricEvaluator
+from island_model import IslandModel
+from test_graph import build_valid_graph
+
+
+@pytest.fixture(scope="module")
+def base_graph():
+    np.random.seed(0)  # build_valid_graph usa el generador global para los metadatos
+    return build_valid_graph()
+
+
+def _model(base_graph, processes=False):
+    return IslandModel(base_graph, n_islands=2, population_size=4, migration_interval=2, n_migrants=1,
+                       seed=7, processes=processes,
+                       optimizer_options={"evaluator": PsychometricEvaluator(n_respondents=100, seed=3)})
+
+
+def _run(model, *calls):
+    """Historial combinado y por isla (sin los tiempos medidos) tras varias llamadas a evolve"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        history = [record for generations in calls for record in model.evolve(generations)[2]]
+    islands = [[{key: value for key, value in record.items() if key not in ("seconds", "phase_seconds")}
+                for record in records] for records in model.island_histories]
+    return history, islands
+
+
+def test_split_evolve_calls_continue_the_same_run(base_graph):
+    whole = _run(_model(base_graph), 5)
+    model = _model(base_graph)
+    split = _run(model, 3, 2)
+    assert split == whole
+    assert [record["generation"] for record in split[0]] == [1, 2, 3, 4, 5]
+    assert model.generation == 5
+
+
+def test_shared_evaluator_gets_a_seed_per_island(base_graph):
+    evaluator = PsychometricEvaluator(n_respondents=100, seed=3)
+    model = IslandModel(base_graph, n_islands=3, mutation_rates=[0.2] * 3, seed=7, processes=False,
+                        optimizer_options={"evaluator": evaluator})
+    island_evaluators = [options["evaluator"] for options in model.island_options]
+    assert all(island is not evaluator for island in island_evaluators)
+    keys = {island.seed_sequence.spawn_key for island in island_evaluators}
+    assert len(keys) == 3
+    # Cada evaluación (una por generación) toma un flujo hijo distinto del de la isla
+    seeds = [island._next_seed().generate_state(4).tolist() for island in island_evaluators for _ in range(2)]
+    assert len({tuple(seed) for seed in seeds}) == 6
+
+
+def test_processes_match_in_process_islands(base_graph):
+    expected = _run(_model(base_graph), 3, 1)
+    with _model(base_graph, processes=True) as model:
+        assert _run(model, 3, 1) == expected
+        workers = model._workers
+    assert all(not worker.is_alive() for worker in workers)
+    with pytest.raises(ValueError):
+        model.evolve(1)
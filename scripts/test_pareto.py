@@ -0,0 +1,53 @@
+"""
+Pruebas (pytest) de la ordenación por frentes no dominados y la selección NSGA-II
+"""
+import numpy as np
+import pytest
+from pareto import crowding_distance, non_dominated_sort, select_survivors
+
+
+def _dense_ranks(values):
+    """Referencia con la matriz de dominancia completa"""
+    at_least = np.all(values[:, np.newaxis] >= values[np.newaxis], axis=2)
+    better = np.any(values[:, np.newaxis] > values[np.newaxis], axis=2)
+    dominance = at_least & better
+    ranks = np.full(len(values), -1)
+    remaining = np.ones(len(values), dtype=bool)
+    rank = 0
+    while remaining.any():
+        front = remaining & ~(dominance[remaining].any(axis=0))
+        ranks[front] = rank
+        remaining &= ~front
+        rank += 1
+    return ranks
+
+
+@pytest.mark.parametrize("n_objectives", [1, 2, 3, 4])
+@pytest.mark.parametrize("max_elements", [1, 150, 2 ** 20])
+def test_sort_matches_dense_dominance_with_ties(n_objectives, max_elements):
+    rng = np.random.default_rng(n_objectives)
+    for _ in range(10):
+        # Pocos valores distintos: muchos empates y candidatos repetidos
+        values = rng.integers(0, 4, (50, n_objectives)).astype(float)
+        np.testing.assert_array_equal(non_dominated_sort(values, max_elements=max_elements),
+                                      _dense_ranks(values))
+
+
+def test_empty_and_single_candidate():
+    assert len(non_dominated_sort(np.empty((0, 2)))) == 0
+    np.testing.assert_array_equal(non_dominated_sort([[0.3, 0.1]]), [0])
+    indices, ranks, crowding = select_survivors(np.empty((0, 2)), 3)
+    assert len(indices) == len(ranks) == len(crowding) == 0
+
+
+def test_survivors_prefer_lower_rank_then_crowding():
+    values = np.array([[1.0, 0.0], [0.5, 0.5], [0.0, 1.0], [0.6, 0.6], [0.1, 0.1]])
+    ranks = non_dominated_sort(values)
+    np.testing.assert_array_equal(ranks, [0, 1, 0, 0, 2])
+    crowding = crowding_distance(values, ranks)
+    # Los extremos de cada frente tienen distancia infinita; el interior, finita
+    assert np.isinf(crowding[[0, 2, 1, 4]]).all()
+    assert crowding[3] == pytest.approx(2.0)
+    indices, _, _ = select_survivors(values, 4)
+    assert set(indices[:3]) == {0, 2, 3}
+    assert indices[2] == 3 and indices[3] == 1
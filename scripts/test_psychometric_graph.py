@@ -0,0 +1,286 @@
+"""
+Pruebas (pytest) de PsychometricGraph: clones con estructura compartida,
+elementos de solo lectura, copias independientes, índices de relaciones,
+identificadores y altas en bloque por columnas
+"""
+import contextlib
+import io
+import numpy as np
+import pytest
+from evaluator import PsychometricEvaluator
+from edge import PsychometricEdge
+from genetic_optimizer import GeneticOptimizer
+from node import PsychometricNode
+from psychometric_graph import PsychometricGraph
+from test_graph import build_valid_graph
+
+
+@pytest.fixture(scope="module")
+def base_graph():
+    np.random.seed(0)  # build_valid_graph usa el generador global para los metadatos
+    return build_valid_graph()
+
+
+def test_writes_through_clone_nodes_do_not_reach_base_graph(base_graph):
+    text = base_graph.serialize()
+    clone = base_graph.clone()
+    edge_key = ("dep1", "depression")
+
+    with pytest.raises(TypeError):
+        clone.nodes["dep1"].properties["irt_parameters"]["difficulty"] = 2.5
+    with pytest.raises(TypeError):
+        clone.nodes["dep1"].properties["irt_parameters"].pop("guessing")
+    with pytest.raises(TypeError):
+        clone.nodes["dep1"].content = "otro texto"
+    with pytest.raises(TypeError):
+        clone.edges[edge_key].properties["strength"] = 0.1
+    with pytest.raises(TypeError):
+        clone.edges[edge_key].update_metadata({"psychometric.reliability": 0.1})
+    # Los elementos también quedan de solo lectura en el grafo original
+    with pytest.raises(TypeError):
+        base_graph.nodes["dep1"].properties["irt_parameters"]["difficulty"] = 2.5
+    assert base_graph.serialize() == text
+
+    # La lectura funciona como en un dict normal
+    params = clone.nodes["dep1"].properties["irt_parameters"]
+    assert params == base_graph.nodes["dep1"].properties["irt_parameters"]
+    assert dict(params).keys() == {"difficulty", "discrimination", "guessing"}
+
+    clone.mutable_node("dep1").properties["irt_parameters"]["difficulty"] = 2.5
+    clone.mutable_edge(edge_key).properties["strength"] = 0.1
+    assert clone.nodes["dep1"].properties["irt_parameters"]["difficulty"] == 2.5
+    assert base_graph.serialize() == text
+    base_graph.mutable_node("dep2").properties["irt_parameters"]["difficulty"] += 0.0
+    assert base_graph.serialize() == text
+
+
+def test_copies_returned_to_callers_are_isolated(base_graph):
+    text = base_graph.serialize()
+    copy = base_graph.copy()
+    copy.nodes["dep1"].properties["irt_parameters"]["difficulty"] = 2.5
+    copy.edges[("dep1", "depression")].metadata["psychometric"]["reliability"] = 0.1
+    assert base_graph.serialize() == text
+
+    clone = base_graph.clone()
+    clone.mutable_node("dep1").properties["irt_parameters"]["difficulty"] = 2.5
+    assert base_graph.serialize() == text
+
+    for representation in ("graph", "genome"):
+        optimizer = GeneticOptimizer(base_graph, population_size=6, seed=4, representation=representation,
+                                     objectives=["reliability", "validity"],
+                                     evaluator=PsychometricEvaluator(n_respondents=200, seed=4))
+        with contextlib.redirect_stdout(io.StringIO()):
+            best, _, _ = optimizer.evolve(2)
+        population = [graph.serialize() for graph in optimizer.population] if representation == "graph" else None
+        for graph in [best] + [graph for graph, _ in optimizer.pareto_front()]:
+            for item_id in graph.nodes_of_type("item"):
+                graph.nodes[item_id].properties["irt_parameters"]["difficulty"] = 2.5
+        assert base_graph.serialize() == text
+        if population is not None:
+            with pytest.raises(TypeError):
+                optimizer.population[0].nodes["dep1"].properties["irt_parameters"]["difficulty"] = 2.5
+            assert [graph.serialize() for graph in optimizer.population] == population
+
+
+def test_optimizer_leaves_callers_graph_writable():
+    np.random.seed(0)
+    graph = build_valid_graph()
+    GeneticOptimizer(graph, population_size=4, seed=1, evaluator=PsychometricEvaluator(n_respondents=100, seed=1))
+    graph.nodes["dep1"].properties["irt_parameters"]["difficulty"] = 1.5
+    assert graph.mutable_node("dep1") is graph.nodes["dep1"]
+    graph.edges[("dep1", "depression")].properties["strength"] = 0.4
+    assert graph.mutable_edge(("dep1", "depression")) is graph.edges[("dep1", "depression")]
+
+
+def test_clone_edits_keep_both_graphs_indexed(base_graph):
+    graph = base_graph.copy()
+    clone = graph.clone()
+    clone.add_node("new_item", "item", content="Nuevo")
+    clone.add_edge("new_item", "depression", "measures", strength=0.5)
+    clone.remove_edge("dep1", "depression")
+    graph.add_node("other", "method")
+
+    assert "new_item" not in graph.nodes and "other" not in clone.nodes
+    assert "dep1" in graph.predecessors("depression", "measures")
+    assert "dep1" not in clone.predecessors("depression", "measures")
+    assert "new_item" in clone.predecessors("depression", "measures")
+    assert clone.construct_items("depression") == clone.predecessors("depression", "measures")
+    assert graph.construct_items("depression") == graph.predecessors("depression", "measures")
+    assert graph.successors("other") == [] and clone.successors("new_item") == ["depression"]
+    assert set(clone.edges_of_type("measures")) == {key for key, edge in clone.edges.items()
+                                                     if edge.type == "measures"}
+
+    # Eliminar y volver a añadir el método de un ítem
+    method = clone.item_method("dep2")
+    clone.remove_edge("dep2", method)
+    assert clone.item_method("dep2") is None and graph.item_method("dep2") == method
+    clone.add_edge("dep2", method, "uses_method")
+    assert clone.item_method("dep2") == method
+
+
+def test_networkx_graph_is_a_mutable_copy(base_graph):
+    nx_graph = base_graph.graph
+    assert set(nx_graph.nodes) == set(base_graph.nodes)
+    assert {(s, t): data["relationship_type"] for s, t, data in nx_graph.edges(data=True)} == {
+        key: edge.type for key, edge in base_graph.edges.items()}
+    nx_graph.add_node("extra")
+    nx_graph.remove_edge("dep1", "depression")
+    assert "extra" not in base_graph.graph and base_graph.graph.has_edge("dep1", "depression")
+
+
+def test_str_subclass_ids_and_types_are_accepted():
+    ids = np.array(["c", "i"])
+    graph = PsychometricGraph()
+    graph.add_node(ids[0], np.str_("construct"))
+    graph.add_node(ids[1], "item")
+    graph.add_edge(ids[1], ids[0], np.str_("measures"))
+    assert graph.nodes_of_type("construct") == ["c"]
+    assert graph.edges_of_type("measures") == [("i", "c")]
+
+
+def test_reading_default_properties_keeps_order_and_storage(tmp_path):
+    graph = PsychometricGraph()
+    graph.add_node("c", "construct")
+    graph.add_node("i", "item")
+    graph.add_edge("i", "c", "measures", strength=0.5)
+    node, edge = graph.nodes["i"], graph.edges[("i", "c")]
+    text = graph.serialize()
+
+    # Las lecturas sin copia no crean las propiedades ni los metadatos
+    assert node.get_property("bias_risk") == {"dif": None, "cultural_bias": None}
+    assert node.get_property("missing", 0) == 0
+    assert edge.get_metadata("psychometric")["reliability"] is None
+    assert node.stored_properties() is None and edge.stored_metadata() is None
+    with pytest.raises(TypeError):
+        node.get_property("irt_parameters")["difficulty"] = 1.0
+    path = str(tmp_path / "graph.psyg")
+    graph.save(path)
+    loaded = PsychometricGraph.load(path)
+    assert loaded.nodes["i"].stored_properties() is None and loaded.edges[("i", "c")].stored_metadata() is None
+
+    # properties y metadata son dicts normales, en el orden de la plantilla
+    keys = list(node.properties)
+    assert type(node.properties) is dict and type(edge.metadata) is dict
+    node.properties["bias_risk"]
+    del node.properties["description"]
+    assert list(node.properties) == keys[1:]
+    assert repr(node.properties) == repr(dict(node.properties))
+    assert graph.serialize() != text and PsychometricGraph.load(path).serialize() == text
+
+    # En un clon, leer por la vista de solo lectura no cambia nada
+    clone = loaded.clone()
+    clone.nodes["c"].properties["content_domains"]
+    list(clone.edges[("i", "c")].metadata.items())
+    assert clone.nodes["c"].stored_properties() is None and clone.serialize() == text
+
+    # Las propiedades repetidas se guardan una vez, pero cada nodo cargado tiene las suyas
+    graph.add_items_from_arrays(["j", "k"], difficulty=[0.1, 0.2])
+    graph.save(path)
+    loaded = PsychometricGraph.load(path)
+    loaded.nodes["j"].properties["bias_risk"]["dif"] = 0.3
+    assert loaded.nodes["k"].properties["bias_risk"]["dif"] is None
+    assert loaded.nodes["k"].properties["irt_parameters"]["difficulty"] == 0.2
+
+
+def _graph_one_by_one():
+    graph = PsychometricGraph()
+    graph.add_node("c", "construct", content="Constructo")
+    graph.add_node("m", "method", response_options=[1, 2, 3])
+    graph.add_node("i1", "item", content="Uno", irt_parameters={
+        "difficulty": 0.5, "discrimination": 1.2, "guessing": None, "thresholds": [-1.0, 1.0], "model": "grm"})
+    graph.add_node("i2", "item", content="Dos", irt_parameters={
+        "difficulty": None, "discrimination": 0.8, "guessing": 0.1}, source="banco")
+    graph.add_edge("i1", "c", "measures", strength=0.7, meta_psychometric={"reliability": 0.8})
+    graph.add_edge("i2", "c", "measures", strength=0.6)
+    graph.add_edge("i1", "m", "uses_method")
+    graph.add_edge("i2", "m", "uses_method", weight=2)
+    return graph
+
+
+def _bulk_graph():
+    graph = PsychometricGraph()
+    graph.add_node("c", "construct", content="Constructo")
+    graph.add_node("m", "method", response_options=[1, 2, 3])
+    graph.add_items_from_arrays(np.array(["i1", "i2"]), content=["Uno", "Dos"],
+                                difficulty=np.array([0.5, np.nan]), discrimination=[1.2, 0.8],
+                                guessing=[None, 0.1], thresholds=np.array([[-1.0, 1.0], [np.nan, np.nan]]),
+                                model=["grm", None], source=[np.nan, "banco"])
+    graph.add_edges_from(["i1", "i2", "i1", "i2"], ["c", "c", "m", "m"],
+                         ["measures", "measures", "uses_method", "uses_method"],
+                         strength=[0.7, 0.6, np.nan, None], weight=[None, None, None, 2],
+                         meta_psychometric=[{"reliability": 0.8}, None, None, None])
+    return graph
+
+
+def test_bulk_columns_match_adding_one_by_one():
+    expected = _graph_one_by_one()
+    graph = _bulk_graph()
+    assert graph.serialize() == expected.serialize()
+    assert graph.construct_items("c") == ["i1", "i2"] and graph.item_method("i1") == "m"
+    assert graph.edges_of_type("uses_method") == [("i1", "m"), ("i2", "m")]
+    assert graph.successors("i1") == graph.successors("i1", "measures") + graph.successors("i1", "uses_method")
+
+    # Relaciones repetidas o existentes: como add_edge una a una, cuenta la última
+    keys = [("i1", "m"), ("i2", "c"), ("i1", "m"), ("i2", "m")]
+    types = ["measures", "related_to", "uses_method", "related_to"]
+    strengths = [0.1, 0.2, 0.3, 0.4]
+    for (source, target), relationship_type, strength in zip(keys, types, strengths):
+        expected.add_edge(source, target, relationship_type, strength=strength)
+    edges = graph.add_edges_from([s for s, _ in keys], [t for _, t in keys], types, strength=strengths)
+    assert [edge.properties["strength"] for edge in edges] == [0.2, 0.3, 0.4]
+    assert graph.serialize() == expected.serialize()
+    assert graph.construct_items("c") == expected.construct_items("c") == ["i1"]
+    assert graph.item_method("i2") is None and graph.item_method("i1") == "m"
+
+    with pytest.raises(ValueError):
+        graph.add_edges_from(["i1"], ["otro"], "measures")
+    with pytest.raises(ValueError):
+        graph.add_edges_from(["i1"], ["c"])
+    with pytest.raises(ValueError):
+        graph.add_items_from_arrays(["i3", "i4"], difficulty=[0.1])
+
+
+def test_bulk_columns_accept_dataframes():
+    pd = pytest.importorskip("pandas")
+    expected = PsychometricGraph()
+    expected.add_node("c", "construct")
+    expected.add_items_from_arrays(["i1", "i2"], content=["Uno", "Dos"], difficulty=[0.5, 0.1], source=["a", None])
+    expected.add_edges_from(["i1", "i2"], "c", "measures", strength=[0.7, 0.6],
+                            **{"meta_psychometric.reliability": [0.8, None]})
+
+    graph = PsychometricGraph()
+    graph.add_node("c", "construct")
+    graph.add_items_from_arrays(pd.DataFrame({"id": ["i1", "i2"], "content": ["Uno", "Dos"],
+                                              "difficulty": [0.5, 0.1], "source": ["a", None]}))
+    graph.add_edges_from(pd.DataFrame({"source": ["i1", "i2"], "target": ["c", "c"], "type": "measures",
+                                       "strength": [0.7, 0.6], "meta_psychometric.reliability": [0.8, np.nan]}))
+    assert graph.serialize() == expected.serialize()
+
+    # Sin columna 'id', los identificadores son el índice
+    indexed = PsychometricGraph()
+    indexed.add_items_from_arrays(pd.DataFrame({"difficulty": [0.2]}, index=["i9"]))
+    assert indexed.nodes["i9"].properties["irt_parameters"]["difficulty"] == 0.2
+
+
+def test_insert_shares_or_owns_elements():
+    source = _graph_one_by_one()
+    graph = PsychometricGraph()
+    graph.insert_nodes(source.nodes.values())
+    graph.insert_edges(source.edges.values())
+    assert graph.serialize() == source.serialize()
+    assert graph.construct_items("c") == ["i1", "i2"] and graph.item_method("i2") == "m"
+    # Los elementos insertados sin owned se comparten: quedan de solo lectura
+    with pytest.raises(TypeError):
+        graph.nodes["i1"].properties["source"] = "otro"
+    graph.mutable_node("i1").properties["source"] = "otro"
+    assert "source" not in source.nodes["i1"].properties and source.mutable_node("i1") is not graph.nodes["i1"]
+
+    owned = PsychometricGraph()
+    owned.insert_nodes([PsychometricNode("a", "item"), PsychometricNode("b", "construct")], owned=True)
+    edges = owned.insert_edges([PsychometricEdge("a", "b", "measures"), PsychometricEdge("a", "b", "related_to")],
+                               owned=True)
+    assert [edge.type for edge in edges] == ["related_to"]
+    assert owned.edges_of_type("measures") == [] and owned.construct_items("b") == []
+    owned.nodes["a"].properties["source"] = "propio"
+    owned.edges[("a", "b")].properties["strength"] = 0.5
+    assert owned.mutable_edge(("a", "b")) is owned.edges[("a", "b")]
@@ -0,0 +1,30 @@
+"""
+Pruebas (pytest) de la normalización de semillas
+"""
+import numpy as np
+from rng import as_seed_sequence, spawn_generators
+
+
+def _draws(seed_sequence):
+    return np.random.default_rng(seed_sequence).random(3).tolist()
+
+
+def test_generator_seed_depends_on_its_current_state():
+    generator = np.random.default_rng(7)
+    first = as_seed_sequence(generator)
+    second = as_seed_sequence(generator)
+    assert _draws(first) != _draws(second)
+
+    # Un generador con la misma semilla y el mismo avance da el mismo flujo
+    replay = np.random.default_rng(7)
+    assert _draws(as_seed_sequence(replay)) == _draws(first)
+    replay.random()
+    assert _draws(as_seed_sequence(np.random.default_rng(7))) != _draws(as_seed_sequence(replay))
+
+
+def test_int_and_seed_sequence_seeds_are_reproducible():
+    assert _draws(as_seed_sequence(3)) == _draws(as_seed_sequence(3))
+    seed_sequence = np.random.SeedSequence(5)
+    assert as_seed_sequence(seed_sequence) is seed_sequence
+    first, second = spawn_generators(as_seed_sequence(3), 2)
+    assert first.random() != second.random()
@@ -0,0 +1,65 @@
+"""
+Pruebas (pytest) de la serialización: formato binario columnar, formato de
+intercambio JSON e identificadores no textuales
+"""
+import json
+import struct
+import numpy as np
+import pytest
+from psychometric_graph import PsychometricGraph
+from serialization import FORMAT_VERSION, MAGIC, open_graph
+from test_graph import build_valid_graph
+
+
+def _irregular_graph():
+    """Grafo con claves en orden arbitrario, valores por defecto borrados e ids no textuales"""
+    graph = PsychometricGraph()
+    graph.add_node("c", np.str_("construct"), theoretical_framework="Marco")
+    graph.add_node(7, "method", content={"escala": [1, 5]})
+    graph.add_node(("item", 1), "item", content="Ítem", extra=1)
+    node = graph.nodes[("item", 1)]
+    node.properties["description"]
+    node.properties["irt_parameters"] = {"difficulty": 0.2, "discrimination": 1.1, "guessing": 0.0,
+                                         "thresholds": [-1.0, 1.0], "model": "grm"}
+    del node.properties["bias_risk"]
+    graph.add_edge(("item", 1), "c", "measures", note="x", strength=1.2, correlation=0.3)
+    graph.add_edge(("item", 1), 7, "uses_method", meta_reliability=0.9)
+    graph.add_edge("c", 7, np.str_("related_to"), correlation=0.5, strength=0.1)
+    return graph
+
+
+@pytest.mark.parametrize("graph_factory", [build_valid_graph, _irregular_graph])
+def test_binary_and_json_round_trips_preserve_serialize(graph_factory, tmp_path):
+    graph = graph_factory()
+    text = graph.serialize()
+
+    path = str(tmp_path / "graph.psyg")
+    graph.save(path)
+    assert PsychometricGraph.load(path).serialize() == text
+    assert PsychometricGraph.from_dict(json.loads(text)).serialize() == text
+    with open_graph(path) as archive:
+        for node_id, node in graph.nodes.items():
+            assert archive.node(node_id).to_dict() == node.to_dict()
+        for key, edge in graph.edges.items():
+            assert list(archive.edge(*key).properties.items()) == list(edge.properties.items())
+
+
+def test_non_serializable_node_ids_are_rejected(tmp_path):
+    graph = PsychometricGraph()
+    graph.add_node(frozenset({1}), "item")
+    with pytest.raises(ValueError):
+        graph.save(str(tmp_path / "graph.psyg"))
+
+
+def test_other_format_versions_are_rejected(tmp_path):
+    graph = PsychometricGraph()
+    graph.add_node("c", "construct")
+    path = tmp_path / "graph.psyg"
+    graph.save(str(path))
+    data = bytearray(path.read_bytes())
+    struct.pack_into("<I", data, len(MAGIC), FORMAT_VERSION + 1)
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        PsychometricGraph.load(str(path))
+    with pytest.raises(ValueError):
+        PsychometricGraph.from_dict({**graph.to_dict(), "version": FORMAT_VERSION + 1})
@@ -0,0 +1,146 @@
+"""
+Pruebas (pytest) del motor vectorizado de simulación IRT frente a la
+simulación escalar original (un bucle por ítem y por persona)
+"""
+import math
+import numpy as np
+import pytest
+from psychometric_graph import PsychometricGraph
+from evaluator import PsychometricEvaluator
+from simulation import simulate_dichotomous, simulate_polytomous, cumulative_probabilities
+
+
+def _scalar_probability(theta, difficulty, discrimination, guessing):
+    """Probabilidad 3PL calculada como en la versión escalar"""
+    return guessing + (1 - guessing) / (1 + math.exp(-discrimination * (theta - difficulty)))
+
+
+def _scalar_category_probabilities(theta, discrimination, thresholds, model):
+    """P(X = k) de un ítem politómico (respuesta graduada o crédito parcial)"""
+    if model == "pcm":
+        steps = [0.0]
+        for threshold in thresholds:
+            steps.append(steps[-1] + discrimination * (theta - threshold))
+        weights = [math.exp(step) for step in steps]
+        return [weight / sum(weights) for weight in weights]
+    above = [1.0] + [1 / (1 + math.exp(-discrimination * (theta - threshold))) for threshold in thresholds] + [0.0]
+    return [above[k] - above[k + 1] for k in range(len(thresholds) + 1)]
+
+
+def _scalar_simulation(n_respondents, difficulty, discrimination, guessing):
+    """Simulación escalar original: una habilidad y una uniforme por persona e ítem"""
+    theta = np.random.normal(0, 1, n_respondents)
+    responses = np.zeros((n_respondents, len(difficulty)), dtype=int)
+    for j in range(len(difficulty)):
+        uniform = np.random.uniform(0, 1, n_respondents)
+        for i in range(n_respondents):
+            prob = _scalar_probability(theta[i], difficulty[j], discrimination[j], guessing[j])
+            responses[i, j] = prob > uniform[i]
+    return responses
+
+
+def _item_graph(parameters, response_options=None):
+    graph = PsychometricGraph()
+    graph.add_node("c", "construct")
+    if response_options:
+        graph.add_node("m", "method", response_options=response_options)
+    for j, irt_parameters in enumerate(parameters):
+        graph.add_node(f"i{j}", "item", irt_parameters=irt_parameters)
+        graph.add_edge(f"i{j}", "c", "measures")
+        if response_options:
+            graph.add_edge(f"i{j}", "m", "uses_method")
+    return graph
+
+
+DICHOTOMOUS = [
+    {"difficulty": -1.0, "discrimination": 0.8, "guessing": 0.0},
+    {"difficulty": 0.0, "discrimination": 1.5, "guessing": 0.2},
+    {"difficulty": 1.2, "discrimination": 2.0, "guessing": 0.1},
+]
+
+
+def test_dichotomous_matches_scalar_draw_by_draw():
+    rng = np.random.default_rng(0)
+    theta = rng.normal(size=(3, 200))
+    uniform = rng.random((3, 200, len(DICHOTOMOUS)))
+    b, a, c = (np.array([p[name] for p in DICHOTOMOUS]) for name in ("difficulty", "discrimination", "guessing"))
+
+    responses = simulate_dichotomous(theta, b, a, c, uniform)
+    expected = [[[_scalar_probability(theta[r, i], b[j], a[j], c[j]) > uniform[r, i, j]
+                  for j in range(len(b))] for i in range(theta.shape[1])] for r in range(3)]
+    assert responses.dtype == np.uint8
+    assert responses.tolist() == np.array(expected, dtype=np.uint8).tolist()
+
+
+@pytest.mark.parametrize("model", ["grm", "pcm"])
+def test_polytomous_matches_scalar_draw_by_draw(model):
+    thresholds = [[-1.5, -0.2, 0.8, 1.9], [-0.5, 0.5, np.inf, np.inf]]
+    discrimination = np.array([1.3, 0.9])
+    rng = np.random.default_rng(1)
+    theta = rng.normal(size=300)
+    uniform = rng.random((300, 2))
+
+    responses = simulate_polytomous(theta, discrimination, np.zeros(2), np.array(thresholds), uniform,
+                                    np.full(2, model == "pcm"))
+    for j, item_thresholds in enumerate(thresholds):
+        finite = [b for b in item_thresholds if np.isfinite(b)]
+        for i in range(len(theta)):
+            probabilities = _scalar_category_probabilities(theta[i], discrimination[j], finite, model)
+            # La categoría es el número de probabilidades acumuladas P(X >= k) que superan la uniforme
+            cumulative = [sum(probabilities[k:]) for k in range(1, len(probabilities))]
+            assert responses[i, j] == sum(uniform[i, j] < p for p in cumulative)
+
+
+@pytest.mark.parametrize("model", ["grm", "pcm"])
+def test_cumulative_probabilities_match_scalar_model(model):
+    thresholds = np.array([[-1.0, 0.0, 1.0]])
+    theta = np.linspace(-3, 3, 13)
+    cumulative = cumulative_probabilities(theta, np.array([1.4]), np.zeros(1), thresholds,
+                                          np.array([model == "pcm"]))
+    for i, t in enumerate(theta):
+        probabilities = _scalar_category_probabilities(t, 1.4, thresholds[0], model)
+        expected = [sum(probabilities[k:]) for k in range(1, len(probabilities))]
+        np.testing.assert_allclose(cumulative[i, 0], expected, rtol=1e-12)
+
+
+def test_vectorized_distribution_matches_scalar_path():
+    n_respondents = 20000
+    np.random.seed(0)
+    scalar = _scalar_simulation(n_respondents, *(np.array([p[name] for p in DICHOTOMOUS])
+                                                 for name in ("difficulty", "discrimination", "guessing")))
+
+    evaluator = PsychometricEvaluator(n_respondents=n_respondents, seed=0)
+    data = evaluator.simulate_responses(_item_graph(DICHOTOMOUS), n_simulations=2)
+    assert data['responses'].shape == (2, n_respondents, len(DICHOTOMOUS))
+
+    # Proporciones de acierto, correlación entre ítems y distribución de la puntuación total
+    # dentro del error Monte Carlo de ambas muestras
+    tolerance = 4 * np.sqrt(0.25 * 2 / n_respondents)
+    for responses in data['responses']:
+        np.testing.assert_allclose(responses.mean(axis=0), scalar.mean(axis=0), atol=tolerance)
+        np.testing.assert_allclose(np.corrcoef(responses.T), np.corrcoef(scalar.T), atol=0.05)
+        np.testing.assert_allclose(np.bincount(responses.sum(axis=1), minlength=4) / n_respondents,
+                                   np.bincount(scalar.sum(axis=1), minlength=4) / n_respondents,
+                                   atol=tolerance)
+
+    # Con la misma semilla, la simulación vectorizada es reproducible
+    again = PsychometricEvaluator(n_respondents=n_respondents, seed=0)
+    assert np.array_equal(again.simulate_responses(_item_graph(DICHOTOMOUS), n_simulations=2)['responses'],
+                          data['responses'])
+
+
+@pytest.mark.parametrize("model", ["grm", "pcm"])
+def test_polytomous_category_frequencies_match_model(model):
+    parameters = [{"difficulty": 0.0, "discrimination": 1.2, "guessing": 0.0,
+                   "thresholds": [-1.0, 0.0, 1.0], "model": model}]
+    n_respondents = 40000
+    evaluator = PsychometricEvaluator(n_respondents=n_respondents, seed=2)
+    data = evaluator.simulate_responses(_item_graph(parameters, ["1", "2", "3", "4"]))
+    observed = np.bincount(data['responses'][:, 0], minlength=4) / n_respondents
+
+    # Probabilidades marginales de cada categoría integrando theta ~ N(0, 1)
+    nodes, weights = np.polynomial.hermite_e.hermegauss(61)
+    weights = weights / weights.sum()
+    expected = sum(w * np.array(_scalar_category_probabilities(t, 1.2, [-1.0, 0.0, 1.0], model))
+                   for t, w in zip(nodes, weights))
+    np.testing.assert_allclose(observed, expected, atol=4 * np.sqrt(0.25 / n_respondents))
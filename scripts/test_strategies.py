@@ -0,0 +1,70 @@
+"""
+Pruebas (pytest) de las estrategias de búsqueda continuas (CMA-ES y
+evolución diferencial) y de la fachada Optimizer
+"""
+import contextlib
+import io
+import numpy as np
+import pytest
+from evaluator import PsychometricEvaluator
+from optimizer import Optimizer
+from strategies import STRATEGIES, SearchStrategy, parameter_bounds
+from test_graph import build_valid_graph
+
+
+@pytest.fixture(scope="module")
+def base_graph():
+    np.random.seed(0)  # build_valid_graph usa el generador global para los metadatos
+    return build_valid_graph()
+
+
+def _optimizer(graph, strategy, seed=1):
+    return Optimizer(graph, strategy=strategy, population_size=6, seed=seed,
+                     evaluator=PsychometricEvaluator(n_respondents=200, seed=seed))
+
+
+def test_search_strategy_requires_ask_and_tell():
+    class Incomplete(SearchStrategy):
+        def ask(self):
+            return self.x0[np.newaxis]
+
+    with pytest.raises(TypeError):
+        Incomplete(np.zeros(2), np.zeros(2), np.ones(2))
+
+
+@pytest.mark.parametrize("name", sorted(STRATEGIES))
+def test_strategies_propose_candidates_within_bounds(name):
+    lower, upper = parameter_bounds(3)
+    strategy = STRATEGIES[name](np.zeros(6), lower, upper, population_size=8, rng=np.random.default_rng(0))
+    target = (lower + upper) / 2 + 0.5
+    for _ in range(30):
+        candidates = strategy.ask()
+        assert candidates.shape == (8, 6)
+        assert ((candidates >= lower) & (candidates <= upper)).all()
+        strategy.tell(-np.square(candidates - target).sum(axis=1))
+    # Maximiza: el mejor candidato se acerca al óptimo
+    assert np.square(candidates - target).sum(axis=1).min() < np.square(strategy.x0 - target).sum()
+
+
+@pytest.mark.parametrize("name", sorted(STRATEGIES))
+def test_invalid_candidates_score_minus_one_without_evaluation(base_graph, name):
+    optimizer = _optimizer(base_graph, name)
+    genomes = optimizer.encoding.base_population(3)
+    genomes.parameters[1, 0, 1] = 3.5  # Discriminación fuera de rango
+    simulations = optimizer.evaluator.simulations_run
+    scores, n_evaluated = optimizer._evaluate(genomes)
+    assert n_evaluated == 2
+    assert scores[1] == -1
+    assert scores[0] == scores[2] > 0
+    assert optimizer.evaluator.simulations_run - simulations == 2 * optimizer.evaluator.n_simulations
+
+    # guessing no se busca: con un valor no válido en el grafo base, ningún candidato se evalúa
+    graph = base_graph.copy()
+    graph.nodes["dep1"].properties["irt_parameters"]["guessing"] = 0.7
+    optimizer = _optimizer(graph, name)
+    with contextlib.redirect_stdout(io.StringIO()):
+        best, score, history = optimizer.evolve(2)
+    assert score == -1
+    assert optimizer.evaluations == 0 and optimizer.simulations_run == 0
+    assert [record["evaluations"] for record in history] == [0, 0]
+    assert best.nodes["dep1"].properties["irt_parameters"]["guessing"] == 0.7
@@ -0,0 +1,88 @@
+"""
+Pruebas (pytest) del modelo sustituto: ridge incremental, precisión de las
+predicciones y criba de la descendencia en el algoritmo genético
+"""
+import contextlib
+import io
+import numpy as np
+import pytest
+from evaluator import PsychometricEvaluator
+from genetic_optimizer import GeneticOptimizer
+from surrogate import RidgeSurrogate, prediction_accuracy
+from test_graph import build_valid_graph
+
+
+@pytest.fixture(scope="module")
+def base_graph():
+    np.random.seed(0)  # build_valid_graph usa el generador global para los metadatos
+    return build_valid_graph()
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    features = rng.normal(size=(200, 5)) * [1.0, 10.0, 0.1, 1.0, 3.0]
+    scores = features @ [0.5, -0.02, 3.0, 0.0, 0.1] + 0.3 + rng.normal(scale=0.01, size=200)
+    return features, scores
+
+
+def test_incremental_updates_match_standardized_ridge(data):
+    features, scores = data
+    surrogate = RidgeSurrogate(alpha=0.5)
+    for block in (slice(0, 50), slice(50, 51), slice(51, 200)):
+        surrogate.update(features[block], scores[block])
+
+    # Ridge sobre las características centradas, con penalización proporcional a su varianza
+    centered = features - features.mean(axis=0)
+    gram = centered.T @ centered
+    coef = np.linalg.solve(gram + np.diag(0.5 * (np.diag(gram) + 1e-9)), centered.T @ (scores - scores.mean()))
+    expected = features @ coef + scores.mean() - features.mean(axis=0) @ coef
+    np.testing.assert_allclose(surrogate.predict(features), expected, rtol=1e-9, atol=1e-12)
+
+
+def test_weak_regularization_recovers_linear_scores(data):
+    features, scores = data
+    surrogate = RidgeSurrogate(alpha=1e-6, min_samples=200)
+    assert not surrogate.is_trained
+    surrogate.update(features, scores)
+    assert surrogate.is_trained
+    accuracy = prediction_accuracy(surrogate.predict(features), scores)
+    assert accuracy["r2"] > 0.999
+    assert accuracy["spearman"] > 0.99
+    assert accuracy["n"] == 200
+
+
+def test_state_round_trip_keeps_predictions(data):
+    features, scores = data
+    surrogate = RidgeSurrogate()
+    surrogate.update(features, scores)
+    restored = RidgeSurrogate()
+    restored.load_state(surrogate.state())
+    assert restored.n == surrogate.n
+    np.testing.assert_array_equal(restored.predict(features), surrogate.predict(features))
+    assert RidgeSurrogate().state() == {}
+
+
+def test_prediction_accuracy_of_constant_scores_is_undefined():
+    accuracy = prediction_accuracy([0.1, 0.2, 0.3], [0.5, 0.5, 0.5])
+    assert np.isnan(accuracy["r2"]) and np.isnan(accuracy["spearman"])
+    assert accuracy["mae"] == pytest.approx(0.3)
+    assert prediction_accuracy([], [])["n"] == 0
+
+
+def test_trained_surrogate_screens_children_without_extra_evaluations(base_graph):
+    optimizer = GeneticOptimizer(base_graph, population_size=8, seed=3, representation="genome",
+                                 surrogate=RidgeSurrogate(min_samples=8), surrogate_factor=4,
+                                 evaluator=PsychometricEvaluator(n_respondents=200, seed=3))
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer.evolve(4)
+
+    # El sustituto se entrena desde la primera generación y criba a partir de la segunda
+    assert optimizer.surrogate.n >= 8
+    assert "surrogate" not in optimizer.history[0]
+    for record in optimizer.history[1:]:
+        assert record["surrogate"]["n"] > 0
+        assert record["surrogate"]["n_train"] > 0
+    # Se generan 4 veces más hijos, pero solo se evalúa la población
+    assert all(record["evaluations"] <= optimizer.population_size for record in optimizer.history)
+    assert len(optimizer.population) == optimizer.population_size
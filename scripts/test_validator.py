@@ -0,0 +1,57 @@
+"""
+Pruebas (pytest) del validador sobre la instantánea compilada del grafo
+"""
+import numpy as np
+import pytest
+from validator import PsychometricValidator
+from test_graph import build_valid_graph
+
+
+@pytest.fixture
+def graph():
+    np.random.seed(0)  # build_valid_graph usa el generador global para los metadatos
+    return build_valid_graph()
+
+
+def test_valid_graph_passes_every_constraint(graph):
+    results = PsychometricValidator().validate(graph)
+    assert all(result["valid"] for result in results.values()), results
+
+
+def test_non_numeric_irt_parameter_is_reported_not_raised(graph):
+    graph.mutable_node("dep1").properties["irt_parameters"]["difficulty"] = "alta"
+    results = PsychometricValidator().validate(graph)
+
+    for name in ("check_construct_coverage", "check_method_assignment", "check_irt_parameters"):
+        assert not results[name]["valid"]
+        assert "dep1" in results[name]["errors"][0]
+    # Las comprobaciones que no usan la instantánea compilada se siguen evaluando
+    assert results["check_content_validity"]["valid"]
+    assert results["check_correlation_strength"]["valid"]
+
+
+def test_non_numeric_correlation_strength_is_reported_not_raised(graph):
+    source, target = graph.edges_of_type("correlates_with")[0]
+    edge = graph.mutable_edge((source, target))
+    edge.properties.pop("correlation", None)
+    edge.properties["strength"] = "fuerte"
+    results = PsychometricValidator().validate(graph)
+
+    assert not results["check_correlation_strength"]["valid"]
+    assert "no numérico" in results["check_correlation_strength"]["errors"][0]
+    assert not results["check_irt_parameters"]["valid"]
+    assert results["check_content_validity"]["valid"]
+
+
+def test_polytomous_thresholds_and_models_are_checked(graph):
+    params = graph.mutable_node("dep1").properties["irt_parameters"]
+    params["thresholds"] = [-1.0, 0.5, 0.2, 1.0]
+    graph.mutable_node("dep2").properties["irt_parameters"]["model"] = "nominal"
+    errors = PsychometricValidator().validate(graph)["check_irt_parameters"]["errors"]
+    assert errors == ["Ítem dep1: Umbrales de categoría no crecientes",
+                      "Ítem dep2: Modelo de respuesta desconocido"]
+
+    # En crédito parcial los pasos pueden estar desordenados
+    params["model"] = "pcm"
+    graph.mutable_node("dep2").properties["irt_parameters"]["model"] = "grm"
+    assert PsychometricValidator().validate(graph)["check_irt_parameters"]["valid"]
@@ -1,4 +1,9 @@
+import numpy as np
+
 class PsychometricValidator:
+    # Comprobaciones que solo leen el grafo y no necesitan la instantánea compilada
+    GRAPH_CONSTRAINTS = ("check_content_validity", "check_correlation_strength")
+    
     def __init__(self):
         self.constraints = [
             self.check_content_validity,
@@ -8,13 +13,30 @@ class PsychometricValidator:
             self.check_correlation_strength
         ]
     
-    def validate(self, graph):
-        """Ejecuta todas las validaciones en el grafo"""
+    def validate(self, graph, compiled=None):
+        """
+        Ejecuta todas las validaciones en el grafo (compiled: instantánea ya
+        compilada del grafo, para no volver a compilarlo)
+        """
         results = {}
+        # Instantánea compartida por las comprobaciones numéricas; si no puede
+        # compilarse (p. ej. parámetros no numéricos), esas comprobaciones fallan
+        compile_error = None
+        if compiled is None:
+            try:
+                compiled = graph.compile()
+            except Exception as e:
+                compile_error = e
         for constraint in self.constraints:
             constraint_name = constraint.__name__
+            if compile_error is not None and constraint_name not in self.GRAPH_CONSTRAINTS:
+                results[constraint_name] = {
+                    "valid": False,
+                    "errors": [f"No se pudo compilar el grafo: {str(compile_error)}"]
+                }
+                continue
             try:
-                results[constraint_name] = constraint(graph)
+                results[constraint_name] = constraint(graph, compiled)
             except Exception as e:
                 results[constraint_name] = {
                     "valid": False,
@@ -22,131 +44,121 @@ class PsychometricValidator:
                 }
         return results
     
-    def check_content_validity(self, graph):
+    def check_content_validity(self, graph, compiled=None):
         """Verifica que los constructos tengan cobertura de contenido"""
         errors = []
-        for node_id, node in graph.nodes.items():
-            if node.type == "construct":
-                # Verificar que tiene dominios de contenido definidos
-                content_domains = node.properties.get("content_domains", [])
-                if not content_domains:
-                    errors.append(f"Constructo {node_id} no tiene dominios de contenido definidos")
-                
-                # Verificar que tiene marco teórico
-                theoretical_framework = node.properties.get("theoretical_framework", "")
-                if not theoretical_framework:
-                    errors.append(f"Constructo {node_id} no tiene marco teórico definido")
+        for node_id in graph.nodes_of_type("construct"):
+            node = graph.nodes[node_id]
+            # Verificar que tiene dominios de contenido definidos
+            content_domains = node.get_property("content_domains", [])
+            if not content_domains:
+                errors.append(f"Constructo {node_id} no tiene dominios de contenido definidos")
+            
+            # Verificar que tiene marco teórico
+            theoretical_framework = node.get_property("theoretical_framework", "")
+            if not theoretical_framework:
+                errors.append(f"Constructo {node_id} no tiene marco teórico definido")
         
         return {"valid": len(errors) == 0, "errors": errors}
     
-    def check_construct_coverage(self, graph):
+    def check_construct_coverage(self, graph, compiled=None):
         """Verifica que cada constructo tenga al menos 3 ítems que lo midan"""
-        construct_items = {}
-        
-        # Contar cuántos ítems tiene cada constructo
-        for (source, target), edge in graph.edges.items():
-            if edge.type == "measures":
-                if target not in construct_items:
-                    construct_items[target] = 0
-                construct_items[target] += 1
+        compiled = compiled or graph.compile()
         
         errors = []
-        for node_id, node in graph.nodes.items():
-            if node.type == "construct":
-                item_count = construct_items.get(node_id, 0)
-                if item_count < 3:
-                    errors.append(f"Constructo {node_id} tiene solo {item_count} ítems (mínimo requerido: 3)")
+        for node_id in compiled.construct_ids:
+            item_count = compiled.measures_per_node[compiled.node_index[node_id]]
+            if item_count < 3:
+                errors.append(f"Constructo {node_id} tiene solo {item_count} ítems (mínimo requerido: 3)")
         
         return {"valid": len(errors) == 0, "errors": errors}
     
-    def check_method_assignment(self, graph):
+    def check_method_assignment(self, graph, compiled=None):
         """Verifica que todos los ítems tengan un método de respuesta asignado"""
-        items_with_method = set()
-        items_without_method = set()
-        
-        # Identificar todos los ítems
-        for node_id, node in graph.nodes.items():
-            if node.type == "item":
-                items_without_method.add(node_id)
-        
-        # Verificar relaciones "uses_method"
-        for (source, target), edge in graph.edges.items():
-            if edge.type == "uses_method":
-                if source in items_without_method:
-                    items_without_method.remove(source)
-                    items_with_method.add(source)
+        compiled = compiled or graph.compile()
         
-        errors = [f"El ítem {item_id} no tiene método de respuesta asignado" 
-                 for item_id in items_without_method]
+        items_without_method = np.flatnonzero(~compiled.item_has_method)
+        errors = [f"El ítem {compiled.item_ids[j]} no tiene método de respuesta asignado" 
+                 for j in items_without_method]
         
         return {"valid": len(errors) == 0, "errors": errors}
     
-    def check_irt_parameters(self, graph):
+    def check_irt_parameters(self, graph, compiled=None):
         """Verifica que los parámetros IRT de los ítems estén dentro de rangos válidos"""
+        compiled = compiled or graph.compile()
         errors = []
         
-        for node_id, node in graph.nodes.items():
-            if node.type == "item":
-                irt_params = node.properties.get("irt_parameters", {})
-                
-                # Verificar dificultad
-                difficulty = irt_params.get("difficulty")
-                if difficulty is not None:
-                    if not (-3.0 <= difficulty <= 3.0):
-                        errors.append(f"Ítem {node_id}: Dificultad {difficulty} fuera de rango [-3.0, 3.0]")
-                
-                # Verificar discriminación
-                discrimination = irt_params.get("discrimination")
-                if discrimination is not None:
-                    if discrimination < 0.3 or discrimination > 3.0:
-                        errors.append(f"Ítem {node_id}: Discriminación {discrimination} fuera de rango [0.3, 3.0]")
-                
-                # Verificar guessing
-                guessing = irt_params.get("guessing")
-                if guessing is not None:
-                    if guessing < 0.0 or guessing > 0.5:
-                        errors.append(f"Ítem {node_id}: Parámetro de azar {guessing} fuera de rango [0.0, 0.5]")
+        # Comprobación vectorizada; los parámetros ausentes (NaN) no se validan
+        with np.errstate(invalid="ignore"):
+            bad_difficulty = (compiled.difficulty < -3.0) | (compiled.difficulty > 3.0)
+            bad_discrimination = (compiled.discrimination < 0.3) | (compiled.discrimination > 3.0)
+            bad_guessing = (compiled.guessing < 0.0) | (compiled.guessing > 0.5)
+        
+        # Umbrales de categoría: deben ser crecientes en el modelo de respuesta graduada
+        with np.errstate(invalid="ignore"):
+            grm = compiled.response_model == compiled.MODEL_GRM
+            bad_thresholds = grm & (np.diff(compiled.thresholds, axis=1) <= 0).any(axis=1)
+        unknown_model = compiled.response_model < 0
+        
+        for j in np.flatnonzero(bad_thresholds | unknown_model):
+            if unknown_model[j]:
+                errors.append(f"Ítem {compiled.item_ids[j]}: Modelo de respuesta desconocido")
+            else:
+                errors.append(f"Ítem {compiled.item_ids[j]}: Umbrales de categoría no crecientes")
+        
+        for j in np.flatnonzero(bad_difficulty | bad_discrimination | bad_guessing):
+            node_id = compiled.item_ids[j]
+            if bad_difficulty[j]:
+                errors.append(f"Ítem {node_id}: Dificultad {compiled.difficulty[j]} fuera de rango [-3.0, 3.0]")
+            if bad_discrimination[j]:
+                errors.append(f"Ítem {node_id}: Discriminación {compiled.discrimination[j]} fuera de rango [0.3, 3.0]")
+            if bad_guessing[j]:
+                errors.append(f"Ítem {node_id}: Parámetro de azar {compiled.guessing[j]} fuera de rango [0.0, 0.5]")
         
         return {"valid": len(errors) == 0, "errors": errors}
     
-    def check_correlation_strength(self, graph):
+    def check_correlation_strength(self, graph, compiled=None):
         """Verifica que las correlaciones entre constructos sean razonables"""
         errors = []
         
-        for (source, target), edge in graph.edges.items():
-            if edge.type == "correlates_with":
-                strength = edge.properties.get("strength")
-                correlation = edge.properties.get("correlation")
-                
-                # Verificar que al menos una medida de fuerza esté presente
-                if strength is None and correlation is None:
-                    errors.append(f"Relación {source}-{target}: Falta especificar strength o correlation")
-                    continue
+        for source, target in graph.edges_of_type("correlates_with"):
+            edge = graph.edges[(source, target)]
+            strength = edge.properties.get("strength")
+            correlation = edge.properties.get("correlation")
+            
+            # Verificar que al menos una medida de fuerza esté presente
+            if strength is None and correlation is None:
+                errors.append(f"Relación {source}-{target}: Falta especificar strength o correlation")
+                continue
+            
+            # Usar correlation si está disponible, sino usar strength
+            value = correlation if correlation is not None else strength
+            if not isinstance(value, (int, float, np.number)):
+                errors.append(f"Relación {source}-{target}: Valor {value!r} no numérico")
+                continue
+            
+            if value is not None:
+                # Verificar rango
+                if not (-1.0 <= value <= 1.0):
+                    errors.append(f"Relación {source}-{target}: Valor {value} fuera de rango [-1.0, 1.0]")
                 
-                # Usar correlation si está disponible, sino usar strength
-                value = correlation if correlation is not None else strength
+                # Verificar que no sea correlación perfecta
+                if abs(value) > 0.95:
+                    errors.append(f"Relación {source}-{target}: Correlación {value} demasiado alta (>0.95)")
                 
-                if value is not None:
-                    # Verificar rango
-                    if not (-1.0 <= value <= 1.0):
-                        errors.append(f"Relación {source}-{target}: Valor {value} fuera de rango [-1.0, 1.0]")
-                    
-                    # Verificar que no sea correlación perfecta
-                    if abs(value) > 0.95:
-                        errors.append(f"Relación {source}-{target}: Correlación {value} demasiado alta (>0.95)")
-                    
-                    # Verificar soporte empírico para correlaciones fuertes
-                    if abs(value) > 0.7:
-                        empirical_support = edge.properties.get("empirical_support")
-                        if not empirical_support:
-                            errors.append(f"Relación {source}-{target}: Correlación fuerte ({value}) sin soporte empírico")
+                # Verificar soporte empírico para correlaciones fuertes
+                if abs(value) > 0.7:
+                    empirical_support = edge.properties.get("empirical_support")
+                    if not empirical_support:
+                        errors.append(f"Relación {source}-{target}: Correlación fuerte ({value}) sin soporte empírico")
         
         return {"valid": len(errors) == 0, "errors": errors}
     
     def validate_metadata(self, graph):
         errors = []
-        for edge in graph.edges.values():
-            if edge.type == "measures" and not edge.metadata.get("psychometric_properties.reliability"):
+        for edge_key in graph.edges_of_type("measures"):
+            edge = graph.edges[edge_key]
+            if not edge.get_metadata("psychometric_properties.reliability"):
                 errors.append(f"Falta confiabilidad en relación {edge.source}->{edge.target}")
             
             if "effect_size" in edge.metadata["empirical_support"]:
@@ -29,3 +29,16 @@ def test_information_curve(graph, theta_range: np.ndarray) -> Dict[str, List[flo
         item.id: [fisher_information(item, theta) for theta in theta_range]
         for item in graph.items
     }
+
+def information_matrix(compiled, theta_range: np.ndarray) -> np.ndarray:
+    """
+    Información de Fisher (IRT 2PL) de todos los ítems a la vez a partir de
+    un grafo compilado (PsychometricGraph.compile())
+    
+    Returns:
+        Array de forma (len(theta_range), n_items), columnas en compiled.item_ids
+    """
+    difficulty, discrimination, _ = compiled.item_parameters()
+    theta = np.asarray(theta_range, dtype=float)[:, np.newaxis]
+    p = 1 / (1 + np.exp(-discrimination * (theta - difficulty)))
+    return (discrimination ** 2) * p * (1 - p)